@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Attachment Encoding for Email Sender MCP
+Base64-encodes attachment files in fixed-size chunks into an on-disk spool
+keyed by content hash, so a file attached to many queued emails is encoded
+once and never held in memory: the SMTP pool sends the spool file in
+chunks in place of the part's body.
+"""
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.mime.base import MIMEBase
+from pathlib import Path
+from typing import Iterator
+
+logger = logging.getLogger('EmailSender.Attachments')
+
+# Multiple of 57 bytes so every chunk encodes to whole 76-character lines
+ENCODE_CHUNK_BYTES = 57 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+# Spool bytes read per chunk while sending (whole 77-byte lines)
+SEND_CHUNK_BYTES = 77 * 1024
+# Content hashes remembered for unchanged files
+DIGEST_CACHE_SIZE = 1024
+
+# Spool files used this recently may belong to a message still being sent
+PRUNE_MIN_AGE_SECONDS = 600
+
+
+class AttachmentTooLarge(ValueError):
+    """An attachment or the message as a whole exceeds a configured size limit."""
+
+
+class SpooledAttachment(MIMEBase):
+    """
+    MIME part whose base64 body stays on disk and is streamed when sent.
+
+    While the SMTP pool flattens a message it sets `placeholder`, so the
+    generator writes that one line instead of the body; the pool then sends
+    iter_wire_chunks() in its place. Anything else that flattens the message
+    gets the full encoded text from get_payload().
+    """
+
+    placeholder = None
+
+    def __init__(self, spool_path: Path, filename: str, encoded_size: int):
+        ctype, _ = mimetypes.guess_type(filename)
+        maintype, subtype = (ctype or 'application/octet-stream').split('/', 1)
+        super().__init__(maintype, subtype, name=filename)
+        self['Content-Transfer-Encoding'] = 'base64'
+        self['Content-Disposition'] = f'attachment; filename="{filename}"'
+        self.spool_path = spool_path
+        self.encoded_size = encoded_size
+        # Placeholder so email.generator treats this as a non-multipart text body
+        self._payload = ''
+
+    def get_payload(self, i=None, decode=False):
+        if self.placeholder and not decode:
+            return self.placeholder
+        encoded = self.spool_path.read_text(encoding='ascii')
+        if decode:
+            return base64.b64decode(encoded)
+        return encoded
+
+    @property
+    def wire_size(self) -> int:
+        """Body size on the wire: every 76-character line ends in CRLF instead of LF."""
+        return self.encoded_size + -(-self.encoded_size // 77)
+
+    def iter_wire_chunks(self) -> Iterator[bytes]:
+        """Encoded body in SEND_CHUNK_BYTES pieces with CRLF line endings."""
+        with open(self.spool_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(SEND_CHUNK_BYTES), b''):
+                yield chunk.replace(b'\n', b'\r\n')
+
+
+class AttachmentCache:
+    """Content-addressed spool of base64-encoded attachments."""
+
+    def __init__(self, cache_dir: Path, max_file_bytes: int, max_message_bytes: int,
+                 max_cache_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize attachment cache.
+
+        Args:
+            cache_dir: Directory for encoded spool files
+            max_file_bytes: Largest single attachment accepted (raw size)
+            max_message_bytes: Largest total encoded attachment size per message
+            max_cache_bytes: Spool size above which least recently used files are pruned
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_file_bytes = max_file_bytes
+        self.max_message_bytes = max_message_bytes
+        self.max_cache_bytes = max_cache_bytes
+
+        # (path, size, mtime_ns) -> content hash, so unchanged files are not rehashed;
+        # least recently used entries beyond DIGEST_CACHE_SIZE are dropped
+        self._digests: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'bytes_encoded': 0}
+
+    def _digest(self, path: Path, stat: os.stat_result) -> str:
+        cache_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(cache_key)
+            if digest:
+                self._digests.move_to_end(cache_key)
+                return digest
+
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._digests[cache_key] = digest
+            while len(self._digests) > DIGEST_CACHE_SIZE:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _encode_to_spool(self, path: Path, spool_path: Path):
+        """Stream-encode a file into the spool; memory use is one chunk."""
+        tmp_path = spool_path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(path, 'rb') as src, open(tmp_path, 'w', encoding='ascii', newline='\n') as dst:
+            for chunk in iter(lambda: src.read(ENCODE_CHUNK_BYTES), b''):
+                dst.write(base64.encodebytes(chunk).decode('ascii'))
+        os.replace(tmp_path, spool_path)
+
+    def part_for(self, file_path: str) -> SpooledAttachment:
+        """
+        Return a MIME part for a file, encoding it only on a cache miss.
+
+        Raises:
+            AttachmentTooLarge: If the file exceeds max_file_bytes
+        """
+        path = Path(file_path)
+        stat = path.stat()
+        if stat.st_size > self.max_file_bytes:
+            raise AttachmentTooLarge(
+                f"{path.name} is {stat.st_size} bytes (limit {self.max_file_bytes})"
+            )
+
+        digest = self._digest(path, stat)
+        spool_path = self.cache_dir / f"{digest}.b64"
+
+        with self._lock:
+            if spool_path.exists():
+                self.stats['hits'] += 1
+                os.utime(spool_path)  # mark recently used for pruning
+            else:
+                self.stats['misses'] += 1
+                self._encode_to_spool(path, spool_path)
+                self.stats['bytes_encoded'] += stat.st_size
+                logger.info(f"Encoded attachment {path.name} ({stat.st_size} bytes)")
+                self._prune()
+
+        return SpooledAttachment(spool_path, path.name, spool_path.stat().st_size)
+
+    def check_message_size(self, parts: list):
+        """
+        Enforce the per-message limit on total encoded attachment size.
+
+        Raises:
+            AttachmentTooLarge: If the parts together exceed max_message_bytes
+        """
+        total = sum(part.encoded_size for part in parts)
+        if total > self.max_message_bytes:
+            raise AttachmentTooLarge(
+                f"attachments total {total} encoded bytes (limit {self.max_message_bytes})"
+            )
+
+    def _prune(self):
+        """Remove least recently used spool files above the cache budget (caller holds the lock)."""
+        files = [(p, p.stat()) for p in self.cache_dir.glob('*.b64')]
+        total = sum(st.st_size for _, st in files)
+        if total <= self.max_cache_bytes:
+            return
+
+        now = time.time()
+        for path, st in sorted(files, key=lambda item: item[1].st_mtime):
+            if total <= self.max_cache_bytes:
+                break
+            if now - st.st_mtime < PRUNE_MIN_AGE_SECONDS:
+                continue
+            path.unlink(missing_ok=True)
+            total -= st.st_size
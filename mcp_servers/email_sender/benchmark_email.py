@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Email Sender Benchmark
+Runs EmailSenderServer.check_queue and send_email against the local SMTP
+sink (smtp_sink.py) and reports throughput, send latency, SMTP connections
+opened and peak Python memory for each queue size and attachment mix.
+
+No SMTP provider or credentials are needed; everything runs in a
+temporary vault.
+
+Usage:
+    python benchmark_email.py
+    python benchmark_email.py --sizes 100 1000 --attachments none unique --data-latency-ms 50
+    python benchmark_email.py --modes check_queue --broadcast
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+import statistics
+import tracemalloc
+from pathlib import Path
+
+ATTACHMENT_MIXES = {
+    # name: (bytes per file, one shared file for every email?)
+    'none': (0, True),
+    'small': (20 * 1024, True),
+    'shared_large': (2 * 1024 * 1024, True),
+    'unique': (256 * 1024, False),
+}
+
+
+def configure_environment(port: int, pool_size: int, rate_limits: bool):
+    """Point the sender at the sink; must run before email_server is imported."""
+    os.environ.update({
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(port),
+        'SMTP_USERNAME': '',
+        'SMTP_PASSWORD': '',
+        'SMTP_FROM': 'bench@localhost',
+        'SMTP_STARTTLS': 'false',
+        'SMTP_POOL_SIZE': str(pool_size),
+        'SEND_CONCURRENCY': str(pool_size),
+    })
+    if not rate_limits:
+        os.environ['RATE_LIMIT_PER_ACCOUNT'] = '0'
+        os.environ['RATE_LIMIT_PER_DOMAIN'] = '0'
+
+
+def use_vault(email_server, vault: Path):
+    """Redirect the sender's vault folders into a scratch directory."""
+    email_server.READY_TO_SEND_PATH = vault / "Ready_To_Send" / "Email"
+    email_server.DONE_PATH = vault / "Done"
+    email_server.DEAD_LETTER_PATH = vault / "Dead_Letter" / "Email"
+    email_server.OUTBOX_JOURNAL = vault / "Outbox" / "email_outbox.jsonl"
+    email_server.ATTACHMENT_CACHE_PATH = vault / "Outbox" / "attachment_cache"
+    email_server.METRICS_PATH = vault / "Outbox" / "email_metrics.jsonl"
+    email_server.SENT_LEDGER_PATH = vault / "Logs" / "Email"
+    email_server.READY_TO_SEND_PATH.mkdir(parents=True)
+    email_server.DONE_PATH.mkdir(parents=True)
+
+
+def make_attachments(vault: Path, mix: str, count: int) -> list:
+    """Create attachment files for a run; returns one path (or None) per email."""
+    size, shared = ATTACHMENT_MIXES[mix]
+    if not size:
+        return [None] * count
+
+    files_dir = vault / "files"
+    files_dir.mkdir()
+    if shared:
+        path = files_dir / "shared.bin"
+        path.write_bytes(os.urandom(size))
+        return [str(path)] * count
+
+    paths = []
+    for i in range(count):
+        path = files_dir / f"file_{i}.bin"
+        path.write_bytes(os.urandom(size))
+        paths.append(str(path))
+    return paths
+
+
+def percentile(values: list, pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+async def run_benchmark(email_server, sink, mode: str, size: int, mix: str,
+                        trace_memory: bool, broadcast: bool = False) -> dict:
+    """
+    Send `size` emails through one entry point on a fresh server and vault.
+
+    With `broadcast`, every email has the same subject (and body) and is
+    marked `batch: true`, so check_queue can batch them into
+    multi-recipient transactions.
+
+    Returns:
+        Dictionary of results for this run
+    """
+    vault = Path(tempfile.mkdtemp(prefix="email_bench_"))
+    use_vault(email_server, vault)
+    attachments = make_attachments(vault, mix, size)
+    body = "# Weekly update\n\nHello,\n\n- item one\n- **item two**\n\nRegards"
+
+    if mode == 'check_queue':
+        for i, attachment in enumerate(attachments):
+            subject = "Benchmark" if broadcast else f"Benchmark {i}"
+            header = f"to: user{i}@example{i % 10}.com\nsubject: {subject}\n"
+            if broadcast:
+                header += "batch: true\n"
+            if attachment:
+                header += f"attachments: {attachment}\n"
+            (email_server.READY_TO_SEND_PATH / f"email_{i:05d}.md").write_text(
+                f"---\n{header}---\n\n{body}\n", encoding='utf-8'
+            )
+
+    server = email_server.EmailSenderServer()
+    latencies = []
+    send_via_smtp = server._send_via_smtp
+
+    async def timed_send(msg, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await send_via_smtp(msg, **kwargs)
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    server._send_via_smtp = timed_send
+    sink.handler.reset()
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    if mode == 'check_queue':
+        results = json.loads(await server.check_queue())
+        sent, failed = len(results.get('sent', [])), len(results.get('failed', []))
+    else:
+        replies = await asyncio.gather(*(
+            server.send_email(f"user{i}@example{i % 10}.com", f"Benchmark {i}", body,
+                              attachments=attachment)
+            for i, attachment in enumerate(attachments)
+        ))
+        sent = sum(1 for r in replies if json.loads(r)['success'])
+        failed = size - sent
+
+    elapsed = time.perf_counter() - started
+    peak_bytes = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+    await server.smtp_pool.close()
+
+    return {
+        'mode': mode,
+        'emails': size,
+        'attachments': mix,
+        'sent': sent,
+        'failed': failed,
+        'elapsed_s': round(elapsed, 2),
+        'msgs_per_s': round(sent / elapsed, 1) if elapsed else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 50), 1),
+        'latency_p99_ms': round(percentile(latencies, 99), 1),
+        'smtp_connections': server.smtp_pool.stats['connections_opened'],
+        'smtp_transactions': sink.stats['messages'],
+        'wire_kb': round(sink.stats['bytes'] / 1024, 1),
+        'sink_connections': sink.stats['connections'],
+        'peak_memory_mb': round(peak_bytes / (1024 * 1024), 1) if trace_memory else None,
+    }
+
+
+def main():
+    """Main entry point for email sender benchmark."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Email Sender against a local SMTP sink')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200],
+                       help='Queue sizes to benchmark (default: 50 200)')
+    parser.add_argument('--attachments', nargs='+', default=['none', 'small', 'unique'],
+                       choices=sorted(ATTACHMENT_MIXES), help='Attachment mixes to benchmark')
+    parser.add_argument('--modes', nargs='+', default=['check_queue', 'send_email'],
+                       choices=['check_queue', 'send_email'], help='Entry points to benchmark')
+    parser.add_argument('--port', type=int, default=2525, help='Port for the SMTP sink')
+    parser.add_argument('--pool-size', type=int, default=4, help='SMTP pool size and send concurrency')
+    parser.add_argument('--rate-limits', action='store_true',
+                       help='Keep the configured rate limits (default: disabled)')
+    parser.add_argument('--connect-latency-ms', type=float, default=50.0,
+                       help='Sink delay before answering EHLO (default: 50)')
+    parser.add_argument('--data-latency-ms', type=float, default=20.0,
+                       help='Sink delay per message (default: 20)')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Sink random extra delay')
+    parser.add_argument('--transient-rate', type=float, default=0.0,
+                       help='Share of messages the sink rejects with 451')
+    parser.add_argument('--permanent-rate', type=float, default=0.0,
+                       help='Share of messages the sink rejects with 550')
+    parser.add_argument('--broadcast', action='store_true',
+                       help='Same subject and body for every queued email (envelope batching)')
+    parser.add_argument('--no-memory', action='store_true',
+                       help='Skip tracemalloc (faster, no peak memory figure)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args()
+
+    configure_environment(args.port, args.pool_size, args.rate_limits)
+    import email_server
+    from smtp_sink import SMTPSink
+
+    logging.getLogger('EmailSender').setLevel(logging.WARNING)
+    logging.getLogger('mail.log').setLevel(logging.WARNING)
+
+    sink = SMTPSink(
+        '127.0.0.1', args.port,
+        connect_latency_ms=args.connect_latency_ms,
+        data_latency_ms=args.data_latency_ms,
+        jitter_ms=args.jitter_ms,
+        transient_rate=args.transient_rate,
+        permanent_rate=args.permanent_rate,
+        seed=1
+    )
+
+    results = []
+    with sink:
+        for mode in args.modes:
+            for size in args.sizes:
+                for mix in args.attachments:
+                    results.append(asyncio.run(run_benchmark(
+                        email_server, sink, mode, size, mix, trace_memory=not args.no_memory,
+                        broadcast=args.broadcast
+                    )))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("\n" + "="*60)
+    print("EMAIL SENDER BENCHMARK")
+    print(f"Pool size {args.pool_size}, sink latency {args.connect_latency_ms}ms connect / "
+          f"{args.data_latency_ms}ms data")
+    print("="*60)
+    for r in results:
+        print(f"{r['mode']}: {r['emails']} emails, attachments={r['attachments']}")
+        print(f"  Sent: {r['sent']} ({r['failed']} failed) in {r['elapsed_s']}s = {r['msgs_per_s']} msgs/s")
+        print(f"  Send latency: p50 {r['latency_p50_ms']}ms, p99 {r['latency_p99_ms']}ms")
+        print(f"  SMTP connections: {r['smtp_connections']} (sink saw {r['sink_connections']})")
+        print(f"  SMTP transactions: {r['smtp_transactions']}, {r['wire_kb']} KB of message data")
+        if r['peak_memory_mb'] is not None:
+            print(f"  Peak Python memory: {r['peak_memory_mb']} MB")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
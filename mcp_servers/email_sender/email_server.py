@@ -3,26 +3,52 @@
 Email Sender MCP Server
 Send emails via SMTP with human-in-the-loop approval workflow.
 """
+import time
+
+# Module load time, the start of the time-to-first-request measurement
+PROCESS_STARTED = time.perf_counter()
+
 import asyncio
+import functools
 import os
-import smtplib
+import sys
 import logging
 import json
 from email.mime.text import MIMEText
+from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 # MCP imports
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 
+from metrics import SendMetrics
+from rate_limit import RateLimited, SendRateLimiter
+from outbox import EmailOutbox, QUEUED, SENDING, SENT, FAILED, DEAD
+from markdown_render import MarkdownRenderer
+
+# Frontmatter reader shared with the LinkedIn poster
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "watchers"))
+
+# frontmatter (PyYAML), smtp_pool (aiosmtplib) and the modules only some
+# sends need are imported where first used, so serving starts without them
+if TYPE_CHECKING:
+    from frontmatter import FrontmatterDocument
+
+IMPORTS_DONE = time.perf_counter()
+
 # Configuration
 VAULT_PATH = Path(__file__).parent.parent.parent / "AI_Employee_Vault"
 READY_TO_SEND_PATH = VAULT_PATH / "Ready_To_Send" / "Email"
 DONE_PATH = VAULT_PATH / "Done"
+DEAD_LETTER_PATH = VAULT_PATH / "Dead_Letter" / "Email"
+OUTBOX_JOURNAL = VAULT_PATH / "Outbox" / "email_outbox.jsonl"
+ATTACHMENT_CACHE_PATH = VAULT_PATH / "Outbox" / "attachment_cache"
+METRICS_PATH = VAULT_PATH / "Outbox" / "email_metrics.jsonl"
+SENT_LEDGER_PATH = VAULT_PATH / "Logs" / "Email"
 ENV_FILE = Path(__file__).parent / ".env"
 
 # Default SMTP configuration
@@ -32,6 +58,60 @@ SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 SMTP_FROM = os.getenv('SMTP_FROM', '')
 SMTP_FROM_NAME = os.getenv('SMTP_FROM_NAME', 'AI Employee')
+SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() not in ('0', 'false', 'no')
+
+# SMTP connection pool
+SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', '4'))
+SMTP_KEEPALIVE_SECONDS = float(os.getenv('SMTP_KEEPALIVE_SECONDS', '30'))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', '100'))
+
+# Queue drain concurrency and provider rate limits (sends per minute, 0 = unlimited)
+SEND_CONCURRENCY = int(os.getenv('SEND_CONCURRENCY', str(SMTP_POOL_SIZE)))
+RATE_LIMIT_PER_ACCOUNT = float(os.getenv('RATE_LIMIT_PER_ACCOUNT', '60'))
+RATE_LIMIT_PER_DOMAIN = float(os.getenv('RATE_LIMIT_PER_DOMAIN', '20'))
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', '5'))
+# send_email gives up instead of waiting longer than this behind queue drains
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv('RATE_LIMIT_MAX_WAIT_SECONDS', '10'))
+
+# Outbox retries: delay doubles from the base after each failed attempt
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv('OUTBOX_RETRY_BASE_SECONDS', '60'))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv('OUTBOX_RETRY_MAX_SECONDS', '3600'))
+
+# Attachment limits (raw size per file, encoded size per message) and spool budget
+MAX_ATTACHMENT_MB = float(os.getenv('MAX_ATTACHMENT_MB', '20'))
+MAX_MESSAGE_MB = float(os.getenv('MAX_MESSAGE_MB', '25'))
+ATTACHMENT_CACHE_MB = float(os.getenv('ATTACHMENT_CACHE_MB', '512'))
+
+# Markdown rendering: rendered bodies cached by hash; longer bodies go out as plain text
+MARKDOWN_CACHE_SIZE = int(os.getenv('MARKDOWN_CACHE_SIZE', '256'))
+MARKDOWN_MAX_CHARS = int(os.getenv('MARKDOWN_MAX_CHARS', '50000'))
+
+# Mail merge: journal a checkpoint every N recipients; stop a run after M (0 = no limit)
+MAIL_MERGE_CHECKPOINT_EVERY = int(os.getenv('MAIL_MERGE_CHECKPOINT_EVERY', '50'))
+MAIL_MERGE_MAX_PER_RUN = int(os.getenv('MAIL_MERGE_MAX_PER_RUN', '1000'))
+
+# Identical queued emails to different recipients can go out as one message with up to
+# N envelope recipients under To: undisclosed-recipients - not the header the human
+# approved, so 1 (default) batches only files marked `batch: true`; N > 1 batches all
+ENVELOPE_BATCH_MAX_RCPT = int(os.getenv('ENVELOPE_BATCH_MAX_RCPT', '1'))
+
+# Metrics snapshot interval while the MCP server runs (also written after each queue check)
+METRICS_SNAPSHOT_SECONDS = float(os.getenv('METRICS_SNAPSHOT_SECONDS', '300'))
+
+# Regenerate Done/<date>_sent_emails.md from the sent ledger after each queue check
+SENT_ROLLUP = os.getenv('SENT_ROLLUP', 'true').lower() not in ('0', 'false', 'no')
+
+# Drain Ready_To_Send/Email/ as soon as files land in it (needs watchdog), batching events
+QUEUE_WATCH = os.getenv('QUEUE_WATCH', 'true').lower() not in ('0', 'false', 'no')
+QUEUE_BATCH_WINDOW_SECONDS = float(os.getenv('QUEUE_BATCH_WINDOW_SECONDS', '1.0'))
+
+# Drain the queue left from before startup in the background; log progress every N seconds
+STARTUP_DRAIN = os.getenv('STARTUP_DRAIN', 'true').lower() not in ('0', 'false', 'no')
+DRAIN_PROGRESS_SECONDS = float(os.getenv('DRAIN_PROGRESS_SECONDS', '10'))
+
+# Queue order for the `priority` frontmatter field (unknown values sort as normal)
+PRIORITY_ORDER = {'urgent': 0, 'high': 1, 'normal': 2, 'low': 3}
 
 # Setup logging
 logging.basicConfig(
@@ -47,13 +127,97 @@ class EmailSenderServer:
     def __init__(self):
         """Initialize Email Sender server."""
         self.server = Server("email-sender")
+        self.metrics = SendMetrics()
+        self.rate_limiter = SendRateLimiter(
+            RATE_LIMIT_PER_ACCOUNT, RATE_LIMIT_PER_DOMAIN, burst=RATE_LIMIT_BURST
+        )
+        self.outbox = EmailOutbox(
+            OUTBOX_JOURNAL,
+            queue_dir=READY_TO_SEND_PATH,
+            max_attempts=OUTBOX_MAX_ATTEMPTS,
+            retry_base_seconds=OUTBOX_RETRY_BASE_SECONDS,
+            retry_max_seconds=OUTBOX_RETRY_MAX_SECONDS
+        )
+        self._drain_lock = asyncio.Lock()
+        self._drain_status = None
+        self._stopping = asyncio.Event()
+        self.startup = {
+            'imports_s': round(IMPORTS_DONE - PROCESS_STARTED, 3),
+            'serving_s': None,
+            'first_request_s': None,
+            'first_request_tool': None,
+        }
+        self.markdown = MarkdownRenderer(
+            cache_size=MARKDOWN_CACHE_SIZE, max_chars=MARKDOWN_MAX_CHARS
+        )
         self.setup_tools()
 
+    @functools.cached_property
+    def smtp_pool(self):
+        """SMTP connection pool, created (and aiosmtplib imported) on first use."""
+        from smtp_pool import SMTPConnectionPool
+        return SMTPConnectionPool(
+            SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD,
+            size=SMTP_POOL_SIZE,
+            keepalive_interval=SMTP_KEEPALIVE_SECONDS,
+            max_messages_per_connection=SMTP_MAX_MESSAGES_PER_CONNECTION,
+            start_tls=SMTP_STARTTLS,
+            metrics=self.metrics
+        )
+
+    @functools.cached_property
+    def attachment_cache(self):
+        """Attachment spool, created on the first email with attachments."""
+        from attachments import AttachmentCache
+        return AttachmentCache(
+            ATTACHMENT_CACHE_PATH,
+            max_file_bytes=int(MAX_ATTACHMENT_MB * 1024 * 1024),
+            max_message_bytes=int(MAX_MESSAGE_MB * 1024 * 1024),
+            max_cache_bytes=int(ATTACHMENT_CACHE_MB * 1024 * 1024)
+        )
+
+    @functools.cached_property
+    def frontmatter(self):
+        """Frontmatter reader, created (and PyYAML imported) on the first queue check."""
+        from frontmatter import FrontmatterCache
+        return FrontmatterCache()
+
+    @functools.cached_property
+    def sent_ledger(self):
+        """Sent-mail ledger, created on the first send or lookup."""
+        from sent_ledger import SentLedger
+        return SentLedger(SENT_LEDGER_PATH)
+
+    @functools.cached_property
+    def queue_watcher(self):
+        """Ready_To_Send watcher, created when it is started."""
+        from queue_watcher import ReadyQueueWatcher
+        return ReadyQueueWatcher(
+            READY_TO_SEND_PATH, self.check_queue, window=QUEUE_BATCH_WINDOW_SECONDS
+        )
+
     def setup_tools(self):
         """Set up MCP tools."""
-        self.server.tool("send_email")(self.send_email)
-        self.server.tool("draft_email")(self.draft_email)
-        self.server.tool("check_queue")(self.check_queue)
+        tools = {
+            "send_email": self.send_email,
+            "draft_email": self.draft_email,
+            "check_queue": self.check_queue,
+            "get_metrics": self.get_metrics,
+            "find_sent_email": self.find_sent_email,
+        }
+        for name, handler in tools.items():
+            self.server.tool(name)(self._track_first_request(name, handler))
+
+    def _track_first_request(self, name: str, handler):
+        """Wrap a tool handler to record time-to-first-request."""
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            if self.startup['first_request_s'] is None:
+                self.startup['first_request_s'] = round(time.perf_counter() - PROCESS_STARTED, 3)
+                self.startup['first_request_tool'] = name
+                logger.info(f"First MCP request ({name}) {self.startup['first_request_s']}s after start")
+            return await handler(*args, **kwargs)
+        return wrapper
 
     async def send_email(self, to: str, subject: str, body: str,
                         cc: Optional[str] = None, bcc: Optional[str] = None,
@@ -70,46 +234,26 @@ class EmailSenderServer:
             attachments: File paths to attach (comma-separated)
 
         Returns:
-            JSON string with message_id and timestamp
+            JSON string with message_id and timestamp, or an error with
+            retry_after seconds when the rate limit would wait too long
         """
         try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{SMTP_FROM_NAME} <{SMTP_FROM}>"
-            msg['To'] = to
-
-            if cc:
-                msg['Cc'] = cc
-            if bcc:
-                msg['Bcc'] = bcc
-
-            # Add body
-            # Check if body is markdown (contains markdown syntax)
-            if any(md in body for md in ['#', '**', '*', '```', '- ']):
-                # For markdown, send as HTML (simple conversion)
-                html_body = self._markdown_to_html(body)
-                part1 = MIMEText(body, 'plain')
-                part2 = MIMEText(html_body, 'html')
-                msg.attach(part1)
-                msg.attach(part2)
-            else:
-                # Plain text
-                msg.attach(MIMEText(body, 'plain'))
-
-            # Add attachments
-            if attachments:
-                for att_path in attachments.split(','):
-                    att_path = att_path.strip()
-                    if Path(att_path).exists():
-                        self._add_attachment(msg, att_path)
+            await self.rate_limiter.acquire(SMTP_USERNAME, to, cc, bcc,
+                                            timeout=RATE_LIMIT_MAX_WAIT_SECONDS)
+        except RateLimited as e:
+            logger.warning(f"send_email to {to} refused: {e}")
+            return json.dumps({
+                'success': False,
+                'error': f"{e}; nothing was sent",
+                'retry_after': round(e.retry_after, 1),
+                'timestamp': datetime.now().isoformat()
+            })
 
-            # Send email
-            await self._send_via_smtp(msg)
+        try:
+            message_id = await self._deliver_email(to, subject, body, cc, bcc, attachments)
 
-            # Log to Done/
-            message_id = self._generate_message_id()
-            self._log_sent_email(to, subject, message_id)
+            # Record in the sent ledger
+            self._log_sent_email(to, subject, message_id, cc=cc, bcc=bcc, source='send_email')
 
             return json.dumps({
                 'success': True,
@@ -125,6 +269,71 @@ class EmailSenderServer:
                 'timestamp': datetime.now().isoformat()
             })
 
+    async def _deliver_email(self, to: str, subject: str, body: str,
+                             cc: Optional[str] = None, bcc: Optional[str] = None,
+                             attachments: Optional[str] = None,
+                             message_id: Optional[str] = None,
+                             html_body: Optional[str] = None) -> str:
+        """
+        Build and send one email without rate limiting or logging.
+
+        html_body, when given, is used instead of rendering the body.
+
+        Returns:
+            The message ID
+
+        Raises:
+            Exception: Whatever building or SMTP delivery raised
+        """
+        message_id = message_id or self._generate_message_id()
+        msg = await self._build_email(to, subject, body, cc, bcc, attachments, message_id, html_body)
+        await self._send_via_smtp(msg)
+        return message_id
+
+    async def _build_email(self, to: str, subject: str, body: str, cc: Optional[str],
+                           bcc: Optional[str], attachments: Optional[str],
+                           message_id: str, html_body: Optional[str] = None) -> MIMEBase:
+        """Build the MIME message for one email."""
+        # Resolve attachments first (hashing/encoding runs in a worker thread, off the event loop)
+        parts = []
+        if attachments:
+            for att_path in attachments.split(','):
+                att_path = att_path.strip()
+                if await asyncio.to_thread(Path(att_path).exists):
+                    parts.append(await asyncio.to_thread(self.attachment_cache.part_for, att_path))
+            self.attachment_cache.check_message_size(parts)
+
+        # Body: plain text, or plain + HTML alternatives when the body is markdown
+        if html_body is None and self.markdown.is_markdown(body):
+            html_body = self.markdown.render(body)
+        if html_body:
+            body_part = MIMEMultipart('alternative')
+            body_part.attach(MIMEText(body, 'plain', 'utf-8'))
+            body_part.attach(MIMEText(html_body, 'html', 'utf-8'))
+        else:
+            body_part = MIMEText(body, 'plain', 'utf-8')
+
+        # Attachments go beside the body in multipart/mixed, never inside the alternatives
+        if parts:
+            msg = MIMEMultipart('mixed')
+            msg.attach(body_part)
+            for part in parts:
+                msg.attach(part)
+        else:
+            msg = body_part
+
+        msg['Subject'] = subject
+        msg['From'] = f"{SMTP_FROM_NAME} <{SMTP_FROM}>"
+        msg['To'] = to
+        msg['Message-ID'] = f"<{message_id}>"
+
+        if cc:
+            msg['Cc'] = cc
+        if bcc:
+            msg['Bcc'] = bcc
+
+        return msg
+
     async def draft_email(self, to: str, subject: str, body: str,
                           save_to: Optional[str] = None) -> str:
         """
@@ -208,67 +417,91 @@ None
         Check Ready_To_Send/Email/ folder and send all approved emails.
 
         Returns:
-            JSON string with results
+            JSON string with results ('busy': true if a drain is already
+            running, with its progress when it runs in this process)
         """
+        if self._drain_lock.locked():
+            # Answer at once instead of waiting out a long drain
+            return json.dumps({
+                'success': True,
+                'busy': True,
+                'checked': datetime.now().isoformat(),
+                'sent': [],
+                'progress': self.drain_progress()
+            })
+
+        async with self._drain_lock:
+            with self.outbox.drain_lock() as acquired:
+                if not acquired:
+                    logger.info("Another process is draining Ready_To_Send/Email/, skipping")
+                    return json.dumps({
+                        'success': True,
+                        'busy': True,
+                        'checked': datetime.now().isoformat(),
+                        'sent': []
+                    })
+                # Pick up sends journaled by the scheduler or another server
+                await asyncio.to_thread(self.outbox.refresh)
+                try:
+                    return await self._drain_queue()
+                finally:
+                    if self._drain_status and self._drain_status['finished'] is None:
+                        self._drain_status['finished'] = time.monotonic()
+
+    async def _drain_queue(self) -> str:
+        """Send everything due in Ready_To_Send/Email/ (caller holds the drain locks)."""
         try:
             results = {
                 'success': True,
                 'checked': datetime.now().isoformat(),
                 'sent': [],
-                'failed': []
+                'failed': [],
+                'dead_letter': [],
+                'mail_merge': [],
+                'envelope_batches': [],
+                'waiting_retry': 0
             }
 
             # Check if folder exists
             if not READY_TO_SEND_PATH.exists():
                 return json.dumps(results)
 
-            # Get all email files in Ready_To_Send/
-            email_files = list(READY_TO_SEND_PATH.glob("*.md"))
+            self._drain_status = {'started': time.monotonic(), 'queued': None,
+                                  'results': results, 'finished': None}
 
-            if not email_files:
-                return json.dumps(results)
+            # Get due email files in Ready_To_Send/, highest priority first
+            queue, already_sent = await asyncio.to_thread(self._load_queue, results)
+            self._drain_status['queued'] = len(queue) + len(already_sent)
 
-            logger.info(f"Found {len(email_files)} emails to send")
+            # Sent before a crash or archive error: only finish archiving
+            for email_file, key in already_sent:
+                await asyncio.to_thread(self._archive_sent, email_file, self.outbox.get(key), results)
 
-            # Process each email
-            for email_file in email_files:
-                try:
-                    # Read email file
-                    content = email_file.read_text(encoding='utf-8')
-
-                    # Extract metadata
-                    metadata = self._parse_email_metadata(content)
-                    to = metadata.get('to', '')
-                    subject = metadata.get('subject', '')
-                    body = self._extract_email_body(content)
-
-                    # Send email
-                    result = json.loads(await self.send_email(to, subject, body))
-
-                    if result.get('success'):
-                        # Move to Done/
-                        done_filename = f"{datetime.now().strftime('%Y-%m-%d')}_sent_{email_file.name}"
-                        done_path = DONE_PATH / done_filename
-                        email_file.rename(done_path)
-
-                        results['sent'].append({
-                            'original': str(email_file.name),
-                            'done_file': str(done_filename),
-                            'message_id': result.get('message_id')
-                        })
-                        logger.info(f"Sent and archived: {email_file.name}")
-                    else:
-                        results['failed'].append({
-                            'file': str(email_file.name),
-                            'error': result.get('error')
-                        })
-
-                except Exception as e:
-                    logger.error(f"Error processing {email_file.name}: {e}")
-                    results['failed'].append({
-                        'file': str(email_file.name),
-                        'error': str(e)
-                    })
+            if not queue:
+                return json.dumps(results)
+
+            logger.info(f"Found {len(queue)} emails to send (concurrency {SEND_CONCURRENCY})")
+            stats_before = dict(self.smtp_pool.stats)
+            renders_before = dict(self.markdown.stats)
+
+            # Send concurrently; tasks start in priority order
+            # Files carrying the same email become one message with several envelope recipients
+            from envelope_batch import group_identical
+            groups = await asyncio.to_thread(group_identical, queue, ENVELOPE_BATCH_MAX_RCPT)
+
+            slots = asyncio.Semaphore(SEND_CONCURRENCY)
+            await asyncio.gather(*(self._send_group(group, slots, results) for group in groups))
+
+            results['smtp_connections_opened'] = (
+                self.smtp_pool.stats['connections_opened'] - stats_before['connections_opened']
+            )
+            results['markdown_renders'] = self.markdown.stats['renders'] - renders_before['renders']
+            results['markdown_cache_hits'] = (
+                self.markdown.stats['cache_hits'] - renders_before['cache_hits']
+            )
+            await asyncio.to_thread(self.write_metrics_snapshot)
+            if SENT_ROLLUP and (results['sent'] or results['mail_merge']):
+                await asyncio.to_thread(self.write_sent_rollup)
 
             return json.dumps(results)
 
@@ -280,99 +513,627 @@ None
                 'timestamp': datetime.now().isoformat()
             })
 
-    async def _send_via_smtp(self, msg: MIMEMultipart):
-        """Send message via SMTP."""
+    def drain_progress(self) -> Optional[dict]:
+        """Progress of the running (or last) queue drain in this process."""
+        status = self._drain_status
+        if status is None:
+            return None
+        results = status['results']
+        finished = status['finished']
+        done = len(results['sent']) + len(results['failed']) + len(results['dead_letter'])
+        return {
+            'running': finished is None,
+            'queued': status['queued'],
+            'done': done,
+            'sent': len(results['sent']),
+            'failed': len(results['failed']),
+            'dead_letter': len(results['dead_letter']),
+            'elapsed_s': round((finished or time.monotonic()) - status['started'], 1),
+        }
+
+    async def drain_in_background(self):
+        """
+        Drain the queue left from before startup while the server is
+        already answering requests, logging progress every
+        DRAIN_PROGRESS_SECONDS.
+        """
+        reporter = asyncio.create_task(self._log_drain_progress())
+        try:
+            result = json.loads(await self.check_queue())
+        finally:
+            reporter.cancel()
+        progress = self.drain_progress()
+        if result.get('busy'):
+            logger.info("Startup queue drain skipped: another process is draining Ready_To_Send/Email/")
+        elif progress and not progress['running']:
+            logger.info(f"Startup queue drain finished: {progress['sent']} sent, {progress['failed']} failed, "
+                        f"{progress['dead_letter']} dead-lettered in {progress['elapsed_s']}s")
+        else:
+            logger.info(f"Startup queue drain: {len(result.get('sent', []))} sent")
+
+    async def _log_drain_progress(self):
+        while True:
+            await asyncio.sleep(DRAIN_PROGRESS_SECONDS)
+            progress = self.drain_progress()
+            if progress and progress['running'] and progress['queued'] is not None:
+                logger.info(f"Queue drain: {progress['done']}/{progress['queued']} done "
+                            f"({progress['sent']} sent, {progress['failed']} failed) "
+                            f"after {progress['elapsed_s']}s")
+
+    async def stop_draining(self):
+        """
+        Let in-flight sends finish and leave the rest queued for the next
+        check; a cancelled send could not tell whether it was delivered.
+        """
+        self._stopping.set()
+        async with self._drain_lock:
+            pass
+
+    async def _unless_stopping(self, wait) -> bool:
+        """Await a rate limit wait unless shutdown starts first; True if it completed."""
+        if self._stopping.is_set():
+            wait.close()
+            return False
+        waiter = asyncio.ensure_future(wait)
+        stopper = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait((waiter, stopper), return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if not waiter.done():
+            # Tokens are taken for every bucket at once when the wait ends,
+            # so a cancelled wait took none
+            waiter.cancel()
+            return False
+        return True
+
+    async def get_metrics(self) -> str:
+        """
+        Report send counters and per-stage SMTP latency since startup.
+
+        Stages: pool_wait (waiting for a free connection), dns, connect
+        (TCP), greeting, starttls, auth, noop (keepalive) and data (the
+        MAIL/RCPT/DATA transaction).
+
+        Returns:
+            JSON string with counters, stage histograms and pool/cache stats
+        """
+        return json.dumps(self._metrics_report())
+
+    def _metrics_report(self) -> dict:
+        report = self.metrics.snapshot()
+        report['pool'] = dict(self.smtp_pool.stats, size=self.smtp_pool.size,
+                              idle=self.smtp_pool.idle_connections)
+        # Not created until the first attachment / watcher start
+        loaded = self.__dict__
+        report['attachments'] = dict(loaded['attachment_cache'].stats) if 'attachment_cache' in loaded else {}
+        report['markdown'] = dict(self.markdown.stats)
+        report['queue_watcher'] = dict(loaded['queue_watcher'].stats) if 'queue_watcher' in loaded else {}
+        report['queue_drain'] = self.drain_progress()
+        report['startup'] = dict(self.startup)
+        return report
+
+    def write_metrics_snapshot(self):
+        """Append the current metrics to the snapshot file."""
         try:
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.starttls()
-                server.login(SMTP_USERNAME, SMTP_PASSWORD)
-                server.send_message(msg)
-                logger.info("Email sent successfully via SMTP")
+            METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with open(METRICS_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self._metrics_report()) + '\n')
+        except OSError as e:
+            logger.error(f"Error writing metrics snapshot: {e}")
+
+    async def snapshot_metrics_periodically(self):
+        """Write a metrics snapshot every METRICS_SNAPSHOT_SECONDS until cancelled."""
+        while True:
+            await asyncio.sleep(METRICS_SNAPSHOT_SECONDS)
+            await asyncio.to_thread(self.write_metrics_snapshot)
+
+    async def find_sent_email(self, message_id: Optional[str] = None,
+                              recipient: Optional[str] = None, days: int = 30) -> str:
+        """
+        Look up sent emails by Message-ID or recipient address.
+
+        Args:
+            message_id: Message-ID returned by send_email
+            recipient: Recipient email address
+            days: Days of history to search (default: 30)
+
+        Returns:
+            JSON string with matching ledger records, newest first
+        """
+        records = await asyncio.to_thread(
+            self.sent_ledger.find, message_id=message_id, recipient=recipient, days=days
+        )
+        return json.dumps({'count': len(records), 'records': records})
+
+    def _load_queue(self, results: dict) -> tuple:
+        """
+        Scan Ready_To_Send/Email/ against the outbox journal.
+
+        Files waiting for a retry are skipped without being read. Files the
+        journal marks as sent are returned separately so they are archived,
+        not sent again.
+
+        Returns:
+            Tuple of (queue, already_sent): queue is a list of
+            (path, key, metadata, document) ordered by priority, then age;
+            already_sent is a list of (path, key)
+        """
+        queue = []
+        already_sent = []
+        for email_file in READY_TO_SEND_PATH.glob("*.md"):
+            try:
+                key = self.outbox.key_for(email_file)
+                entry = self.outbox.get(key)
+
+                if entry and entry['state'] == SENT:
+                    already_sent.append((email_file, key))
+                    continue
+                if entry and entry['state'] == SENDING and 'merge_next' in entry:
+                    # Mail merge interrupted mid-campaign: resume from its checkpoint
+                    pass
+                elif entry and entry['state'] == SENDING:
+                    # A crash mid-send: it may have gone out, so a human
+                    # decides instead of risking a duplicate
+                    self._dead_letter(email_file, key,
+                                      'interrupted while sending; may already be delivered', results)
+                    continue
+                if entry and entry['state'] == DEAD:
+                    # Moved back from Dead_Letter by a human: start over
+                    entry = self.outbox.record(key, QUEUED, attempts=0, error=None)
+                if entry and entry['state'] != SENDING and not self.outbox.is_due(entry):
+                    results['waiting_retry'] += 1
+                    continue
+
+                if not entry:
+                    self.outbox.record(key, QUEUED, file=email_file.name)
+
+                # Header only; the body is read when the email is sent
+                doc = self.frontmatter.read(email_file)
+                queue.append((email_file, key, doc.metadata, doc))
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error(f"Error reading {email_file.name}: {e}")
+
+        def sort_key(item):
+            _, _, metadata, doc = item
+            priority = PRIORITY_ORDER.get(str(metadata.get('priority', '')).lower(), PRIORITY_ORDER['normal'])
+            return priority, doc.mtime
+
+        return sorted(queue, key=sort_key), already_sent
+
+    def _send_group(self, group: list, slots: asyncio.Semaphore, results: dict):
+        """Coroutine sending one group from group_identical()."""
+        if len(group) > 1:
+            return self._send_envelope_batch(group, slots, results)
+        email_file, key, metadata, doc = group[0]
+        from mail_merge import MAIL_MERGE_TYPE
+        if metadata.get('type') == MAIL_MERGE_TYPE:
+            return self._send_merge_job(email_file, key, metadata, doc, slots, results)
+        return self._send_queued_email(email_file, key, metadata, doc, slots, results)
+
+    async def _send_envelope_batch(self, group: list, slots: asyncio.Semaphore, results: dict):
+        """
+        Send queued files carrying the same email as one SMTP transaction.
+
+        The message goes to every file's recipient as a separate RCPT TO
+        under `To: undisclosed-recipients:;`, so no recipient sees the
+        others. Each file keeps its own outbox entry: recipients the server
+        refuses are dead-lettered, the rest are archived as sent. If the
+        batched send fails before DATA, each file is sent on its own; if
+        the connection fails after DATA began, the server may have
+        delivered it, so the whole batch is dead-lettered instead.
+        """
+        from envelope_batch import UNDISCLOSED_RECIPIENTS, single_address
+        from smtp_pool import DeliveryUnknownError
+
+        first_file, first_key, metadata, doc = group[0]
+        subject = metadata.get('subject', '')
+        attachments = metadata.get('attachments')
+        if isinstance(attachments, list):
+            attachments = ','.join(attachments)
+        addresses = [single_address(str(m.get('to', ''))) for _, _, m, _ in group]
+
+        if not await self._unless_stopping(self.rate_limiter.acquire_batch(SMTP_USERNAME, addresses)):
+            return
+
+        async with slots:
+            if self._stopping.is_set():
+                return
+            previous = {key: (self.outbox.get(key) or {}).get('attempts', 0) for _, key, _, _ in group}
+            for email_file, key, _, _ in group:
+                await asyncio.to_thread(
+                    self.outbox.record, key, SENDING, file=email_file.name, attempts=previous[key] + 1
+                )
+
+            message_id = f"{first_key}@ai-employee"
+            try:
+                body = await asyncio.to_thread(lambda: doc.body)
+                msg = await self._build_email(UNDISCLOSED_RECIPIENTS, subject, body, None, None,
+                                              attachments, message_id)
+                refused = await self._send_via_smtp(msg, recipients=addresses)
+            except DeliveryUnknownError as e:
+                logger.error(f"Batched send of {len(group)} copies of {first_file.name} may have been "
+                             f"delivered ({e}); dead-lettering them instead of resending")
+                for email_file, key, _, _ in group:
+                    await asyncio.to_thread(self.outbox.record, key, DEAD, error=str(e))
+                    await asyncio.to_thread(self._dead_letter, email_file, key, str(e), results)
+                return
+            except Exception as e:
+                refused = None
+                logger.warning(f"Batched send of {len(group)} copies of {first_file.name} failed ({e}); "
+                               f"sending them separately")
+                for _, key, _, _ in group:
+                    await asyncio.to_thread(self.outbox.record, key, QUEUED, attempts=previous[key])
+
+        if refused is None:
+            await asyncio.gather(*(
+                self._send_queued_email(email_file, key, m, d, slots, results)
+                for email_file, key, m, d in group
+            ))
+            return
+
+        self.metrics.count('envelope_batches')
+        self.metrics.count('batched_recipients', len(group))
+        refused = {address.lower(): response for address, response in refused.items()}
+        results['envelope_batches'].append({
+            'message_id': message_id,
+            'recipients': len(group) - len(refused),
+            'refused': len(refused)
+        })
+
+        for (email_file, key, m, _), address in zip(group, addresses):
+            response = refused.get(address.lower())
+            if response is not None:
+                error = f"recipient refused: {response.code} {response.message}"
+                await asyncio.to_thread(self.outbox.record, key, DEAD, error=error)
+                await asyncio.to_thread(self._dead_letter, email_file, key, error, results)
+                continue
+            entry = await asyncio.to_thread(
+                self.outbox.record, key, SENT, message_id=message_id, to=m.get('to', ''), subject=subject
+            )
+            await asyncio.to_thread(self._archive_sent, email_file, entry, results)
+
+    async def _send_queued_email(self, email_file: Path, key: str, metadata: dict,
+                                 doc: 'FrontmatterDocument', slots: asyncio.Semaphore, results: dict):
+        """Send one queued file through the outbox state machine."""
+        to = metadata.get('to', '')
+        subject = metadata.get('subject', '')
+        attachments = metadata.get('attachments')
+        if isinstance(attachments, list):
+            attachments = ','.join(attachments)
+
+        # Wait for rate limit tokens before taking a slot, so throttled
+        # domains don't hold up sends to other domains
+        if not await self._unless_stopping(self.rate_limiter.acquire(SMTP_USERNAME, to)):
+            return
+
+        async with slots:
+            if self._stopping.is_set():
+                # Shutting down: still QUEUED, the next queue check sends it
+                return
+            previous = self.outbox.get(key) or {}
+            attempts = previous.get('attempts', 0) + 1
+            if attempts > 1:
+                self.metrics.count('retried')
+            await asyncio.to_thread(
+                self.outbox.record, key, SENDING, file=email_file.name, attempts=attempts
+            )
+
+            try:
+                body = await asyncio.to_thread(lambda: doc.body)
+                message_id = await self._deliver_email(
+                    to, subject, body, attachments=attachments,
+                    message_id=f"{key}@ai-employee"
+                )
+            except Exception as e:
+                logger.error(f"Error sending {email_file.name} (attempt {attempts}): {e}")
+                if self._is_permanent_failure(e) or attempts >= self.outbox.max_attempts:
+                    await asyncio.to_thread(self.outbox.record, key, DEAD, error=str(e))
+                    await asyncio.to_thread(self._dead_letter, email_file, key, str(e), results)
+                else:
+                    next_attempt = datetime.now().timestamp() + self.outbox.retry_delay(attempts)
+                    await asyncio.to_thread(
+                        self.outbox.record, key, FAILED, error=str(e), next_attempt=next_attempt
+                    )
+                    results['failed'].append({
+                        'file': str(email_file.name),
+                        'error': str(e),
+                        'attempts': attempts,
+                        'retry_at': datetime.fromtimestamp(next_attempt).isoformat()
+                    })
+                return
+
+            entry = await asyncio.to_thread(
+                self.outbox.record, key, SENT, message_id=message_id, to=to, subject=subject
+            )
+
+        await asyncio.to_thread(self._archive_sent, email_file, entry, results)
+
+    async def _send_merge_job(self, email_file: Path, key: str, metadata: dict,
+                              doc: 'FrontmatterDocument', slots: asyncio.Semaphore, results: dict):
+        """
+        Send a mail merge job: one template file plus a recipient list.
+
+        The job file's frontmatter has `type: mail_merge` and `recipients:`
+        (a .csv or .jsonl path, relative to the job file); `{{field}}`
+        placeholders in the subject and body are filled per recipient (a
+        markdown body is rendered once and filled with HTML-escaped values).
+        Recipients are streamed, sent through the shared slots, and the
+        outbox entry records a checkpoint so a stopped or failed run
+        resumes where it left off. A run that was interrupted mid-send
+        also skips rows whose Message-ID is already in the sent ledger,
+        since they may have gone out after the last checkpoint. Bad rows
+        and refused recipients are
+        appended to Dead_Letter/Email/<job>.failed_recipients.jsonl (itself
+        a valid recipient list); any other error stops the job for retry.
+        """
+        import aiosmtplib
+        from attachments import AttachmentTooLarge
+        from mail_merge import (MergeProgress, fill, fill_html, iter_recipients, recipient_address,
+                                render_template, resolve_recipients)
+
+        entry = self.outbox.get(key) or {}
+        attempts = entry.get('attempts', 0) + 1
+        # Only a crash leaves the checkpoint behind the rows actually sent
+        crashed = entry.get('state') == SENDING
+        progress = MergeProgress(entry.get('merge_next', 0), entry.get('merge_sent', 0),
+                                 entry.get('merge_failed', 0), entry.get('merge_done_ahead', ()))
+        subject_template = str(metadata.get('subject', ''))
+        attachments = metadata.get('attachments')
+        if isinstance(attachments, list):
+            attachments = ','.join(attachments)
+
+        recipients = resolve_recipients(email_file, str(metadata.get('recipients', '')))
+        if not metadata.get('recipients') or not recipients.is_file():
+            await asyncio.to_thread(self._dead_letter, email_file, key,
+                                    f"recipient list not found: {recipients}", results)
+            return
+
+        failures_path = DEAD_LETTER_PATH / f"{email_file.stem}.failed_recipients.jsonl"
+
+        def record_failure(line: str):
+            DEAD_LETTER_PATH.mkdir(parents=True, exist_ok=True)
+            with open(failures_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+        errors = []
+        pending = set()
+        started_at = progress.next_index
+        checkpoint_at = progress.next_index
+
+        async def send_one(index: int, row: Optional[dict]):
+            try:
+                if row is None:
+                    raise ValueError("unparseable recipient row")
+                to = recipient_address(row)
+                if not to:
+                    raise ValueError("recipient row has no email address")
+                subject = fill(subject_template, row)
+                message_id = await self._deliver_email(
+                    to, subject, fill(body_template, row),
+                    attachments=attachments, message_id=f"{key}-{index}@ai-employee",
+                    html_body=fill_html(html_template, row) if html_template else None
+                )
+                progress.finish(index, sent=True)
+                await asyncio.to_thread(self._log_sent_email, to, subject, message_id,
+                                        source=f"{email_file.name}#{index}")
+            except AttachmentTooLarge as e:
+                errors.append(e)
+            except (ValueError, aiosmtplib.SMTPRecipientsRefused) as e:
+                # This recipient only: record it and carry on with the rest
+                progress.finish(index, sent=False)
+                await asyncio.to_thread(
+                    record_failure, json.dumps(dict(row or {}, _index=index, _error=str(e))) + '\n'
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                slots.release()
+
+        try:
+            body_template = await asyncio.to_thread(lambda: doc.body)
+            # Render the markdown once for the whole job; rows only fill in values
+            html_template = (render_template(body_template, self.markdown.render)
+                             if self.markdown.is_markdown(body_template) else None)
+            await asyncio.to_thread(
+                self.outbox.record, key, SENDING, file=email_file.name, attempts=attempts,
+                merge_next=progress.next_index
+            )
+
+            rows = iter_recipients(recipients, progress.next_index)
+            try:
+                for index, row in rows:
+                    if errors:
+                        break
+                    if progress.is_finished(index):
+                        continue
+                    if crashed and await asyncio.to_thread(
+                            self.sent_ledger.find, message_id=f"{key}-{index}@ai-employee"):
+                        progress.finish(index, sent=True)
+                        continue
+                    if MAIL_MERGE_MAX_PER_RUN and index - started_at >= MAIL_MERGE_MAX_PER_RUN:
+                        break
+
+                    if not await self._unless_stopping(
+                            self.rate_limiter.acquire(SMTP_USERNAME, recipient_address(row or {}))):
+                        break
+                    await slots.acquire()
+                    if errors or self._stopping.is_set():
+                        slots.release()
+                        break
+                    task = asyncio.create_task(send_one(index, row))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+
+                    if progress.next_index - checkpoint_at >= MAIL_MERGE_CHECKPOINT_EVERY:
+                        checkpoint_at = progress.next_index
+                        await asyncio.to_thread(
+                            self.outbox.record, key, SENDING, **progress.checkpoint()
+                        )
+                        logger.info(f"Mail merge {email_file.name}: {progress.sent} sent, "
+                                    f"{progress.failed} failed, next row {progress.next_index}")
+                else:
+                    rows = None
+            finally:
+                if rows is not None:
+                    rows.close()
+                if pending:
+                    await asyncio.gather(*pending)
+            finished = rows is None and not errors
         except Exception as e:
-            logger.error(f"SMTP error: {e}")
-            raise
+            errors.append(e)
+            finished = False
+
+        checkpoint = progress.checkpoint()
+        summary = {'file': str(email_file.name), 'sent': progress.sent,
+                   'failed': progress.failed, 'next_row': progress.next_index}
+
+        if errors:
+            error = errors[0]
+            logger.error(f"Mail merge {email_file.name} stopped at row {progress.next_index} "
+                         f"(attempt {attempts}): {error}")
+            if self._is_permanent_failure(error) or attempts >= self.outbox.max_attempts:
+                await asyncio.to_thread(self.outbox.record, key, DEAD, error=str(error), **checkpoint)
+                await asyncio.to_thread(self._dead_letter, email_file, key, str(error), results)
+            else:
+                next_attempt = datetime.now().timestamp() + self.outbox.retry_delay(attempts)
+                await asyncio.to_thread(
+                    self.outbox.record, key, FAILED, error=str(error), next_attempt=next_attempt,
+                    **checkpoint
+                )
+                results['failed'].append(dict(summary, error=str(error), attempts=attempts,
+                                              retry_at=datetime.fromtimestamp(next_attempt).isoformat()))
+            results['mail_merge'].append(dict(summary, status='stopped'))
+            return
+
+        if not finished:
+            # Per-run limit reached: the next queue check continues from the checkpoint
+            await asyncio.to_thread(self.outbox.record, key, QUEUED, attempts=0, **checkpoint)
+            results['mail_merge'].append(dict(summary, status='in_progress'))
+            return
+
+        entry = await asyncio.to_thread(
+            self.outbox.record, key, SENT, message_id=f"{key}@ai-employee",
+            to=f"{progress.sent} recipients ({recipients.name})", subject=subject_template,
+            **checkpoint
+        )
+        results['mail_merge'].append(dict(summary, status='complete'))
+        await asyncio.to_thread(self._archive_sent, email_file, entry, results)
+
+    def _archive_sent(self, email_file: Path, entry: dict, results: dict):
+        """
+        Move a sent file to Done/ and log it; failures here never trigger a resend.
 
-    def _markdown_to_html(self, markdown: str) -> str:
-        """Convert simple markdown to HTML."""
-        html = markdown
-        # Simple conversions
-        html = html.replace('**', '<strong>').replace('*', '<strong>')
-        html = html.replace('\n\n', '</p><p>')
-        html = html.replace('\n', '<br>')
-        return f"<p>{html}</p>"
-
-    def _add_attachment(self, msg: MIMEMultipart, file_path: str):
-        """Add attachment to message."""
-        with open(file_path, 'rb') as f:
-            part = MIMEApplication(f.read(), Name=Path(file_path).name)
-            part['Content-Disposition'] = f'attachment; filename="{Path(file_path).name}"'
-            msg.attach(part)
+        Blocking file I/O: call it through asyncio.to_thread from the loop.
+        """
+        try:
+            done_filename = f"{datetime.now().strftime('%Y-%m-%d')}_sent_{email_file.name}"
+            email_file.rename(DONE_PATH / done_filename)
+            if 'merge_next' not in entry:
+                # Mail merge recipients were recorded as each was sent
+                self._log_sent_email(entry.get('to', ''), entry.get('subject', ''), entry['message_id'],
+                                     source=email_file.name)
+
+            results['sent'].append({
+                'original': str(email_file.name),
+                'done_file': str(done_filename),
+                'message_id': entry['message_id']
+            })
+            logger.info(f"Sent and archived: {email_file.name}")
+        except Exception as e:
+            logger.error(f"Sent {email_file.name} but could not archive it (will retry archive only): {e}")
+            results['failed'].append({
+                'file': str(email_file.name),
+                'error': f"sent, archive failed: {e}"
+            })
 
-    def _generate_message_id(self) -> str:
-        """Generate unique message ID."""
-        import uuid
-        return f"{uuid.uuid4()}@ai-employee"
+    def _dead_letter(self, email_file: Path, key: str, reason: str, results: dict):
+        """
+        Move an email that will not be retried to Dead_Letter/Email/ with an error note.
 
-    def _log_sent_email(self, to: str, subject: str, message_id: str):
-        """Log sent email to Done/ folder."""
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        log_filename = f"{timestamp}_sent_email.md"
-        log_path = DONE_PATH / log_filename
-
-        log_content = f"""---
-type: sent_email
-sent: {datetime.now().isoformat()}
-message_id: {message_id}
-status: sent
+        Blocking file I/O: call it through asyncio.to_thread from the loop.
+        """
+        try:
+            DEAD_LETTER_PATH.mkdir(parents=True, exist_ok=True)
+            email_file.rename(DEAD_LETTER_PATH / email_file.name)
+            entry = self.outbox.get(key) or {}
+            note = DEAD_LETTER_PATH / f"{email_file.stem}.error.md"
+            note.write_text(f"""---
+type: email_dead_letter
+file: {email_file.name}
+idempotency_key: {key}
+attempts: {entry.get('attempts', 0)}
+failed: {datetime.now().isoformat()}
 ---
 
-# Email Sent: {subject}
+# Email Not Sent: {email_file.name}
 
-## Details
-- **To:** {to}
-- **From:** {SMTP_FROM}
-- **Subject:** {subject}
-- **Sent:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- **Message ID:** {message_id}
+## Reason
+{reason}
+
+## Next Steps
+- Fix the problem, then move the email back to Ready_To_Send/Email/ to retry
+- Check the recipient's inbox first if it was interrupted while sending
 
 ---
-*Sent via Email Sender MCP*
-*SMTP: {SMTP_SERVER}:{SMTP_PORT}*
-"""
+*Moved to Dead_Letter by Email Sender*
+""", encoding='utf-8')
+            if entry.get('state') != DEAD:
+                self.outbox.record(key, DEAD, error=reason)
+            logger.warning(f"Dead-lettered {email_file.name}: {reason}")
+        except Exception as e:
+            logger.error(f"Could not dead-letter {email_file.name}: {e}")
+
+        results['dead_letter'].append({'file': str(email_file.name), 'error': reason})
 
-        with open(log_path, 'w', encoding='utf-8') as f:
-            f.write(log_content)
+    @staticmethod
+    def _is_permanent_failure(error: Exception) -> bool:
+        """
+        5xx replies and refused recipients will fail again, and a message
+        that may already be delivered must not be resent; everything else
+        is retried.
+        """
+        import aiosmtplib
+        from smtp_pool import DeliveryUnknownError
 
-    def _parse_email_metadata(self, content: str) -> dict:
-        """Parse YAML frontmatter from email file."""
-        metadata = {}
-        in_frontmatter = False
-        frontmatter_lines = []
+        if isinstance(error, (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPSenderRefused,
+                              ValueError, DeliveryUnknownError)):
+            return True
+        code = getattr(error, 'code', None)
+        return isinstance(code, int) and 500 <= code < 600
 
-        for line in content.split('\n'):
-            if line.strip() == '---':
-                if not in_frontmatter:
-                    in_frontmatter = True
-                    continue
-                else:
-                    break
-            if in_frontmatter:
-                frontmatter_lines.append(line)
+    async def _send_via_smtp(self, msg: MIMEBase, recipients: Optional[List[str]] = None) -> Dict:
+        """
+        Send message via a pooled, non-blocking SMTP connection.
+
+        Returns:
+            Recipients refused while the others were accepted
+        """
+        try:
+            refused = await self.smtp_pool.send(msg, recipients=recipients)
+            logger.info("Email sent successfully via SMTP")
+            return refused
+        except Exception as e:
+            logger.error(f"SMTP error: {e}")
+            raise
 
-        for line in frontmatter_lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
+    def _generate_message_id(self) -> str:
+        """Generate unique message ID."""
+        import uuid
+        return f"{uuid.uuid4()}@ai-employee"
 
-        return metadata
+    def _log_sent_email(self, to: str, subject: str, message_id: str, **fields):
+        """Append a sent email to today's ledger file (Logs/Email/sent_<date>.jsonl)."""
+        try:
+            self.sent_ledger.append(message_id, to, subject, **fields)
+        except OSError as e:
+            logger.error(f"Error recording sent email {message_id}: {e}")
 
-    def _extract_email_body(self, content: str) -> str:
-        """Extract email body from markdown file."""
-        # Find content after first ---
-        parts = content.split('---', 2)
-        if len(parts) > 2:
-            return parts[2].strip()
-        return content
+    def write_sent_rollup(self):
+        """Rewrite today's markdown summary of sent email in Done/."""
+        today = datetime.now().date()
+        try:
+            self.sent_ledger.write_rollup(today, DONE_PATH / f"{today.isoformat()}_sent_emails.md")
+        except OSError as e:
+            logger.error(f"Error writing sent email rollup: {e}")
 
 
 async def main():
@@ -390,17 +1151,37 @@ async def main():
     # Create server
     server = EmailSenderServer()
 
-    # Check queue on startup
-    logger.info("Checking for emails in Ready_To_Send/...")
-    queue_result = await server.check_queue()
-    logger.info(f"Queue check result: {queue_result}")
+    # Send what is already in Ready_To_Send/ without holding up MCP requests
+    startup_drain = None
+    if STARTUP_DRAIN:
+        logger.info("Draining Ready_To_Send/ in the background...")
+        startup_drain = asyncio.create_task(server.drain_in_background())
+
+    # Send newly approved emails as they arrive instead of on the scheduler's next run
+    if QUEUE_WATCH:
+        server.queue_watcher.start()
 
     # Run server
     logger.info("Starting Email Sender MCP server on stdio...")
-    logger.info("Listening for MCP requests...")
-
-    async with server.server.stdio_server() as streams:
-        await streams[0].drain()
+    server.startup['serving_s'] = round(time.perf_counter() - PROCESS_STARTED, 3)
+    logger.info(f"Listening for MCP requests ({server.startup['serving_s']}s after start, "
+                f"imports {server.startup['imports_s']}s)")
+
+    snapshots = asyncio.create_task(server.snapshot_metrics_periodically())
+    try:
+        async with server.server.stdio_server() as streams:
+            await streams[0].drain()
+    finally:
+        snapshots.cancel()
+        await server.stop_draining()
+        if QUEUE_WATCH:
+            await server.queue_watcher.stop()
+        if startup_drain:
+            await startup_drain
+        if 'smtp_pool' in server.__dict__:
+            # Stops the pool's keepalive task and says QUIT on idle connections
+            await server.smtp_pool.close()
+        server.write_metrics_snapshot()
 
 
 if __name__ == "__main__":
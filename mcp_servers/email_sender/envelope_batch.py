@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Envelope Batching for Email Sender MCP
+Finds queued files that carry the same email (subject, body and
+attachments) for different recipients, so they can go out as one SMTP
+transaction with one RCPT TO per recipient instead of one transaction
+each.
+"""
+import hashlib
+from email.utils import getaddresses
+from typing import Dict, List, Optional, Tuple
+
+from mail_merge import MAIL_MERGE_TYPE
+
+# To header of a batched message, so no recipient sees the others
+UNDISCLOSED_RECIPIENTS = 'undisclosed-recipients:;'
+
+# Batch size for drafts marked `batch: true` when batching is not enabled for all drafts
+OPT_IN_MAX_RECIPIENTS = 50
+
+_FALSE_VALUES = ('false', 'no', '0', 'off')
+_TRUE_VALUES = ('true', 'yes', '1', 'on')
+
+
+def single_address(to: str) -> Optional[str]:
+    """The address if a To value names exactly one recipient, else None."""
+    addresses = [addr for _, addr in getaddresses([to]) if '@' in addr]
+    return addresses[0] if len(addresses) == 1 else None
+
+
+def batch_signature(metadata: Dict, doc, batch_all: bool = False) -> Optional[Tuple]:
+    """
+    Header-only grouping key for a queued file, or None if it must be sent alone.
+
+    Batching replaces the approved To header with undisclosed-recipients,
+    so a file is only batched if it says `batch: true` or batch_all is
+    set. Files with Cc/Bcc, several To addresses, `batch: false` or a mail
+    merge job are never batched; their recipients are meant to be visible
+    or the file is already a bulk send. The body size stands in for the
+    body here; body_digest() confirms a match.
+    """
+    if metadata.get('type') == MAIL_MERGE_TYPE or metadata.get('cc') or metadata.get('bcc'):
+        return None
+    batch = str(metadata.get('batch', '')).strip().lower()
+    if batch in _FALSE_VALUES or not (batch_all or batch in _TRUE_VALUES):
+        return None
+    if not single_address(str(metadata.get('to', ''))):
+        return None
+
+    attachments = metadata.get('attachments') or ''
+    if isinstance(attachments, list):
+        attachments = ','.join(attachments)
+    attachments = ','.join(sorted(a.strip() for a in str(attachments).split(',') if a.strip()))
+    return str(metadata.get('subject', '')), attachments, doc.size - doc.body_offset
+
+
+def body_digest(doc) -> bytes:
+    """Hash of a file's raw body bytes, read without caching the body on the document."""
+    digest = hashlib.sha256()
+    with open(doc.path, 'rb') as f:
+        f.seek(doc.body_offset)
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def group_identical(queue: List[Tuple], max_recipients: int) -> List[List[Tuple]]:
+    """
+    Group queue items that carry the same email.
+
+    Args:
+        queue: (path, key, metadata, document) items in send order
+        max_recipients: Most recipients in one batch; above 1 every identical
+            file is batched, otherwise only files with `batch: true` (up to
+            OPT_IN_MAX_RECIPIENTS)
+
+    Returns:
+        Groups in the order of their first item; a group of one is sent
+        on its own
+    """
+    batch_all = max_recipients > 1
+    if not batch_all:
+        max_recipients = OPT_IN_MAX_RECIPIENTS
+
+    # Cheap header match first; only files that could match have their body hashed
+    candidates: Dict[Tuple, List[int]] = {}
+    for index, (_, _, metadata, doc) in enumerate(queue):
+        signature = batch_signature(metadata, doc, batch_all)
+        if signature is not None:
+            candidates.setdefault(signature, []).append(index)
+
+    keys: List = [None] * len(queue)
+    for signature, indexes in candidates.items():
+        if len(indexes) < 2:
+            continue
+        for index in indexes:
+            try:
+                keys[index] = (signature, body_digest(queue[index][3]))
+            except OSError:
+                pass  # sent alone; the send reports the error
+
+    groups: List[List[Tuple]] = []
+    open_groups: Dict[Tuple, List[Tuple]] = {}
+    for index, item in enumerate(queue):
+        key = keys[index]
+        if key is None:
+            groups.append([item])
+            continue
+        group = open_groups.get(key)
+        if group is None or len(group) >= max_recipients:
+            group = open_groups[key] = []
+            groups.append(group)
+        group.append(item)
+    return groups
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Mail Merge for Email Sender MCP
+Streams recipients from a CSV or JSONL list and fills a template's
+{{field}} placeholders per row, so a campaign is one approved file plus a
+list instead of one vault file per recipient.
+"""
+import csv
+import hashlib
+import html
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+MAIL_MERGE_TYPE = 'mail_merge'
+
+MERGE_FIELD = re.compile(r'\{\{\s*([\w\-]+)\s*\}\}')
+
+
+class MergeFieldMissing(ValueError):
+    """A template placeholder has no value in the recipient row."""
+
+
+def fill(template: str, row: Dict, escape: Callable[[str], str] = str) -> str:
+    """
+    Replace {{field}} placeholders with values from a recipient row.
+
+    Args:
+        template: Text with {{field}} placeholders
+        row: Recipient row
+        escape: Applied to each value (html.escape for an HTML template)
+
+    Raises:
+        MergeFieldMissing: If a placeholder has no (or an empty) value
+    """
+    def substitute(match):
+        value = row.get(match.group(1))
+        if value is None or value == '':
+            raise MergeFieldMissing(f"no value for {{{{{match.group(1)}}}}}")
+        return escape(str(value))
+
+    return MERGE_FIELD.sub(substitute, template)
+
+
+def fill_html(template: str, row: Dict) -> str:
+    """fill() for a template from render_template(): values are HTML-escaped."""
+    return fill(template, row, escape=html.escape)
+
+
+def render_template(template: str, render: Callable[[str], Optional[str]]) -> Optional[str]:
+    """
+    Render a markdown template to HTML once, keeping its placeholders.
+
+    Placeholders are swapped for plain tokens the markdown parser leaves
+    alone and restored afterwards, so each row only needs fill_html().
+    The tokens depend only on the template, so a rerun hits the render cache.
+
+    Returns:
+        HTML with {{field}} placeholders, or None if render() declined
+    """
+    marker = 'mergefield' + hashlib.sha1(template.encode('utf-8')).hexdigest()[:12]
+    fields = []
+
+    def protect(match):
+        fields.append(match.group(0))
+        return f"{marker}x{len(fields) - 1}x"
+
+    rendered = render(MERGE_FIELD.sub(protect, template))
+    if rendered is None:
+        return None
+    return re.sub(marker + r'x(\d+)x', lambda m: fields[int(m.group(1))], rendered)
+
+
+def recipient_address(row: Dict) -> str:
+    """The recipient address of a row: its 'email' column, else 'to'."""
+    return str(row.get('email') or row.get('to') or '').strip()
+
+
+def resolve_recipients(job_file: Path, value: str) -> Path:
+    """Recipient list path from a job's frontmatter; relative paths are relative to the job file."""
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else job_file.parent / path
+
+
+def iter_recipients(path: Path, start: int = 0) -> Iterator[Tuple[int, Optional[Dict]]]:
+    """
+    Yield (index, row) for each recipient from index `start` on.
+
+    The list is read one row at a time. Rows that cannot be parsed are
+    yielded as None so the caller can count them as failed.
+
+    Args:
+        path: .csv file with a header row, or .jsonl with one object per line
+        start: First index to yield (earlier rows are skipped, not parsed)
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.suffix.lower() == '.csv':
+            reader = csv.DictReader(f)
+            for index, row in enumerate(reader):
+                if index >= start:
+                    yield index, {(k or '').strip(): (v or '').strip() for k, v in row.items()}
+            return
+
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if index >= start:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield index, row if isinstance(row, dict) else None
+            index += 1
+
+
+class MergeProgress:
+    """
+    Checkpoint for a running merge job.
+
+    Sends finish out of order, so the checkpoint is the lowest index not
+    yet finished plus the finished indices past it; a resumed job starts
+    there and skips those. After a crash, rows sent since the last
+    journaled checkpoint are found in the sent ledger instead.
+    """
+
+    def __init__(self, start: int = 0, sent: int = 0, failed: int = 0, finished_ahead=()):
+        self.next_index = start
+        self.sent = sent
+        self.failed = failed
+        self._finished_ahead = set(finished_ahead)
+
+    def is_finished(self, index: int) -> bool:
+        return index < self.next_index or index in self._finished_ahead
+
+    def checkpoint(self) -> Dict:
+        """Outbox fields that let a later run resume this job."""
+        return {'merge_next': self.next_index, 'merge_sent': self.sent,
+                'merge_failed': self.failed, 'merge_done_ahead': sorted(self._finished_ahead)}
+
+    def finish(self, index: int, sent: bool):
+        """Mark one recipient finished and advance the checkpoint past finished rows."""
+        if sent:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self._finished_ahead.add(index)
+        while self.next_index in self._finished_ahead:
+            self._finished_ahead.remove(self.next_index)
+            self.next_index += 1
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Markdown Rendering for Email Sender MCP
+Turns markdown email bodies into HTML with inline CSS (mail clients drop
+<style> blocks) and caches the result by body hash, so a templated bulk
+send renders once.
+"""
+import hashlib
+import html
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger('EmailSender.Markdown')
+
+# Constructs that mark a body as markdown; a lone '*' or '#' does not
+MARKDOWN_PATTERN = re.compile(
+    r'^\s{0,3}#{1,6}\s'            # heading
+    r'|^\s*[-*+]\s+\S'             # bullet list
+    r'|^\s*\d+\.\s+\S'             # numbered list
+    r'|^\s{0,3}>\s'                # blockquote
+    r'|^\s*```'                    # code fence
+    r'|\*\*[^*\n]+\*\*'            # bold
+    r'|__[^_\n]+__'                # bold
+    r'|(?<![*\w])\*[^*\s][^*\n]*\*(?![*\w])'  # italic
+    r'|\[[^\]\n]+\]\([^)\s]+\)'    # link
+    r'|`[^`\n]+`',                 # inline code
+    re.MULTILINE
+)
+
+INLINE_STYLES = {
+    'h1': 'font-size:22px;margin:16px 0 8px;',
+    'h2': 'font-size:19px;margin:14px 0 8px;',
+    'h3': 'font-size:16px;margin:12px 0 6px;',
+    'p': 'margin:0 0 12px;',
+    'ul': 'margin:0 0 12px;padding-left:24px;',
+    'ol': 'margin:0 0 12px;padding-left:24px;',
+    'li': 'margin:0 0 4px;',
+    'blockquote': 'margin:0 0 12px;padding-left:12px;border-left:3px solid #ccc;color:#555;',
+    'pre': 'background:#f6f8fa;padding:10px;border-radius:4px;overflow:auto;font-size:13px;',
+    'code': 'font-family:Consolas,Menlo,monospace;background:#f6f8fa;padding:1px 3px;',
+    'a': 'color:#0a66c2;',
+    'table': 'border-collapse:collapse;margin:0 0 12px;',
+    'th': 'border:1px solid #ddd;padding:4px 8px;background:#f6f8fa;',
+    'td': 'border:1px solid #ddd;padding:4px 8px;',
+}
+TAG_PATTERN = re.compile(r'<(' + '|'.join(INLINE_STYLES) + r')(?=[\s>])')
+
+WRAPPER = ('<!DOCTYPE html><html><body style="margin:0;padding:0;">'
+           '<div style="font-family:-apple-system,Segoe UI,Helvetica,Arial,sans-serif;'
+           'font-size:14px;line-height:1.5;color:#222;max-width:680px;">{content}</div>'
+           '</body></html>')
+
+
+class MarkdownRenderer:
+    """Markdown to inline-styled HTML with an LRU cache keyed by body hash."""
+
+    def __init__(self, cache_size: int = 256, max_chars: int = 50_000,
+                 slow_render_ms: float = 50.0):
+        """
+        Initialize renderer.
+
+        Args:
+            cache_size: Rendered bodies kept in memory
+            max_chars: Bodies longer than this are not rendered (sent as plain text)
+            slow_render_ms: Log a warning when one render takes longer than this
+        """
+        self.cache_size = cache_size
+        self.max_chars = max_chars
+        self.slow_render_ms = slow_render_ms
+        self._cache: OrderedDict = OrderedDict()
+        self.stats = {'renders': 0, 'cache_hits': 0, 'skipped_too_large': 0,
+                      'render_ms_total': 0.0, 'render_ms_max': 0.0}
+
+        # One parser reused across renders, built on the first render so
+        # importing python-markdown and its extensions does not slow startup
+        self._parser = None
+        self._parser_loaded = False
+
+    def _load_parser(self):
+        self._parser_loaded = True
+        try:
+            import markdown
+        except ImportError:
+            logger.warning("python-markdown not installed - using basic paragraph rendering")
+            return
+        self._parser = markdown.Markdown(extensions=['extra', 'sane_lists'])
+
+    @staticmethod
+    def is_markdown(body: str) -> bool:
+        """True if the body uses markdown syntax rather than stray symbols."""
+        return bool(MARKDOWN_PATTERN.search(body))
+
+    def render(self, body: str) -> Optional[str]:
+        """
+        Render a markdown body to a complete HTML document.
+
+        Returns:
+            HTML string, or None if the body exceeds max_chars
+        """
+        if len(body) > self.max_chars:
+            self.stats['skipped_too_large'] += 1
+            return None
+
+        key = hashlib.sha256(body.encode('utf-8')).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return cached
+
+        if not self._parser_loaded:
+            self._load_parser()
+
+        started = time.perf_counter()
+        if self._parser is not None:
+            content = self._parser.reset().convert(body)
+        else:
+            content = self._basic_html(body)
+        content = TAG_PATTERN.sub(lambda m: f'<{m.group(1)} style="{INLINE_STYLES[m.group(1)]}"', content)
+        rendered = WRAPPER.format(content=content)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.stats['renders'] += 1
+        self.stats['render_ms_total'] += elapsed_ms
+        self.stats['render_ms_max'] = max(self.stats['render_ms_max'], elapsed_ms)
+        if elapsed_ms > self.slow_render_ms:
+            logger.warning(f"Slow markdown render: {elapsed_ms:.1f} ms for {len(body)} chars")
+
+        self._cache[key] = rendered
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rendered
+
+    @staticmethod
+    def _basic_html(body: str) -> str:
+        """Escaped paragraphs and line breaks, used when python-markdown is missing."""
+        paragraphs = re.split(r'\n\s*\n', body.strip())
+        return ''.join(
+            '<p>' + html.escape(p).replace('\n', '<br>') + '</p>' for p in paragraphs
+        )
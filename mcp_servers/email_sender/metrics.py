@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Send Metrics for Email Sender MCP
+Per-stage SMTP latency histograms (DNS, connect, greeting, STARTTLS, AUTH,
+DATA, ...) and send counters, so a slow queue drain can be traced to the
+stage that got slower.
+"""
+import bisect
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# Stages in the order a send goes through them
+STAGES = ('pool_wait', 'dns', 'connect', 'greeting', 'starttls', 'auth', 'noop', 'data')
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; constant memory however many samples."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th sample, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 2)
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b}" for b in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 2),
+            'buckets_ms': {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class SendMetrics:
+    """Stage histograms and counters for one Email Sender process."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {stage: LatencyHistogram() for stage in STAGES}
+        self.counters = {
+            'sent': 0,
+            'failed': 0,
+            'retried': 0,
+            'reconnects': 0,
+            'bytes': 0,
+            'envelope_batches': 0,
+            'batched_recipients': 0,
+            'connections_opened': 0,
+            'connection_errors': 0,
+        }
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Record how long the enclosed block takes (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage].record((time.perf_counter() - started) * 1000)
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] += amount
+
+    def snapshot(self) -> Dict:
+        uptime = time.time() - self.started
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'uptime_s': round(uptime, 1),
+            'counters': dict(self.counters),
+            'sent_per_s': round(self.counters['sent'] / uptime, 3) if uptime else 0.0,
+            'stages': {stage: h.snapshot() for stage, h in self.stages.items() if h.count},
+        }
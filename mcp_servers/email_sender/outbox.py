@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Durable Outbox for Email Sender MCP
+Journals each queued email through queued -> sending -> sent/failed/dead so a
+crash or archive error never causes the same file to be sent twice, and
+transient SMTP failures are retried with exponential backoff.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+DEAD = 'dead'
+
+# Finished entries are dropped from the journal after this long, except a
+# sent entry whose file is still queued (its archive failed)
+FINISHED_RETENTION_SECONDS = 7 * 86400
+
+
+class EmailOutbox:
+    """Append-only journal of outbox state, keyed by idempotency key."""
+
+    def __init__(self, journal_path: Path, max_attempts: int = 5,
+                 retry_base_seconds: float = 60.0, retry_max_seconds: float = 3600.0,
+                 queue_dir: Optional[Path] = None):
+        """
+        Initialize outbox.
+
+        Args:
+            journal_path: JSONL journal file
+            max_attempts: Send attempts before an email is dead-lettered
+            retry_base_seconds: Delay before the first retry (doubles each attempt)
+            retry_max_seconds: Upper bound for the retry delay
+            queue_dir: Folder the queued files live in; sent entries for
+                files still there are never compacted away
+        """
+        self.journal_path = Path(journal_path)
+        self.queue_dir = Path(queue_dir) if queue_dir else None
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._journal_records = 0
+        self._journal_stamp = None
+        self._load()
+
+    @staticmethod
+    def key_for(email_file: Path) -> str:
+        """
+        Idempotency key for a queued file, derived without reading it.
+
+        Name, size and modification time identify one approved version of
+        the file; editing it yields a new key. Moving a file between vault
+        folders keeps its mtime, so the key survives the approval move.
+        """
+        stat = email_file.stat()
+        raw = f"{email_file.name}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def record(self, key: str, state: str, **fields) -> Dict:
+        """Transition an entry to a new state and fsync the journal line."""
+        with self._lock:
+            entry = dict(self.entries.get(key, {'key': key, 'attempts': 0}))
+            entry.update(fields)
+            entry['state'] = state
+            entry['updated'] = time.time()
+            self.entries[key] = entry
+
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_stamp = self._stamp(os.fstat(f.fileno()))
+            self._journal_records += 1
+
+            if self._journal_records > 2 * len(self.entries) + 1000:
+                self._compact()
+
+        return entry
+
+    def is_due(self, entry: Optional[Dict]) -> bool:
+        """True if an entry has never been tried or its retry time has come."""
+        if not entry or entry['state'] == QUEUED:
+            return True
+        return entry['state'] == FAILED and entry.get('next_attempt', 0) <= time.time()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff delay after the given number of failed attempts."""
+        return min(self.retry_max_seconds, self.retry_base_seconds * 2 ** max(0, attempts - 1))
+
+    def interrupted(self) -> list:
+        """Entries left in 'sending' by a crash; the send may or may not have happened."""
+        return [e for e in self.entries.values() if e['state'] == SENDING]
+
+    @contextmanager
+    def drain_lock(self):
+        """
+        Cross-process lock held while draining the queue.
+
+        The scheduler and the MCP server can both drain Ready_To_Send; only
+        one may at a time, or one would see the other's in-flight sends as
+        interrupted. Yields False, without waiting, if another process holds it.
+        """
+        with open(self.journal_path.with_suffix('.lock'), 'a+') as f:
+            try:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                yield False
+                return
+
+            try:
+                yield True
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def refresh(self):
+        """Reload the journal if another process has written to it since we last did."""
+        with self._lock:
+            try:
+                stamp = self._stamp(self.journal_path.stat())
+            except FileNotFoundError:
+                return
+            if stamp != self._journal_stamp:
+                self.entries = {}
+                self._journal_records = 0
+                self._load()
+
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> tuple:
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def _load(self):
+        """Replay the journal; the last line per key wins."""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            self._journal_stamp = self._stamp(os.fstat(f.fileno()))
+            for line in f:
+                self._journal_records += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash mid-append
+                    continue
+                self.entries[entry['key']] = entry
+
+    def _still_queued(self, entry: Dict) -> bool:
+        """
+        True for a sent entry whose file was never archived: dropping it
+        would make the next drain send that file again.
+        """
+        if entry['state'] != SENT or not self.queue_dir or not entry.get('file'):
+            return False
+        email_file = self.queue_dir / entry['file']
+        try:
+            return self.key_for(email_file) == entry['key']
+        except OSError:
+            return False
+
+    def _compact(self):
+        """Rewrite the journal with one line per live entry (caller holds the lock)."""
+        cutoff = time.time() - FINISHED_RETENTION_SECONDS
+        self.entries = {
+            key: e for key, e in self.entries.items()
+            if e['state'] not in (SENT, DEAD) or e['updated'] >= cutoff or self._still_queued(e)
+        }
+
+        tmp_path = self.journal_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        self._journal_records = len(self.entries)
+        self._journal_stamp = self._stamp(self.journal_path.stat())
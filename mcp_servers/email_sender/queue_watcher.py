@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Ready_To_Send Watcher for Email Sender MCP
+Triggers a queue drain as soon as an approved email lands in
+Ready_To_Send/Email/, instead of waiting for the scheduler's next run.
+Events arriving within a short window are batched into one drain.
+"""
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger('EmailSender.QueueWatcher')
+
+
+class ReadyQueueWatcher:
+    """
+    Watches a folder with watchdog (inotify, FSEvents, ReadDirectoryChangesW)
+    and calls an async drain callback on the event loop.
+
+    A batch is drained `window` seconds after its first event, once every
+    file in it has been unmodified for `settle` seconds; renames into the
+    folder are complete immediately, files written in place get the
+    settle time to finish.
+    """
+
+    def __init__(self, folder: Path, drain: Callable[[], Awaitable[str]],
+                 window: float = 1.0, settle: float = 0.5, busy_retry: float = 5.0):
+        """
+        Initialize queue watcher.
+
+        Args:
+            folder: Folder to watch (not recursive)
+            drain: Coroutine function that drains the queue and returns check_queue's JSON
+            window: Seconds to collect events before draining
+            settle: Seconds a file must be unmodified before it is drained
+            busy_retry: Seconds to wait when another process is draining
+        """
+        self.folder = Path(folder)
+        self.drain = drain
+        self.window = window
+        self.settle = settle
+        self.busy_retry = busy_retry
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._observer = None
+        self._pending: Set[Path] = set()
+        self._retry = False
+        self._first_event = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._draining: Optional[asyncio.Task] = None
+        self.stats = {'events': 0, 'batches': 0, 'last_batch_files': 0,
+                      'last_batch_latency_s': None}
+
+    def start(self):
+        """Start watching; call from the event loop that should run drains."""
+        # Imported here so the MCP server does not pay for it before serving
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.warning("watchdog not installed - Ready_To_Send is only drained by check_queue/scheduler")
+            return
+        self.loop = asyncio.get_running_loop()
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._observer = Observer()
+        self._observer.schedule(self, str(self.folder), recursive=False)
+        self._observer.start()
+        logger.info(f"Watching {self.folder} (batch window {self.window}s)")
+
+    async def stop(self):
+        """Stop watching and wait for a running drain to finish."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._observer:
+            self._observer.stop()
+            await asyncio.to_thread(self._observer.join)
+            self._observer = None
+        if self._draining:
+            await self._draining
+
+    # watchdog callback (observer thread); the observer only needs dispatch()
+
+    def dispatch(self, event):
+        if event.event_type == 'moved':
+            path = event.dest_path
+        elif event.event_type in ('created', 'modified', 'closed'):
+            path = event.src_path
+        else:
+            return
+        # Moves out of the folder (our own archiving) report a destination elsewhere
+        if event.is_directory or not str(path).endswith('.md') or Path(path).parent != self.folder:
+            return
+        self.loop.call_soon_threadsafe(self._add, Path(path))
+
+    # event loop side
+
+    def _add(self, path: Path):
+        self.stats['events'] += 1
+        if not self._pending and not self._retry:
+            self._first_event = time.monotonic()
+        self._pending.add(path)
+        if self._timer is None and self._draining is None:
+            self._arm(self.window)
+
+    def _arm(self, delay: float):
+        self._timer = self.loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        if not self._pending and not self._retry:
+            return
+
+        # Wait until files written in place have stopped changing
+        newest = 0.0
+        for path in self._pending:
+            try:
+                newest = max(newest, path.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+        quiet_for = time.time() - newest
+        if quiet_for < self.settle:
+            self._arm(self.settle - quiet_for)
+            return
+
+        batch, first_event = len(self._pending), self._first_event
+        self._pending = set()
+        self._retry = False
+        self._draining = self.loop.create_task(self._run(batch, first_event))
+
+    async def _run(self, batch: int, first_event: float):
+        busy = False
+        try:
+            result = json.loads(await self.drain())
+            busy = bool(result.get('busy'))
+            latency = time.monotonic() - first_event
+            self.stats['batches'] += 1
+            self.stats['last_batch_files'] = batch
+            self.stats['last_batch_latency_s'] = round(latency, 3)
+            logger.info(f"Drained after {batch} file event(s): {len(result.get('sent', []))} sent "
+                        f"{latency:.2f}s after the first event")
+        except Exception as e:
+            logger.error(f"Queue drain failed: {e}")
+        finally:
+            self._draining = None
+
+        if busy:
+            # Another process holds the queue; look again once it is likely done
+            self._retry = True
+            if not self._pending:
+                self._first_event = first_event
+        if (self._pending or self._retry) and self._timer is None:
+            self._arm(self.busy_retry if busy else self.window)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting for Email Sender MCP
+Token buckets that keep concurrent queue drains under provider throttling
+limits, per recipient domain and per sending account.
+"""
+import asyncio
+import time
+from email.utils import getaddresses
+from typing import Dict, List, Optional
+
+
+class RateLimited(Exception):
+    """A send would have to wait longer than the caller allows."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"rate limited, retry in {retry_after:.0f}s")
+
+
+class TokenBucket:
+    """Token bucket; SendRateLimiter checks and takes tokens across buckets."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate_per_minute: Sustained sends per minute (0 = unlimited)
+            burst: Sends allowed back to back before the rate applies
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, count: int = 1) -> float:
+        """
+        Seconds until `count` tokens can be taken (0 = now).
+
+        A request larger than the bucket only waits for a full bucket and
+        then leaves it in debt, so later sends pay for it at the sustained rate.
+        """
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        needed = min(count, self.capacity)
+        return max(0.0, (needed - self.tokens) / self.rate)
+
+    def take(self, count: int = 1):
+        """Take `count` tokens; call only when wait_time(count) is 0."""
+        if self.rate > 0:
+            self.tokens -= count
+
+
+class SendRateLimiter:
+    """Per-account and per-recipient-domain send limits."""
+
+    def __init__(self, per_account_per_minute: float, per_domain_per_minute: float,
+                 burst: int = 5):
+        """
+        Initialize send rate limiter.
+
+        Args:
+            per_account_per_minute: Limit for everything sent from one SMTP account
+            per_domain_per_minute: Limit for each recipient domain
+            burst: Bucket size for both limits
+        """
+        self.per_account_per_minute = per_account_per_minute
+        self.per_domain_per_minute = per_domain_per_minute
+        self.burst = burst
+        self.accounts: Dict[str, TokenBucket] = {}
+        self.domains: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def recipient_domains(*address_fields: str) -> List[str]:
+        """Distinct lowercase domains across To/Cc/Bcc header values."""
+        domains = []
+        for _, address in getaddresses([f for f in address_fields if f]):
+            domain = address.rpartition('@')[2].lower()
+            if domain and domain not in domains:
+                domains.append(domain)
+        return domains
+
+    def _account_bucket(self, account: str) -> TokenBucket:
+        bucket = self.accounts.get(account)
+        if bucket is None:
+            bucket = self.accounts[account] = TokenBucket(self.per_account_per_minute, self.burst)
+        return bucket
+
+    def _domain_bucket(self, domain: str) -> TokenBucket:
+        bucket = self.domains.get(domain)
+        if bucket is None:
+            bucket = self.domains[domain] = TokenBucket(self.per_domain_per_minute, self.burst)
+        return bucket
+
+    async def acquire(self, account: str, *address_fields: str, timeout: Optional[float] = None):
+        """
+        Wait for the account bucket and every recipient domain bucket.
+
+        Raises:
+            RateLimited: If the wait would exceed timeout seconds
+        """
+        demand = {self._account_bucket(account): 1}
+        for domain in self.recipient_domains(*address_fields):
+            demand[self._domain_bucket(domain)] = 1
+        await self._take_all(demand, timeout)
+
+    async def acquire_batch(self, account: str, addresses: List[str],
+                            timeout: Optional[float] = None):
+        """
+        Wait for tokens for one message per address, as an envelope batch
+        delivers: one account token and one domain token per recipient.
+
+        Raises:
+            RateLimited: If the wait would exceed timeout seconds
+        """
+        demand = {self._account_bucket(account): len(addresses)}
+        for address in addresses:
+            for domain in self.recipient_domains(address):
+                bucket = self._domain_bucket(domain)
+                demand[bucket] = demand.get(bucket, 0) + 1
+        await self._take_all(demand, timeout)
+
+    async def _take_all(self, demand: Dict[TokenBucket, int], timeout: Optional[float]):
+        """
+        Take every bucket's tokens at once, sleeping until all have them.
+
+        Nothing is taken before the final check, so a waiter that is
+        cancelled or times out leaves every bucket as it was.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = max(bucket.wait_time(count) for bucket, count in demand.items())
+            if wait <= 0:
+                for bucket, count in demand.items():
+                    bucket.take(count)
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimited(wait)
+            await asyncio.sleep(wait)
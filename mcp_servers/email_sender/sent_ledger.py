@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Sent-Mail Ledger for Email Sender MCP
+Appends one JSON line per sent email to a file per day instead of writing
+a markdown file per email into Done/. Lookups by message ID or recipient
+use an in-memory index of line offsets, built from the day files and
+extended incrementally as they grow.
+"""
+import json
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import date, datetime, timedelta
+from email.utils import getaddresses
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROLLUP_RECENT_ROWS = 100
+
+
+class SentLedger:
+    """Daily JSONL files of sent emails with a message-ID and recipient index."""
+
+    def __init__(self, ledger_dir: Path):
+        """
+        Initialize sent ledger.
+
+        Args:
+            ledger_dir: Directory for sent_YYYY-MM-DD.jsonl files
+        """
+        self.ledger_dir = Path(ledger_dir)
+        self._lock = threading.Lock()
+
+        # Index: message_id / recipient -> [(day file, offset)]; a batched
+        # message has one record per recipient under the same message_id
+        self._by_message_id: Dict[str, List[tuple]] = defaultdict(list)
+        self._by_recipient: Dict[str, List[tuple]] = defaultdict(list)
+        self._indexed_to: Dict[Path, int] = {}
+
+    def day_file(self, day: date) -> Path:
+        return self.ledger_dir / f"sent_{day.isoformat()}.jsonl"
+
+    @staticmethod
+    def recipients(*address_fields: str) -> List[str]:
+        """Lowercase addresses across To/Cc/Bcc header values."""
+        return [addr.lower() for _, addr in getaddresses([f for f in address_fields if f]) if '@' in addr]
+
+    def append(self, message_id: str, to: str, subject: str, **fields) -> Dict:
+        """
+        Record one sent email.
+
+        Args:
+            message_id: Message-ID without angle brackets
+            to: To header value
+            subject: Subject line
+            **fields: Extra fields to store (cc, bcc, source, ...)
+
+        Returns:
+            The stored record
+        """
+        now = datetime.now()
+        record = {'sent': now.isoformat(timespec='milliseconds'), 'message_id': message_id,
+                  'to': to, 'subject': subject}
+        record.update({k: v for k, v in fields.items() if v})
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._lock:
+            self.ledger_dir.mkdir(parents=True, exist_ok=True)
+            path = self.day_file(now.date())
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            # Keep the index current if this file was already indexed
+            if self._indexed_to.get(path) == offset:
+                self._index_line(path, offset, record)
+                self._indexed_to[path] = offset + len(line)
+        return record
+
+    def _index_line(self, path: Path, offset: int, record: Dict):
+        self._by_message_id[record.get('message_id', '')].append((path, offset))
+        for address in self.recipients(record.get('to', ''), record.get('cc', ''), record.get('bcc', '')):
+            self._by_recipient[address].append((path, offset))
+
+    def _index_file(self, path: Path):
+        """Index lines appended to a day file since it was last indexed (caller holds the lock)."""
+        start = self._indexed_to.get(path, 0)
+        if not path.exists() or path.stat().st_size <= start:
+            return
+        with open(path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for raw in f:
+                if raw.endswith(b'\n'):
+                    try:
+                        self._index_line(path, offset, json.loads(raw))
+                    except ValueError:
+                        pass
+                    offset += len(raw)
+                else:
+                    break  # partial line still being written
+        self._indexed_to[path] = offset
+
+    def _read_at(self, path: Path, offset: int) -> Optional[Dict]:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            try:
+                return json.loads(f.readline())
+            except ValueError:
+                return None
+
+    def _days(self, days: int) -> List[Path]:
+        today = date.today()
+        return [self.day_file(today - timedelta(days=n)) for n in range(days)]
+
+    def find(self, message_id: Optional[str] = None, recipient: Optional[str] = None,
+             days: int = 30) -> List[Dict]:
+        """
+        Look up sent emails in the last `days` day files.
+
+        Args:
+            message_id: Exact Message-ID (angle brackets optional)
+            recipient: Email address (case-insensitive)
+            days: How many days back to search, today included
+
+        Returns:
+            Matching records, newest first
+        """
+        files = self._days(days)
+        with self._lock:
+            for path in files:
+                self._index_file(path)
+
+            wanted = set(files)
+            if message_id:
+                locations = [loc for loc in self._by_message_id.get(message_id.strip('<>'), [])
+                             if loc[0] in wanted]
+            elif recipient:
+                locations = [loc for loc in self._by_recipient.get(recipient.lower(), []) if loc[0] in wanted]
+            else:
+                locations = []
+
+        records = [self._read_at(path, offset) for path, offset in locations]
+        records = [r for r in records if r]
+        return sorted(records, key=lambda r: r['sent'], reverse=True)
+
+    def count(self, day: date) -> int:
+        """Number of emails recorded on a day."""
+        path = self.day_file(day)
+        if not path.exists():
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def write_rollup(self, day: date, rollup_path: Path):
+        """
+        Write a markdown summary of one day's sends.
+
+        Shows totals, the busiest recipient domains and the most recent
+        ROLLUP_RECENT_ROWS emails; the JSONL file stays the full record.
+        """
+        path = self.day_file(day)
+        if not path.exists():
+            return
+
+        total = 0
+        domains = Counter()
+        recent = deque(maxlen=ROLLUP_RECENT_ROWS)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                total += 1
+                for address in self.recipients(record.get('to', '')):
+                    domains[address.rpartition('@')[2]] += 1
+                recent.append(record)
+
+        lines = [
+            "---",
+            "type: sent_email_rollup",
+            f"date: {day.isoformat()}",
+            f"sent: {total}",
+            f"updated: {datetime.now().isoformat()}",
+            "---",
+            "",
+            f"# Emails Sent: {day.isoformat()}",
+            "",
+            f"**Total:** {total}  ",
+            f"**Ledger:** `{path.name}`",
+            "",
+            "## Top Recipient Domains",
+        ]
+        lines += [f"- {domain}: {n}" for domain, n in domains.most_common(10)]
+        lines += ["", f"## Most Recent ({len(recent)})", "",
+                  "| Time | To | Subject | Message ID |", "|---|---|---|---|"]
+        for record in reversed(recent):
+            cells = [record['sent'][11:19], record.get('to', ''), record.get('subject', ''),
+                     record.get('message_id', '')]
+            lines.append("| " + " | ".join(str(c).replace('|', '\\|') for c in cells) + " |")
+        lines += ["", "---", "*Generated by Email Sender MCP*", ""]
+
+        tmp_path = rollup_path.with_suffix('.tmp')
+        tmp_path.write_text('\n'.join(lines), encoding='utf-8')
+        tmp_path.replace(rollup_path)
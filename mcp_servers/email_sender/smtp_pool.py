@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+SMTP Connection Pool for Email Sender MCP
+Keeps authenticated SMTP sessions open so queue drains pay for the TCP
+connect, STARTTLS and AUTH once per connection instead of once per email.
+
+All network I/O goes through aiosmtplib, so sends never block the event loop.
+Messages with spooled attachments are sent in chunks read from disk, so a
+send never holds the encoded attachments in memory.
+"""
+import asyncio
+import logging
+import re
+import socket
+import time
+import uuid
+from collections import deque
+from email.message import Message
+from typing import AsyncIterator, Dict, List, Optional
+
+import aiosmtplib
+from aiosmtplib.email import extract_recipients, extract_sender, flatten_message
+
+from metrics import SendMetrics
+
+logger = logging.getLogger('EmailSender.SMTPPool')
+
+# Errors after which a connection can no longer be trusted
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    OSError
+)
+
+
+class DeliveryUnknownError(Exception):
+    """
+    The connection failed after DATA began, so the server may already have
+    queued the message. Resending could deliver it twice.
+    """
+
+
+# Lone CR or LF in message text, sent as CRLF; lines starting with a period are doubled
+_LINE_ENDINGS = re.compile(rb"\r\n|\r|\n")
+_LEADING_PERIOD = re.compile(rb"(?m)^\.")
+
+
+def _spooled_parts(msg: Message) -> list:
+    """Parts whose body is sent from a spool file (attachments.SpooledAttachment)."""
+    return [part for part in msg.walk() if hasattr(part, 'iter_wire_chunks')]
+
+
+class _MeteredSMTP(aiosmtplib.SMTP):
+    """SMTP client that remembers the size of the last message and whether DATA began."""
+
+    last_message_bytes = 0
+    data_started = False
+
+    async def sendmail(self, sender, recipients, message, *args, **kwargs):
+        self.last_message_bytes = len(message)
+        self.data_started = False
+        return await super().sendmail(sender, recipients, message, *args, **kwargs)
+
+    async def data(self, message, *args, **kwargs):
+        self.data_started = True
+        return await super().data(message, *args, **kwargs)
+
+    async def send_streamed(self, msg: Message, spooled: list,
+                            recipients: Optional[List[str]] = None) -> tuple:
+        """
+        send_message() for messages with spooled attachments.
+
+        The message is flattened with a placeholder line for each spooled
+        body, and DATA sends the spool files in chunks in their place, so
+        memory use is the message without attachments plus one chunk.
+
+        Returns:
+            (refused recipients, server response) like send_message()
+        """
+        self.data_started = False
+        sender = extract_sender(msg)
+        if recipients is None:
+            recipients = extract_recipients(msg)
+        if not sender or not recipients:
+            raise ValueError("message has no sender or no recipients")
+        await self._ehlo_or_helo_if_needed()
+
+        mail_options = []
+        try:
+            (sender + ''.join(recipients)).encode('ascii')
+            utf8 = False
+        except UnicodeEncodeError:
+            if not self.supports_extension('smtputf8'):
+                raise aiosmtplib.SMTPNotSupported("non-ASCII address and no SMTPUTF8 support")
+            utf8 = True
+            mail_options.append('SMTPUTF8')
+        if self.supports_extension('8bitmime'):
+            mail_options.append('BODY=8BITMIME')
+
+        markers = {}
+        try:
+            for part in spooled:
+                part.placeholder = f"spooled-{uuid.uuid4().hex}"
+                markers[part.placeholder.encode('ascii')] = part
+            flat = flatten_message(msg, utf8=utf8,
+                                   cte_type='8bit' if self.supports_extension('8bitmime') else '7bit')
+        finally:
+            for part in spooled:
+                part.placeholder = None
+
+        # Text between the placeholders, in wire format (CRLF, dot-stuffed)
+        pieces = re.split(b'(' + b'|'.join(markers) + b')', flat)
+        for index in range(0, len(pieces), 2):
+            pieces[index] = _LEADING_PERIOD.sub(b'..', _LINE_ENDINGS.sub(b'\r\n', pieces[index]))
+        if not pieces[-1].endswith(b'\r\n'):
+            pieces[-1] += b'\r\n'
+        size = sum(markers[p].wire_size if p in markers else len(p) for p in pieces)
+        self.last_message_bytes = size
+        if self.supports_extension('size'):
+            mail_options.insert(0, f"SIZE={size}")
+
+        async def chunks() -> AsyncIterator[bytes]:
+            for piece in pieces:
+                if piece not in markers:
+                    yield piece
+                    continue
+                body = markers[piece].iter_wire_chunks()
+                try:
+                    while True:
+                        chunk = await asyncio.to_thread(next, body, None)
+                        if chunk is None:
+                            break
+                        yield chunk
+                finally:
+                    body.close()
+
+        try:
+            await self.mail(sender, options=mail_options)
+            refused = {}
+            for address in recipients:
+                try:
+                    await self.rcpt(address)
+                except aiosmtplib.SMTPRecipientRefused as e:
+                    refused[address] = e
+            if len(refused) == len(recipients):
+                raise aiosmtplib.SMTPRecipientsRefused(list(refused.values()))
+            response = await self._data_streamed(chunks())
+        except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+            try:
+                await self.rset()
+            except (ConnectionError, aiosmtplib.SMTPException):
+                pass
+            raise
+        return ({address: aiosmtplib.SMTPResponse(e.code, e.message) for address, e in refused.items()},
+                response.message)
+
+    async def _data_streamed(self, chunks: AsyncIterator[bytes]):
+        """DATA with the message body written chunk by chunk, waiting for the socket to drain."""
+        protocol = self.protocol
+        if protocol is None or getattr(protocol, '_command_lock', None) is None:
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+        self.data_started = True
+        try:
+            async with protocol._command_lock:
+                protocol._response_pending = True
+                protocol.write(b"DATA\r\n")
+                start = await protocol.read_response(timeout=self.timeout)
+                if start.code != aiosmtplib.SMTPStatus.start_input:
+                    raise aiosmtplib.SMTPDataError(start.code, start.message)
+
+                async for chunk in chunks:
+                    protocol.write(chunk)
+                    try:
+                        await protocol._drain_helper()
+                    except ConnectionError as e:
+                        raise aiosmtplib.SMTPServerDisconnected(str(e)) from e
+
+                protocol._response_pending = True
+                protocol.write(b".\r\n")
+                response = await protocol.read_response(timeout=self.timeout)
+                if response.code != aiosmtplib.SMTPStatus.completed:
+                    raise aiosmtplib.SMTPDataError(response.code, response.message)
+                return response
+        except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError):
+            self.close()
+            raise
+
+
+class PooledConnection:
+    """One authenticated SMTP session and its usage counters."""
+
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.opened = time.monotonic()
+        self.last_used = self.opened
+        # Last time the server was known to answer (use or keepalive NOOP)
+        self.last_checked = self.opened
+        self.messages = 0
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated, reusable SMTP connections."""
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 size: int = 2, keepalive_interval: float = 30.0,
+                 idle_timeout: float = 240.0, max_messages_per_connection: int = 100,
+                 timeout: float = 30.0, start_tls: bool = True, metrics: SendMetrics = None):
+        """
+        Initialize SMTP connection pool.
+
+        Args:
+            host: SMTP server hostname
+            port: SMTP server port (STARTTLS)
+            username: SMTP login
+            password: SMTP password
+            size: Maximum simultaneous connections
+            keepalive_interval: NOOP idle connections this often, in the
+                background and before reusing one (0 = only before reuse)
+            idle_timeout: Close connections idle longer than this (servers drop them anyway)
+            max_messages_per_connection: Reconnect after this many messages (provider limits)
+            timeout: Socket timeout in seconds
+            start_tls: Upgrade with STARTTLS after connecting
+            metrics: Collector for per-stage timings and counters
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self.start_tls = start_tls
+        self.metrics = metrics or SendMetrics()
+
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(size)
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.stats = {
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'messages_sent': 0,
+            'keepalive_noops': 0,
+            'reconnects': 0
+        }
+
+    async def _open_socket(self) -> socket.socket:
+        """Resolve and TCP-connect as separate, timed steps."""
+        loop = asyncio.get_running_loop()
+        with self.metrics.timed('dns'):
+            addresses = await loop.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+
+        last_error = None
+        with self.metrics.timed('connect'):
+            for family, sock_type, proto, _, address in addresses:
+                sock = socket.socket(family, sock_type, proto)
+                sock.setblocking(False)
+                try:
+                    await asyncio.wait_for(loop.sock_connect(sock, address), self.timeout)
+                    return sock
+                except (OSError, asyncio.TimeoutError) as e:
+                    sock.close()
+                    last_error = e
+        raise aiosmtplib.SMTPConnectError(
+            f"Error connecting to {self.host} on port {self.port}: {last_error}"
+        )
+
+    async def _connect(self) -> PooledConnection:
+        """Open, secure and authenticate a new SMTP session, timing each stage."""
+        try:
+            sock = await self._open_socket()
+            smtp = _MeteredSMTP(hostname=self.host, timeout=self.timeout, sock=sock, start_tls=False)
+            try:
+                with self.metrics.timed('greeting'):
+                    await smtp.connect()
+                if self.start_tls:
+                    with self.metrics.timed('starttls'):
+                        await smtp.starttls()
+                if self.username:
+                    with self.metrics.timed('auth'):
+                        await smtp.login(self.username, self.password)
+            except Exception:
+                smtp.close()
+                sock.close()
+                raise
+        except Exception:
+            self.metrics.count('connection_errors')
+            raise
+        self.stats['connections_opened'] += 1
+        self.metrics.count('connections_opened')
+        logger.info(f"Opened SMTP connection to {self.host}:{self.port}")
+        return PooledConnection(smtp)
+
+    async def _discard(self, conn: PooledConnection):
+        """Close a connection without caring whether the server answers."""
+        try:
+            await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+        self.stats['connections_closed'] += 1
+
+    async def _keepalive(self, conn: PooledConnection) -> bool:
+        """NOOP a connection; discard it and return False if it no longer answers."""
+        try:
+            with self.metrics.timed('noop'):
+                await conn.smtp.noop()
+        except (aiosmtplib.SMTPException, *CONNECTION_ERRORS):
+            await self._discard(conn)
+            return False
+        conn.last_checked = time.monotonic()
+        self.stats['keepalive_noops'] += 1
+        return True
+
+    async def _checkout(self) -> PooledConnection:
+        """Take a live idle connection, or open a new one."""
+        while self._idle:
+            conn = self._idle.pop()
+            now = time.monotonic()
+
+            if now - conn.last_used > self.idle_timeout or conn.messages >= self.max_messages_per_connection:
+                await self._discard(conn)
+                continue
+
+            if now - conn.last_checked > self.keepalive_interval and not await self._keepalive(conn):
+                continue
+
+            return conn
+
+        return await self._connect()
+
+    def _checkin(self, conn: PooledConnection):
+        """Return a healthy connection to the idle list."""
+        conn.last_used = conn.last_checked = time.monotonic()
+        self._idle.append(conn)
+        if self.keepalive_interval > 0 and (self._keepalive_task is None or self._keepalive_task.done()):
+            self._keepalive_task = asyncio.create_task(self._keep_idle_alive())
+
+    async def _keep_idle_alive(self):
+        """
+        While connections sit idle, NOOP each one every keepalive_interval
+        and close those idle past idle_timeout, so a server's own idle
+        timeout doesn't leave dead sessions for the next send to trip over.
+        Each check holds a send slot, so the pool never exceeds its size.
+        """
+        while self._idle:
+            await asyncio.sleep(self.keepalive_interval)
+            for conn in list(self._idle):
+                async with self._slots:
+                    if conn not in self._idle:
+                        continue
+                    now = time.monotonic()
+                    if now - conn.last_used > self.idle_timeout:
+                        self._idle.remove(conn)
+                        await self._discard(conn)
+                    elif now - conn.last_checked >= self.keepalive_interval:
+                        self._idle.remove(conn)
+                        if await self._keepalive(conn):
+                            self._idle.appendleft(conn)
+
+    async def _deliver(self, conn: PooledConnection, msg: Message,
+                       recipients: Optional[List[str]]) -> Dict:
+        spooled = _spooled_parts(msg)
+        with self.metrics.timed('data'):
+            if spooled:
+                refused, _ = await conn.smtp.send_streamed(msg, spooled, recipients)
+            else:
+                refused, _ = await conn.smtp.send_message(msg, recipients=recipients)
+        conn.messages += 1
+        self.stats['messages_sent'] += 1
+        self.metrics.count('sent')
+        self.metrics.count('bytes', conn.smtp.last_message_bytes)
+        return refused
+
+    async def _release_after_error(self, conn: PooledConnection):
+        """Reset a session after a rejected transaction and keep it if it still answers."""
+        try:
+            await conn.smtp.rset()
+            self._checkin(conn)
+        except CONNECTION_ERRORS:
+            await self._discard(conn)
+
+    async def send(self, msg: Message, recipients: Optional[List[str]] = None) -> Dict:
+        """
+        Send a message over a pooled connection.
+
+        A connection that turns out to be dead before DATA began (stale
+        session, failure at MAIL FROM/RCPT TO) is replaced and the send is
+        retried once. If it fails once DATA has begun, the server may
+        already have the message, so DeliveryUnknownError is raised instead
+        of sending it again. Rejections by the server (bad recipient, etc.)
+        are raised without discarding the connection.
+
+        Args:
+            msg: Message to send
+            recipients: Envelope recipients (default: the To/Cc/Bcc headers)
+
+        Returns:
+            Recipients the server refused while accepting the others,
+            as {address: SMTPResponse}
+
+        Raises:
+            DeliveryUnknownError: The connection failed after DATA began
+        """
+        try:
+            return await self._send(msg, recipients)
+        except Exception:
+            self.metrics.count('failed')
+            raise
+
+    async def _send(self, msg: Message, recipients: Optional[List[str]]) -> Dict:
+        with self.metrics.timed('pool_wait'):
+            await self._slots.acquire()
+        try:
+            conn = await self._checkout()
+            try:
+                refused = await self._deliver(conn, msg, recipients)
+            except CONNECTION_ERRORS as e:
+                await self._discard(conn)
+                if conn.smtp.data_started:
+                    raise DeliveryUnknownError(
+                        f"SMTP connection lost during DATA ({e}); the message may have been delivered"
+                    ) from e
+                logger.warning(f"SMTP connection lost ({e}), reconnecting")
+                self.stats['reconnects'] += 1
+                self.metrics.count('reconnects')
+                conn = await self._connect()
+                try:
+                    refused = await self._deliver(conn, msg, recipients)
+                except CONNECTION_ERRORS as e:
+                    await self._discard(conn)
+                    if conn.smtp.data_started:
+                        raise DeliveryUnknownError(
+                            f"SMTP connection lost during DATA ({e}); the message may have been delivered"
+                        ) from e
+                    raise
+                except aiosmtplib.SMTPException:
+                    await self._release_after_error(conn)
+                    raise
+            except aiosmtplib.SMTPException:
+                await self._release_after_error(conn)
+                raise
+
+            self._checkin(conn)
+            return refused
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        """Stop the keepalive task and close all idle connections."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+        while self._idle:
+            await self._discard(self._idle.pop())
+
+    @property
+    def idle_connections(self) -> int:
+        return len(self._idle)
+
+    def __repr__(self) -> str:
+        return (f"SMTPConnectionPool({self.host}:{self.port}, size={self.size}, "
+                f"idle={len(self._idle)})")
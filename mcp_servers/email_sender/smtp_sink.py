@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Local SMTP Sink for Email Sender MCP
+Accepts and discards mail on localhost so the sender can be exercised and
+benchmarked without a real provider. Latency and failures can be injected
+to imitate a slow or flaky server.
+
+Usage:
+    python smtp_sink.py --port 2525
+    python smtp_sink.py --port 2525 --data-latency-ms 80 --transient-rate 0.02
+"""
+import asyncio
+import random
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+
+
+class SinkHandler:
+    """aiosmtpd handler that counts, delays and optionally rejects messages."""
+
+    def __init__(self, connect_latency_ms: float = 0.0, data_latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, transient_rate: float = 0.0,
+                 permanent_rate: float = 0.0, seed: int = None):
+        """
+        Initialize sink handler.
+
+        Args:
+            connect_latency_ms: Delay before answering EHLO/HELO (handshake cost)
+            data_latency_ms: Delay before accepting each message
+            jitter_ms: Random extra delay (0..jitter) added to both
+            transient_rate: Share of messages answered with 451 (retryable)
+            permanent_rate: Share of messages answered with 550 (not retryable)
+            seed: PRNG seed for reproducible failure patterns
+        """
+        self.connect_latency_ms = connect_latency_ms
+        self.data_latency_ms = data_latency_ms
+        self.jitter_ms = jitter_ms
+        self.transient_rate = transient_rate
+        self.permanent_rate = permanent_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._peers = set()
+        self.reset()
+
+    def reset(self):
+        """Zero the counters between benchmark runs."""
+        with self._lock:
+            self._peers.clear()
+            self.stats = {'connections': 0, 'messages': 0, 'recipients': 0,
+                          'bytes': 0, 'transient_failures': 0, 'permanent_failures': 0}
+
+    async def _delay(self, base_ms: float):
+        delay = base_ms + (self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        with self._lock:
+            # One peer address per TCP connection; EHLO repeats after STARTTLS
+            if session.peer not in self._peers:
+                self._peers.add(session.peer)
+                self.stats['connections'] += 1
+        await self._delay(self.connect_latency_ms)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await self._delay(self.data_latency_ms)
+        roll = self.random.random()
+        with self._lock:
+            if roll < self.permanent_rate:
+                self.stats['permanent_failures'] += 1
+                return '550 5.7.1 Injected permanent failure'
+            if roll < self.permanent_rate + self.transient_rate:
+                self.stats['transient_failures'] += 1
+                return '451 4.3.0 Injected transient failure'
+            self.stats['messages'] += 1
+            self.stats['recipients'] += len(envelope.rcpt_tos)
+            self.stats['bytes'] += len(envelope.original_content or envelope.content or b'')
+        return '250 2.0.0 Accepted'
+
+
+class SMTPSink:
+    """SMTP sink running in a background thread."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 2525, **handler_options):
+        """
+        Initialize SMTP sink.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+            **handler_options: Latency and failure options for SinkHandler
+        """
+        self.host = host
+        self.port = port
+        self.handler = SinkHandler(**handler_options)
+        self.controller = Controller(self.handler, hostname=host, port=port)
+
+    @property
+    def stats(self) -> dict:
+        return self.handler.stats
+
+    def start(self):
+        self.controller.start()
+        return self
+
+    def stop(self):
+        self.controller.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Main entry point for the SMTP sink."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local SMTP sink for testing the email sender')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=2525, help='Listen port (default: 2525)')
+    parser.add_argument('--connect-latency-ms', type=float, default=0.0,
+                       help='Delay before answering EHLO')
+    parser.add_argument('--data-latency-ms', type=float, default=0.0,
+                       help='Delay before accepting each message')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra delay')
+    parser.add_argument('--transient-rate', type=float, default=0.0,
+                       help='Share of messages rejected with 451')
+    parser.add_argument('--permanent-rate', type=float, default=0.0,
+                       help='Share of messages rejected with 550')
+    parser.add_argument('--seed', type=int, default=None, help='PRNG seed')
+
+    args = parser.parse_args()
+
+    sink = SMTPSink(
+        args.host, args.port,
+        connect_latency_ms=args.connect_latency_ms,
+        data_latency_ms=args.data_latency_ms,
+        jitter_ms=args.jitter_ms,
+        transient_rate=args.transient_rate,
+        permanent_rate=args.permanent_rate,
+        seed=args.seed
+    )
+    sink.start()
+    print(f"SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    print("Point the sender at it with SMTP_SERVER, SMTP_PORT and SMTP_STARTTLS=false")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {sink.stats}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    main()
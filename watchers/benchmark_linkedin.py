@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Poster Benchmark
+Runs LinkedInPoster against the offline fixture (fixtures/linkedin_feed.html)
+and reports time per post, time spent waiting on selectors and browser
+memory over a queue of posts.
+
+No LinkedIn account or login is needed.
+
+Usage:
+    python benchmark_linkedin.py
+    python benchmark_linkedin.py --posts 20 200 --variants current legacy text --publish 1500
+"""
+import sys
+import time
+import json
+import asyncio
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Optional
+
+import linkedin_poster
+from linkedin_poster import LinkedInPoster, async_playwright
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "linkedin_feed.html"
+VARIANTS = ('current', 'legacy', 'text')
+
+POST_TEMPLATE = """Lessons from week {n} of running our AI employee
+
+{body}
+
+What would you automate next? #automation #ai #smallbusiness
+"""
+
+
+def fixture_url(variant: str, load: int, open_ms: int, enable: int, publish: int, paste: bool) -> str:
+    """Build the fixture URL for one benchmark run."""
+    return (f"{FIXTURE_PATH.resolve().as_uri()}?variant={variant}&load={load}&open={open_ms}"
+            f"&enable={enable}&publish={publish}&paste={int(paste)}")
+
+
+def use_vault(vault: Path):
+    """Point the poster's queue, archive, ledger and browser profile at a scratch vault."""
+    linkedin_poster.VAULT_PATH = vault
+    linkedin_poster.READY_TO_POST_PATH = vault / "Ready_To_Post" / "LinkedIn"
+    linkedin_poster.DONE_PATH = vault / "Done"
+    linkedin_poster.ACCOUNTING_PATH = vault / "Accounting"
+    linkedin_poster.LEDGER_PATH = vault / "Logs" / "LinkedIn"
+    linkedin_poster.DEAD_LETTER_PATH = vault / "Dead_Letter" / "LinkedIn"
+    linkedin_poster.SESSION_PATH = vault / "watchers" / "linkedin_session"
+    linkedin_poster.SELECTOR_CACHE_PATH = vault / "watchers" / "linkedin_selectors.json"
+    linkedin_poster.DONE_PATH.mkdir(parents=True, exist_ok=True)
+
+
+def write_queue(folder: Path, posts: int):
+    """Queue `posts` post files of a few hundred characters each."""
+    for n in range(posts):
+        body = ' '.join(f"Point {i}: the queue drained while we slept." for i in range(3 + n % 8))
+        (folder / f"post_{n:05d}.md").write_text(
+            f"---\ntype: linkedin\n---\n{POST_TEMPLATE.format(n=n, body=body)}", encoding='utf-8'
+        )
+
+
+def browser_rss_mb() -> Optional[float]:
+    """Resident memory of the Chromium processes under this benchmark, or None without psutil."""
+    if psutil is None:
+        return None
+    rss = 0
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            if 'chrom' in proc.name().lower():
+                rss += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return round(rss / (1024 * 1024), 1)
+
+
+async def sample_memory(samples: list, interval: float = 0.5):
+    """Record browser RSS until cancelled."""
+    while True:
+        rss = await asyncio.to_thread(browser_rss_mb)
+        if rss:
+            samples.append(rss)
+        await asyncio.sleep(interval)
+
+
+async def fixture_posts(session_path: Path, url: str) -> list:
+    """Open the fixture with the poster's profile and read the posts it recorded."""
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(user_data_dir=str(session_path), headless=True)
+        page = context.pages[0] if context.pages else await context.new_page()
+        await page.goto(url)
+        posts = await page.evaluate("JSON.parse(localStorage.getItem('fixturePosts') || '[]')")
+        await context.close()
+    return posts
+
+
+def ledger_records(poster: LinkedInPoster) -> list:
+    """All publish attempts the poster recorded during the run."""
+    records = []
+    for path in sorted(poster.ledger.ledger_dir.glob("posts_*.jsonl")):
+        with open(path, 'r', encoding='utf-8') as f:
+            records += [json.loads(line) for line in f if line.strip()]
+    return records
+
+
+async def run_benchmark(posts: int, variant: str, delays: dict, paste: bool, headless: bool) -> dict:
+    """
+    Publish a queue of posts to the fixture with a fresh poster and collect timings.
+
+    Returns:
+        Dictionary of results for this queue size and selector variant
+    """
+    vault = Path(tempfile.mkdtemp(prefix="linkedin_bench_"))
+    use_vault(vault)
+    url = fixture_url(variant, delays['load'], delays['open'], delays['enable'], delays['publish'], paste)
+
+    poster = LinkedInPoster(headless=headless, min_spacing=0, linkedin_url=url)
+    write_queue(poster.ready_to_post, posts)
+
+    memory = []
+    sampler = asyncio.create_task(sample_memory(memory))
+    started = time.perf_counter()
+    processed = await poster.check_queue()
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await asyncio.gather(sampler, return_exceptions=True)
+
+    records = ledger_records(poster)
+    latencies = [r['latency_s'] for r in records if r.get('latency_s') is not None]
+    selector_waits = [r.get('stages', {}).get('selector_wait', 0.0) for r in records]
+    published = await fixture_posts(poster.session_path, url)
+    stats = poster.selectors.stats()
+
+    return {
+        'posts': posts,
+        'variant': variant,
+        'posted': len(processed),
+        'fixture_posts': len(published),
+        'failed_attempts': sum(1 for r in records if r['outcome'] != 'posted'),
+        'total_s': round(elapsed, 2),
+        'post_mean_s': round(statistics.mean(latencies), 2) if latencies else None,
+        'post_max_s': round(max(latencies), 2) if latencies else None,
+        'selector_wait_mean_s': round(statistics.mean(selector_waits), 3) if selector_waits else None,
+        'selector_wait_share': round(sum(selector_waits) / sum(latencies), 3) if latencies else None,
+        'session_overhead_s': round(elapsed - sum(latencies), 2),
+        'selector_cache_hits': stats['hits'],
+        'selector_cache_misses': stats['misses'],
+        'browser_rss_first_mb': memory[0] if memory else None,
+        'browser_rss_peak_mb': max(memory) if memory else None,
+        'browser_rss_last_mb': memory[-1] if memory else None,
+    }
+
+
+def main():
+    """Main entry point for LinkedIn benchmark."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark LinkedIn Poster against the offline fixture')
+    parser.add_argument('--posts', type=int, nargs='+', default=[10, 50],
+                       help='Queue sizes to benchmark (default: 10 50)')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=['current'],
+                       help='Fixture selector variants (default: current)')
+    parser.add_argument('--load', type=int, default=0,
+                       help='Milliseconds before the feed shows "Start a post" (default: 0)')
+    parser.add_argument('--open', type=int, default=300,
+                       help='Milliseconds for the composer to open (default: 300)')
+    parser.add_argument('--enable', type=int, default=100,
+                       help='Milliseconds before Post is enabled after input (default: 100)')
+    parser.add_argument('--publish', type=int, default=800,
+                       help='Milliseconds between clicking Post and the composer closing (default: 800)')
+    parser.add_argument('--no-paste', action='store_true',
+                       help='Make the editor ignore paste events (exercises the insert-text fallback)')
+    parser.add_argument('--headed', action='store_true', help='Show the browser window')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args()
+
+    if not FIXTURE_PATH.exists():
+        print(f"Error: fixture not found: {FIXTURE_PATH}")
+        sys.exit(1)
+
+    delays = {'load': args.load, 'open': args.open, 'enable': args.enable, 'publish': args.publish}
+    results = [
+        asyncio.run(run_benchmark(posts, variant, delays, paste=not args.no_paste, headless=not args.headed))
+        for variant in args.variants
+        for posts in args.posts
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("\n" + "="*60)
+    print("LINKEDIN POSTER BENCHMARK")
+    print("="*60)
+    for r in results:
+        print(f"Posts: {r['posts']} (selector variant: {r['variant']})")
+        print(f"  Posted: {r['posted']} (fixture received {r['fixture_posts']}, "
+              f"{r['failed_attempts']} failed attempts)")
+        print(f"  Time per post: {r['post_mean_s']}s mean, {r['post_max_s']}s max "
+              f"({r['total_s']}s total, {r['session_overhead_s']}s outside posts)")
+        print(f"  Selector waits: {r['selector_wait_mean_s']}s per post "
+              f"({r['selector_wait_share']} of post time)")
+        print(f"  Selector cache: {r['selector_cache_hits']} hits, {r['selector_cache_misses']} misses")
+        if r['browser_rss_peak_mb'] is not None:
+            print(f"  Browser memory: {r['browser_rss_first_mb']} MB first, "
+                  f"{r['browser_rss_peak_mb']} MB peak, {r['browser_rss_last_mb']} MB last")
+        else:
+            print("  Browser memory: install psutil to measure")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+WhatsApp Watcher Benchmark
+Runs WhatsAppWatcher against the offline fixture (fixtures/whatsapp_web.html)
+and reports scrape time per poll, detection rate and false duplicates.
+
+No phone or WhatsApp session is needed.
+
+Usage:
+    python benchmark_whatsapp.py
+    python benchmark_whatsapp.py --chats 100 500 --polls 5 --interval 2000
+"""
+import sys
+import time
+import json
+import tempfile
+import statistics
+from pathlib import Path
+from collections import Counter
+
+from whatsapp_watcher import WhatsAppWatcher, sync_playwright
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "whatsapp_web.html"
+KEYWORDS_FILE = Path(__file__).parent / "whatsapp_keywords.yaml"
+
+
+def fixture_url(chats: int, interval: int, start_ms: int, ratio: float, seed: int) -> str:
+    """Build the fixture URL for one benchmark run."""
+    return (f"{FIXTURE_PATH.resolve().as_uri()}?chats={chats}&interval={interval}"
+            f"&start={start_ms}&ratio={ratio}&seed={seed}")
+
+
+def injected_messages(url: str) -> list:
+    """Load the fixture once more and read its ground-truth message log."""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(url)
+        injected = page.evaluate("window.__fixture.injected")
+        browser.close()
+    return injected
+
+
+def run_benchmark(chats: int, polls: int, interval: int, max_chats: int,
+                  ratio: float, seed: int, headless: bool) -> dict:
+    """
+    Poll the fixture with a fresh watcher and collect timings.
+
+    Returns:
+        Dictionary of results for this chat count
+    """
+    vault = Path(tempfile.mkdtemp(prefix="whatsapp_bench_"))
+    url = fixture_url(chats, interval, int(time.time() * 1000), ratio, seed)
+
+    watcher = WhatsAppWatcher(
+        vault_path=str(vault),
+        keywords_file=str(KEYWORDS_FILE),
+        whatsapp_url=url,
+        max_chats=max_chats,
+        headless=headless
+    )
+
+    poll_times = []
+    reported = Counter()
+    for _ in range(polls):
+        started = time.perf_counter()
+        messages = watcher.check_for_updates()
+        poll_times.append(time.perf_counter() - started)
+        watcher._save_state()
+        for message in messages:
+            reported[(message['sender'], message['message'])] += 1
+
+    injected = injected_messages(url)
+    total_time = sum(poll_times)
+    detected = sum(reported.values())
+
+    return {
+        'chats': chats,
+        'polls': polls,
+        'poll_mean_s': round(statistics.mean(poll_times), 2),
+        'poll_max_s': round(max(poll_times), 2),
+        'detected': detected,
+        'detected_per_s': round(detected / total_time, 2) if total_time else 0.0,
+        'false_duplicates': sum(count - 1 for count in reported.values() if count > 1),
+        'keyword_messages_injected': sum(1 for m in injected if m['keyword']),
+        'state_entries': len(watcher.state),
+    }
+
+
+def main():
+    """Main entry point for WhatsApp benchmark."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark WhatsApp Watcher against the offline fixture')
+    parser.add_argument('--chats', type=int, nargs='+', default=[100, 300],
+                       help='Chat counts to benchmark (default: 100 300)')
+    parser.add_argument('--polls', type=int, default=3,
+                       help='Polls per chat count (default: 3)')
+    parser.add_argument('--interval', type=int, default=2000,
+                       help='Milliseconds between injected messages (default: 2000)')
+    parser.add_argument('--max-chats', type=int, default=20,
+                       help='Chats the watcher inspects per poll (default: 20)')
+    parser.add_argument('--ratio', type=float, default=0.3,
+                       help='Share of injected messages with a keyword (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=1, help='Fixture PRNG seed')
+    parser.add_argument('--headed', action='store_true', help='Show the browser window')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args()
+
+    if not FIXTURE_PATH.exists():
+        print(f"Error: fixture not found: {FIXTURE_PATH}")
+        sys.exit(1)
+
+    results = [
+        run_benchmark(chats, args.polls, args.interval, args.max_chats,
+                      args.ratio, args.seed, headless=not args.headed)
+        for chats in args.chats
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("\n" + "="*60)
+    print("WHATSAPP WATCHER BENCHMARK")
+    print("="*60)
+    for r in results:
+        print(f"Chats: {r['chats']} ({r['polls']} polls)")
+        print(f"  Scrape time per poll: {r['poll_mean_s']}s mean, {r['poll_max_s']}s max")
+        print(f"  Messages detected: {r['detected']} ({r['detected_per_s']}/s)")
+        print(f"  Keyword messages injected: {r['keyword_messages_injected']}")
+        print(f"  False duplicates: {r['false_duplicates']}")
+        print(f"  State entries: {r['state_entries']}")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
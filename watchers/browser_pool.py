@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Browser Pool for AI Employee
+Keeps one shared Chromium process for the WhatsApp Watcher and LinkedIn
+Poster instead of each launching its own.
+
+The pool starts Chromium with a local CDP endpoint and runs a small lease
+service on localhost (newline-delimited JSON). Clients acquire a lease for
+their integration, connect over CDP, open an isolated context seeded from
+that integration's saved storage state, and release the lease when done.
+The pool enforces a limit on concurrent pages and on total browser memory.
+
+Usage:
+    python browser_pool.py [--port 9230] [--max-pages 4] [--max-memory-mb 1500]
+
+Clients:
+    python whatsapp_watcher.py --browser-pool 127.0.0.1:9230
+    python linkedin_poster.py --check-queue --browser-pool 127.0.0.1:9230
+"""
+import asyncio
+import json
+import logging
+import socket
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Configuration
+VAULT_PATH = Path(__file__).parent.parent / "AI_Employee_Vault"
+POOL_PATH = Path(__file__).parent / "browser_pool"
+DEFAULT_POOL_ADDRESS = "127.0.0.1:9230"
+
+logger = logging.getLogger('BrowserPool')
+
+
+class BrowserPool:
+    """Shared Chromium process with leased, per-integration contexts."""
+
+    def __init__(self, port: int = 9230, cdp_port: int = 9231, max_pages: int = 4,
+                 max_memory_mb: int = 1500, lease_timeout: int = 900,
+                 headless: bool = True, pool_path: Path = POOL_PATH):
+        """
+        Initialize Browser Pool.
+
+        Args:
+            port: Lease service port on 127.0.0.1
+            cdp_port: Chromium remote debugging port
+            max_pages: Maximum leases (one page each) handed out at once
+            max_memory_mb: Refuse new leases while browser RSS exceeds this
+            lease_timeout: Seconds after which an unreleased lease is reclaimed
+            headless: Run Chromium without a window
+            pool_path: Directory for the browser profile and storage states
+        """
+        self.port = port
+        self.cdp_port = cdp_port
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+        self.headless = headless
+        self.pool_path = Path(pool_path)
+        self.pool_path.mkdir(parents=True, exist_ok=True)
+
+        self.leases: Dict[str, Dict] = {}
+        self.process: Optional[subprocess.Popen] = None
+        self.executable: Optional[str] = None
+        self._starting: Optional[asyncio.Lock] = None
+
+        if psutil is None:
+            logger.warning("psutil not installed - browser memory limit "
+                           f"({self.max_memory_mb} MB) will not be enforced")
+
+    @property
+    def cdp_endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.cdp_port}"
+
+    def storage_state_path(self, integration: str) -> Path:
+        """Saved cookies/localStorage for one integration."""
+        safe_name = ''.join(c for c in integration if c.isalnum() or c in '-_')
+        return self.pool_path / f"{safe_name}_state.json"
+
+    def resolve_executable(self) -> str:
+        """
+        Look up Playwright's Chromium binary (once).
+
+        Uses the sync Playwright API, so call it before the event loop
+        starts or from a worker thread, never on the loop itself.
+        """
+        if not self.executable:
+            from playwright.sync_api import sync_playwright
+
+            with sync_playwright() as p:
+                self.executable = p.chromium.executable_path
+        return self.executable
+
+    def start_browser(self):
+        """
+        Launch the shared Chromium process with a CDP endpoint.
+
+        Blocks until CDP answers; from async code run it through
+        asyncio.to_thread (see ensure_browser).
+        """
+        args = [
+            self.resolve_executable(),
+            f'--remote-debugging-port={self.cdp_port}',
+            '--remote-debugging-address=127.0.0.1',
+            # Scratch profile for the process only: every lease gets its own
+            # off-the-record context, and sessions live in the per-integration
+            # storage state files, never in this directory
+            f'--user-data-dir={self.pool_path / "profile"}',
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage',
+            '--no-first-run',
+            '--no-default-browser-check',
+            'about:blank'
+        ]
+        if self.headless:
+            args.insert(1, '--headless=new')
+
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._wait_for_cdp()
+        logger.info(f"Chromium started (pid {self.process.pid}), CDP at {self.cdp_endpoint}")
+
+    def _wait_for_cdp(self, timeout: float = 30.0):
+        """Block until the CDP port accepts connections."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Chromium exited during startup")
+            try:
+                with socket.create_connection(('127.0.0.1', self.cdp_port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError("Timed out waiting for Chromium CDP endpoint")
+
+    def browser_memory_mb(self) -> Optional[float]:
+        """Total RSS of the Chromium process tree, or None without psutil."""
+        if psutil is None or not self.process:
+            return None
+        try:
+            root = psutil.Process(self.process.pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+
+        rss = 0
+        for proc in procs:
+            try:
+                rss += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return round(rss / (1024 * 1024), 1)
+
+    def _reclaim_expired(self):
+        """Drop leases whose client never released them."""
+        now = time.monotonic()
+        for lease_id, lease in list(self.leases.items()):
+            if now - lease['acquired'] > self.lease_timeout:
+                logger.warning(f"Reclaiming expired lease {lease_id} ({lease['integration']})")
+                del self.leases[lease_id]
+
+    @property
+    def browser_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def ensure_browser(self):
+        """(Re)start Chromium off the event loop if it is not running."""
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if not self.browser_running:
+                if self.process is not None:
+                    logger.warning("Chromium is not running, restarting")
+                await asyncio.to_thread(self.start_browser)
+
+    def acquire(self, integration: str) -> Dict:
+        """Hand out a lease if Chromium is up and page and memory limits allow it."""
+        self._reclaim_expired()
+
+        if not self.browser_running:
+            return {'ok': False, 'error': 'browser not running'}
+
+        if len(self.leases) >= self.max_pages:
+            return {'ok': False, 'error': f'page limit reached ({self.max_pages})'}
+
+        memory_mb = self.browser_memory_mb()
+        if memory_mb is not None and memory_mb > self.max_memory_mb:
+            return {'ok': False, 'error': f'memory limit reached ({memory_mb} MB > {self.max_memory_mb} MB)'}
+
+        lease_id = uuid.uuid4().hex
+        self.leases[lease_id] = {'integration': integration, 'acquired': time.monotonic()}
+        logger.info(f"Lease {lease_id[:8]} -> {integration} ({len(self.leases)}/{self.max_pages} pages)")
+
+        return {
+            'ok': True,
+            'lease': lease_id,
+            'cdp_endpoint': self.cdp_endpoint,
+            'storage_state': str(self.storage_state_path(integration)),
+            'headless': self.headless
+        }
+
+    def release(self, lease_id: str) -> Dict:
+        """Return a lease to the pool."""
+        lease = self.leases.pop(lease_id, None)
+        if lease:
+            logger.info(f"Lease {lease_id[:8]} released by {lease['integration']}")
+        return {'ok': lease is not None}
+
+    def status(self) -> Dict:
+        """Current pool usage."""
+        self._reclaim_expired()
+        return {
+            'ok': True,
+            'pages': len(self.leases),
+            'max_pages': self.max_pages,
+            'memory_mb': self.browser_memory_mb(),
+            'max_memory_mb': self.max_memory_mb,
+            'memory_limit_enforced': psutil is not None,
+            'integrations': sorted({lease['integration'] for lease in self.leases.values()})
+        }
+
+    async def _handle_client(self, reader, writer):
+        """Serve newline-delimited JSON requests from one client."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                    if op == 'acquire':
+                        await self.ensure_browser()
+                        response = self.acquire(request.get('integration', 'default'))
+                    elif op == 'release':
+                        response = self.release(request.get('lease', ''))
+                    elif op == 'status':
+                        response = self.status()
+                    else:
+                        response = {'ok': False, 'error': f'unknown op: {op}'}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                writer.write((json.dumps(response) + '\n').encode('utf-8'))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Start Chromium and serve lease requests until cancelled."""
+        await self.ensure_browser()
+        server = await asyncio.start_server(self._handle_client, '127.0.0.1', self.port)
+        logger.info(f"Browser pool listening on 127.0.0.1:{self.port}")
+        logger.info(f"Limits: {self.max_pages} pages, {self.max_memory_mb} MB")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Terminate the shared Chromium process."""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        logger.info("Browser pool stopped")
+
+
+class BrowserPoolClient:
+    """Lease client used by the watchers (blocking; wrap in a thread from async code)."""
+
+    def __init__(self, address: str = DEFAULT_POOL_ADDRESS, timeout: float = 10.0):
+        """
+        Initialize Browser Pool client.
+
+        Args:
+            address: host:port of the pool's lease service
+            timeout: Socket timeout in seconds
+        """
+        host, _, port = address.rpartition(':')
+        self.host = host or '127.0.0.1'
+        self.port = int(port)
+        self.timeout = timeout
+
+    def _request(self, payload: Dict) -> Dict:
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall((json.dumps(payload) + '\n').encode('utf-8'))
+            with sock.makefile('r', encoding='utf-8') as f:
+                return json.loads(f.readline())
+
+    def acquire(self, integration: str, wait: float = 60.0) -> Dict:
+        """
+        Acquire a lease, retrying while the pool is at its limits.
+
+        Returns:
+            Lease dictionary with lease, cdp_endpoint and storage_state
+
+        Raises:
+            RuntimeError: If no lease is granted within wait seconds
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            response = self._request({'op': 'acquire', 'integration': integration})
+            if response.get('ok'):
+                return response
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Browser pool refused lease: {response.get('error')}")
+            time.sleep(2)
+
+    def release(self, lease_id: str):
+        """Release a lease."""
+        self._request({'op': 'release', 'lease': lease_id})
+
+    def status(self) -> Dict:
+        """Fetch pool usage."""
+        return self._request({'op': 'status'})
+
+
+def main():
+    """Main entry point for Browser Pool."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared Chromium pool for AI Employee browser automation')
+    parser.add_argument('--port', type=int, default=9230, help='Lease service port (default: 9230)')
+    parser.add_argument('--cdp-port', type=int, default=9231, help='Chromium CDP port (default: 9231)')
+    parser.add_argument('--max-pages', type=int, default=4, help='Concurrent page limit (default: 4)')
+    parser.add_argument('--max-memory-mb', type=int, default=1500,
+                       help='Browser memory limit in MB (default: 1500)')
+    parser.add_argument('--headed', action='store_true',
+                       help='Show the browser window (needed for first WhatsApp QR scan / LinkedIn login)')
+    parser.add_argument('--status', action='store_true', help='Print status of a running pool')
+
+    args = parser.parse_args()
+
+    if args.status:
+        print(json.dumps(BrowserPoolClient(f"127.0.0.1:{args.port}").status(), indent=2))
+        return
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(VAULT_PATH / "browser_pool.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+    pool = BrowserPool(
+        port=args.port,
+        cdp_port=args.cdp_port,
+        max_pages=args.max_pages,
+        max_memory_mb=args.max_memory_mb,
+        headless=not args.headed
+    )
+
+    try:
+        # Sync Playwright API: resolve before the event loop starts
+        pool.resolve_executable()
+        asyncio.run(pool.serve())
+    except KeyboardInterrupt:
+        logger.info("Shutting down Browser Pool...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Frontmatter Reader for AI Employee vault files
+Reads only the YAML header of a markdown file and loads the body on first
+access, so queue scans over many files never read message bodies they skip.
+Shared by the email sender and the LinkedIn poster.
+"""
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import yaml
+    # BaseLoader keeps every scalar a string, matching what callers expect
+    # ('2026-01-01' stays text, 'true' is not turned into a bool)
+    _Loader = getattr(yaml, 'CBaseLoader', yaml.BaseLoader)
+except ImportError:
+    yaml = None
+
+# A header longer than this is treated as no frontmatter at all
+MAX_HEADER_BYTES = 64 * 1024
+
+_KEY_LINE = re.compile(r'^([A-Za-z0-9_][\w\- ]*):(?:\s+(.*))?$')
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        inner = value[1:-1]
+        if value[0] == "'":
+            return inner.replace("''", "'")
+        return inner.replace('\\"', '"').replace('\\n', '\n').replace('\\\\', '\\')
+    return value
+
+
+def _parse_simple(header: str) -> Dict:
+    """
+    Line-based fallback for headers PyYAML cannot load (or when it is missing).
+
+    Handles quoted values, '|' and '>' block scalars, indented continuation
+    lines and '- item' lists; keeps everything else as raw text.
+    """
+    metadata: Dict = {}
+    key = None
+    block = None
+    for line in header.splitlines():
+        match = _KEY_LINE.match(line) if not line[:1].isspace() else None
+        if match:
+            key, value = match.group(1).strip(), (match.group(2) or '').strip()
+            block = value[:1] if value in ('|', '>', '|-', '>-') else None
+            metadata[key] = '' if block else _unquote(value)
+            continue
+        if key is None or not line.strip():
+            if key is not None and block == '|' and metadata[key]:
+                metadata[key] += '\n'
+            continue
+
+        stripped = line.strip()
+        current = metadata[key]
+        if not block and stripped.startswith('- ') and (current == '' or isinstance(current, list)):
+            metadata[key] = (current or []) + [_unquote(stripped[2:].strip())]
+        elif isinstance(current, list):
+            continue
+        elif block == '|':
+            metadata[key] = f"{current}\n{stripped}" if current and not current.endswith('\n') else current + stripped
+        else:
+            metadata[key] = f"{current} {stripped}" if current else stripped
+    return metadata
+
+
+def parse_header(header: str) -> Dict:
+    """Parse frontmatter text (without the --- delimiters) into a dict."""
+    if yaml is not None:
+        try:
+            data = yaml.load(header, Loader=_Loader)
+            if isinstance(data, dict):
+                return data
+        except yaml.YAMLError:
+            # Unquoted colons ("subject: Re: invoice") are common in vault files
+            pass
+    return _parse_simple(header)
+
+
+class FrontmatterDocument:
+    """Parsed header of one vault file; the body is read on first access."""
+
+    def __init__(self, path: Path, metadata: Dict, body_offset: int,
+                 size: int, mtime_ns: int):
+        self.path = path
+        self.metadata = metadata
+        self.body_offset = body_offset
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._body: Optional[str] = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def body(self) -> str:
+        """Everything after the closing '---', stripped; read from disk once."""
+        if self._body is None:
+            with open(self.path, 'rb') as f:
+                f.seek(self.body_offset)
+                self._body = f.read().decode('utf-8-sig' if self.body_offset == 0 else 'utf-8').strip()
+        return self._body
+
+
+def read_frontmatter(path: Path) -> FrontmatterDocument:
+    """
+    Read a file's frontmatter, stopping at the closing '---'.
+
+    Only a closing delimiter on its own line ends the header, so '---'
+    inside the body (horizontal rules, signatures) is left alone. Files
+    without a header get empty metadata and the whole file as body.
+
+    Args:
+        path: Markdown file
+
+    Returns:
+        FrontmatterDocument with metadata parsed and the body not yet read
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        first = f.readline(MAX_HEADER_BYTES)
+        if first.lstrip(b'\xef\xbb\xbf').strip() != b'---':
+            return FrontmatterDocument(path, {}, 0, stat.st_size, stat.st_mtime_ns)
+
+        lines = []
+        read = len(first)
+        while read < MAX_HEADER_BYTES:
+            line = f.readline(MAX_HEADER_BYTES - read)
+            if not line:
+                break
+            read += len(line)
+            if line.strip() == b'---':
+                header = b''.join(lines).decode('utf-8')
+                return FrontmatterDocument(path, parse_header(header), f.tell(),
+                                           stat.st_size, stat.st_mtime_ns)
+            lines.append(line)
+
+    # Unterminated or oversized header: not frontmatter
+    return FrontmatterDocument(path, {}, 0, stat.st_size, stat.st_mtime_ns)
+
+
+class FrontmatterCache:
+    """LRU of parsed headers, reused while a file's size and mtime are unchanged."""
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize cache.
+
+        Args:
+            max_entries: Parsed files kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def read(self, path: Path) -> FrontmatterDocument:
+        """Return the cached document for path, re-parsing if the file changed."""
+        path = Path(path)
+        stat = path.stat()
+        cache_key = str(path)
+        doc = self._entries.get(cache_key)
+        if doc is not None and doc.size == stat.st_size and doc.mtime_ns == stat.st_mtime_ns:
+            self._entries.move_to_end(cache_key)
+            self.stats['hits'] += 1
+            return doc
+
+        self.stats['misses'] += 1
+        doc = read_frontmatter(path)
+        self._entries[cache_key] = doc
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return doc
@@ -6,15 +6,84 @@ Automatically posts content to LinkedIn using Playwright browser automation.
 import asyncio
 import logging
 import json
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import datetime
-from playwright.async_api import async_playwright
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from frontmatter import FrontmatterCache
+from post_ledger import FAILED, POSTED, PostLedger
+from post_schedule import PostSchedule, parse_publish_at, priority_rank, watch_folder
 
 # Configuration
 VAULT_PATH = Path(__file__).parent.parent / "AI_Employee_Vault"
 READY_TO_POST_PATH = VAULT_PATH / "Ready_To_Post" / "LinkedIn"
 DONE_PATH = VAULT_PATH / "Done"
 ACCOUNTING_PATH = VAULT_PATH / "Accounting"
+LEDGER_PATH = VAULT_PATH / "Logs" / "LinkedIn"
+DEAD_LETTER_PATH = VAULT_PATH / "Dead_Letter" / "LinkedIn"
+SESSION_PATH = VAULT_PATH / "watchers" / "linkedin_session"
+SELECTOR_CACHE_PATH = VAULT_PATH / "watchers" / "linkedin_selectors.json"
+LINKEDIN_URL = "https://www.linkedin.com"
+LINKEDIN_FEED_URL = f"{LINKEDIN_URL}/feed/"
+
+# URL fragments LinkedIn redirects to when the session is not logged in
+LOGIN_URL_MARKERS = ('/login', '/authwall', '/checkpoint', '/uas/')
+
+# Candidate selectors for each posting step, raced against each other
+SELECTORS = {
+    'start_post': [
+        'button[aria-label="Start a post"]',
+        'button[data-control-name="create_post"]',
+        'span:has-text("Start a post")',
+        'div.share-box-feed-entry__trigger button'
+    ],
+    'editor': [
+        'div[contenteditable="true"][role="textbox"]',
+        'div[data-test-urn="post-text-area"]',
+        'div[data-control-name="post-content"]',
+        'textarea[name="post-text"]'
+    ],
+    'submit': [
+        'button[aria-label="Post"]',
+        'button[data-control-name="submit_post"]',
+        'button:text-is("Post")',
+        'div.share-actions button:has-text("Post")'
+    ],
+}
+SUCCESS_TOAST_SELECTOR = '.artdeco-toast-item, [data-test-artdeco-toast-item-type="success"]'
+
+# Minimum minutes between two posts
+MIN_SPACING_MINUTES = 10
+# A post that failed is tried again after this many seconds
+RETRY_DELAY_S = 900
+# After this many failed attempts a post is moved to Dead_Letter/LinkedIn/ (0 = retry forever)
+MAX_ATTEMPTS = 3
+# Without watchdog, --schedule rescans the queue folder this often
+RESCAN_SECONDS = 300
+
+SELECTOR_TIMEOUT_MS = 5000
+# Head start for the selector that worked last time before the others join the race
+CACHED_SELECTOR_GRACE_S = 1.0
+POST_CONFIRM_TIMEOUT_MS = 30000
+
+# Paste the post as plain text, the way the rich-text editor expects a real paste
+PASTE_SCRIPT = """(el, text) => {
+    const data = new DataTransfer();
+    data.setData('text/plain', text);
+    el.dispatchEvent(new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true}));
+}"""
+EDITOR_CONTAINS_SCRIPT = """([el, snippet]) =>
+    (el.value ?? el.innerText).replace(/\\s+/g, ' ').includes(snippet)"""
+# Toasts already on screen before Post is clicked do not confirm the new post
+MARK_TOASTS_SCRIPT = """toast =>
+    document.querySelectorAll(toast).forEach(t => t.dataset.posterSeen = '1')"""
+PUBLISHED_SCRIPT = """([el, toast]) =>
+    !el.isConnected || el.offsetParent === null ||
+    Array.from(document.querySelectorAll(toast)).some(t => !t.dataset.posterSeen)"""
 
 # Setup logging
 logging.basicConfig(
@@ -28,16 +97,127 @@ logging.basicConfig(
 logger = logging.getLogger('LinkedInPoster')
 
 
+class SelectorCache:
+    """
+    The selector that last worked for each posting step, with hit/miss counts.
+
+    Stored as a small JSON file so later runs try the known-good selector
+    first; a miss means LinkedIn changed its markup and the race picked a
+    new winner.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize selector cache.
+
+        Args:
+            path: JSON file holding the cache
+        """
+        self.path = Path(path)
+        self.steps: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load()
+
+    def get(self, step: str) -> Optional[str]:
+        """Return the selector that last worked for a step."""
+        entry = self.steps.get(step)
+        return entry.get('selector') if entry else None
+
+    def record(self, step: str, selector: Optional[str]):
+        """
+        Record the outcome of a lookup.
+
+        Args:
+            step: Posting step
+            selector: Selector that found the element, or None if none did
+        """
+        entry = self.steps.setdefault(step, {'selector': None, 'hits': 0, 'misses': 0})
+        if selector and selector == entry['selector']:
+            entry['hits'] += 1
+        else:
+            entry['misses'] += 1
+            if selector:
+                entry['selector'] = selector
+        entry['updated'] = datetime.now().isoformat()
+        self._dirty = True
+
+    def stats(self) -> Dict[str, int]:
+        """Total hits and misses over all steps."""
+        return {
+            'hits': sum(entry['hits'] for entry in self.steps.values()),
+            'misses': sum(entry['misses'] for entry in self.steps.values())
+        }
+
+    def save(self):
+        """Write the cache if it changed."""
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self.steps, indent=2), encoding='utf-8')
+            tmp.replace(self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save selector cache: {e}")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            self.steps = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable selector cache {self.path}: {e}")
+            self.steps = {}
+
+
 class LinkedInPoster:
     """LinkedIn Poster for automated posting via browser automation."""
 
-    def __init__(self):
-        """Initialize LinkedIn Poster."""
+    def __init__(self, browser_pool: str = None, session_path: Optional[Path] = None,
+                 headless: bool = False, login_timeout: int = 300, review_seconds: int = 0,
+                 selector_cache: Optional[Path] = None, min_spacing: float = MIN_SPACING_MINUTES * 60,
+                 linkedin_url: str = LINKEDIN_FEED_URL, max_attempts: int = MAX_ATTEMPTS):
+        """
+        Initialize LinkedIn Poster.
+
+        Args:
+            browser_pool: host:port of a running browser_pool.py to share Chromium with
+            session_path: Browser profile that keeps the LinkedIn login
+                (default: AI_Employee_Vault/watchers/linkedin_session)
+            headless: Run without a browser window (requires a saved login)
+            login_timeout: Seconds to wait for a manual login
+            review_seconds: Keep the browser open this long after each post for review
+            selector_cache: JSON file remembering which selector worked for each step
+                (default: AI_Employee_Vault/watchers/linkedin_selectors.json)
+            min_spacing: Minimum seconds between two posts
+            linkedin_url: Feed page to post from (default: LinkedIn; use a fixtures/ file:// URL offline)
+            max_attempts: Failed attempts before a post is moved to Dead_Letter/LinkedIn/
+                (0 = retry forever)
+        """
+        self.browser_pool = browser_pool
+        self._lease = None
+        self._browser = None
+        self.session_path = Path(session_path or SESSION_PATH)
+        self.session_path.mkdir(parents=True, exist_ok=True)
+        self.headless = headless
+        self.login_timeout = login_timeout
+        self.review_seconds = review_seconds
+        self.linkedin_url = linkedin_url
+        self.max_attempts = max_attempts
+        self.last_timings = {}
+        self.last_error = None
+        self.selectors = SelectorCache(selector_cache or SELECTOR_CACHE_PATH)
+        self.schedule = PostSchedule(min_spacing)
+        self.frontmatter = FrontmatterCache()
         self.ready_to_post = READY_TO_POST_PATH
         self.ready_to_post.mkdir(parents=True, exist_ok=True)
         self.done_path = DONE_PATH
         self.accounting_path = ACCOUNTING_PATH
         self.accounting_path.mkdir(parents=True, exist_ok=True)
+        self.ledger = PostLedger(LEDGER_PATH)
+        # Spacing counts from the last post of any earlier run too
+        self.schedule.last_posted = self.ledger.last_posted()
 
     def parse_post_file(self, post_file: Path) -> dict:
         """
@@ -50,38 +230,11 @@ class LinkedInPoster:
             Dictionary with post content and metadata
         """
         try:
-            content = post_file.read_text(encoding='utf-8')
-
-            # Extract metadata
-            metadata = {}
-            in_frontmatter = False
-            frontmatter_lines = []
-
-            for line in content.split('\n'):
-                if line.strip() == '---':
-                    if not in_frontmatter:
-                        in_frontmatter = True
-                        continue
-                    else:
-                        break
-                if in_frontmatter:
-                    frontmatter_lines.append(line)
-
-            for line in frontmatter_lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    metadata[key.strip()] = value.strip()
-
-            # Extract post content (after second ---)
-            parts = content.split('---', 2)
-            if len(parts) > 2:
-                post_content = parts[2].strip()
-            else:
-                post_content = content
+            doc = self.frontmatter.read(post_file)
 
             return {
-                'metadata': metadata,
-                'content': post_content,
+                'metadata': doc.metadata,
+                'content': doc.body,
                 'file_path': post_file
             }
 
@@ -89,10 +242,111 @@ class LinkedInPoster:
             logger.error(f"Error parsing post file {post_file}: {e}")
             return None
 
+    def _is_logged_in_before(self) -> bool:
+        """Check whether the profile directory holds a previous login."""
+        return any(self.session_path.iterdir())
+
+    async def _open_context(self, p):
+        """
+        Open the persistent LinkedIn profile, or a context leased from the browser pool.
+
+        The profile directory keeps cookies between runs, so the manual
+        login is needed once rather than on every post.
+        """
+        if not self.browser_pool:
+            headless = self.headless
+            if headless and self.linkedin_url == LINKEDIN_FEED_URL and not self._is_logged_in_before():
+                logger.info("No saved LinkedIn login - opening a window to log in")
+                headless = False
+            return await p.chromium.launch_persistent_context(
+                user_data_dir=str(self.session_path),
+                headless=headless,
+                args=['--disable-blink-features=AutomationControlled']
+            )
+
+        from browser_pool import BrowserPoolClient
+
+        client = BrowserPoolClient(self.browser_pool)
+        self._lease = await asyncio.to_thread(client.acquire, 'linkedin')
+        self._browser = await p.chromium.connect_over_cdp(self._lease['cdp_endpoint'])
+        storage_state = Path(self._lease['storage_state'])
+        if storage_state.exists():
+            return await self._browser.new_context(storage_state=str(storage_state))
+        return await self._browser.new_context()
+
+    async def _save_session(self, context):
+        """Persist the login to the pool's storage state for this integration."""
+        if self._lease:
+            await context.storage_state(path=self._lease['storage_state'])
+
+    async def _close_context(self, context):
+        """Close the context (the persistent profile saves itself) and return any pool lease."""
+        try:
+            await self._save_session(context)
+            await context.close()
+            if self._browser:
+                await self._browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing LinkedIn browser: {e}")
+        finally:
+            self._browser = None
+            await self._release_lease()
+
+    async def _ensure_logged_in(self, page):
+        """Open the feed, waiting for a manual login if LinkedIn asks for one."""
+        await page.goto(self.linkedin_url)
+        await page.wait_for_load_state('domcontentloaded')
+
+        if any(marker in page.url for marker in LOGIN_URL_MARKERS):
+            logger.info("Login required - please log in manually")
+            logger.info("Waiting for login...")
+            await page.wait_for_url('**/feed/**', timeout=self.login_timeout * 1000)
+            logger.info("Login successful!")
+
+    @asynccontextmanager
+    async def session(self):
+        """
+        One browser session, logged in, for any number of posts.
+
+        Yields:
+            A page on the LinkedIn feed
+        """
+        started = time.perf_counter()
+        async with async_playwright() as p:
+            context = await self._open_context(p)
+            try:
+                page = context.pages[0] if context.pages else await context.new_page()
+                await self._ensure_logged_in(page)
+                await self._save_session(context)
+                logger.info(f"LinkedIn session ready in {time.perf_counter() - started:.1f}s")
+                yield page
+            finally:
+                await self._close_context(context)
+                self.selectors.save()
+                stats = self.selectors.stats()
+                logger.info(f"Selector cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    async def _release_lease(self):
+        """Return the pool lease, if one is held."""
+        if not self._lease:
+            return
+
+        from browser_pool import BrowserPoolClient
+
+        try:
+            client = BrowserPoolClient(self.browser_pool)
+            await asyncio.to_thread(client.release, self._lease['lease'])
+        except OSError as e:
+            logger.warning(f"Could not release browser pool lease: {e}")
+        self._lease = None
+
     async def post_to_linkedin(self, content: str, post_file: Path = None) -> bool:
         """
         Post content to LinkedIn using Playwright.
 
+        Opens a session for this one post; use check_queue to post several
+        in one session.
+
         Args:
             content: Post content to publish
             post_file: Original post file path (for logging)
@@ -100,186 +354,271 @@ class LinkedInPoster:
         Returns:
             True if successful
         """
+        started = datetime.now()
+        self.last_timings, self.last_error = {}, None
+        success = False
         try:
             logger.info("Starting LinkedIn posting automation...")
+            async with self.session() as page:
+                success = await self.publish(page, content, post_file)
 
-            async with async_playwright() as p:
-                # Launch browser
-                browser = await p.chromium.launch(headless=False)
-                context = await browser.new_context()
-                page = await context.new_page()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error posting to LinkedIn: {e}")
 
-                # Navigate to LinkedIn
-                logger.info("Navigating to LinkedIn...")
-                await page.goto('https://www.linkedin.com/login')
-                await page.wait_for_load_state('networkidle')
+        post_id = post_file.stem if post_file else f"direct_{started.strftime('%Y%m%d_%H%M%S')}"
+        self._record_attempt(post_id, started, success, content)
+        return success
 
-                # Check if already logged in or need to login
-                if 'login' in page.url:
-                    logger.info("Login required - please log in manually")
-                    logger.info("Waiting for login...")
+    async def _find(self, page, step: str):
+        """
+        Find the element for a posting step by racing its candidate selectors.
 
-                    # Wait for user to login manually (up to 5 minutes)
-                    await page.wait_for_url('feed/', timeout=300000)
-                    logger.info("Login successful!")
+        The selector cached from earlier runs gets a short head start;
+        after that every other candidate is awaited concurrently, so a
+        broken selector costs nothing once another one matches. The winner
+        is recorded in the selector cache, and the wait is added to
+        last_timings['selector_wait'].
 
-                # Navigate to start a post
-                logger.info("Navigating to create post...")
-                await page.goto('https://www.linkedin.com/feed/')
-                await page.wait_for_load_state('networkidle')
+        Returns:
+            The element, or None if no selector matched within the timeout
+        """
+        candidates = SELECTORS[step]
+        cached = self.selectors.get(step)
+        if cached not in candidates:
+            cached = None
 
-                # Click "Start a post" button
-                try:
-                    # Try multiple selectors for the post button
-                    post_button_selectors = [
-                        'button[aria-label="Start a post"]',
-                        'button[data-control-name="create_post"]',
-                        'span:has-text("Start a post")',
-                        'div.share-box-feed-entry__trigger button'
-                    ]
-
-                    post_button = None
-                    for selector in post_button_selectors:
-                        try:
-                            post_button = await page.wait_for_selector(selector, timeout=5000)
-                            if post_button:
-                                break
-                        except:
-                            continue
-
-                    if post_button:
-                        await post_button.click()
-                        await page.wait_for_timeout(2000)
-                    else:
-                        logger.error("Could not find 'Start a post' button")
-                        return False
+        started = time.perf_counter()
+        waits = {}
 
-                except Exception as e:
-                    logger.error(f"Error clicking post button: {e}")
-                    return False
-
-                # Wait for text editor to appear
-                logger.info("Waiting for text editor...")
-                await page.wait_for_timeout(2000)
-
-                # Find text area and type content
-                text_area_selectors = [
-                    'div[contenteditable="true"][role="textbox"]',
-                    'div[data-test-urn="post-text-area"]',
-                    'div[data-control-name="post-content"]',
-                    'textarea[name="post-text"]'
-                ]
-
-                text_area = None
-                for selector in text_area_selectors:
-                    try:
-                        text_area = await page.wait_for_selector(selector, timeout=5000)
-                        if text_area:
-                            break
-                    except:
-                        continue
-
-                if text_area:
-                    # Click on text area to focus
-                    await text_area.click()
-                    await page.wait_for_timeout(500)
-
-                    # Type the content
-                    await text_area.type(content, delay=10)
-                    logger.info("Content typed into LinkedIn post editor")
-                else:
-                    logger.error("Could not find text editor")
-                    return False
+        def race(selector: str):
+            wait = asyncio.ensure_future(page.wait_for_selector(selector, timeout=SELECTOR_TIMEOUT_MS))
+            waits[wait] = selector
 
-                # Wait a bit to see if post appeared
-                await page.wait_for_timeout(3000)
+        def winner(done):
+            # Among waits finishing together, prefer the cached selector, then candidate order
+            found = [(waits[wait], wait.result()) for wait in done
+                     if not wait.cancelled() and not wait.exception() and wait.result()]
+            found.sort(key=lambda item: (item[0] != cached, candidates.index(item[0])))
+            return found[0] if found else None
 
-                # Look for post button and click it
-                logger.info("Looking for post button...")
+        try:
+            result = None
+            if cached:
+                race(cached)
+                done, _ = await asyncio.wait(list(waits), timeout=CACHED_SELECTOR_GRACE_S)
+                result = winner(done)
+
+            if not result:
+                for selector in candidates:
+                    if selector != cached:
+                        race(selector)
+                pending = [wait for wait in waits if not wait.done()]
+                while pending and not result:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    result = winner(done)
+        finally:
+            for wait in waits:
+                wait.cancel()
+            await asyncio.gather(*waits, return_exceptions=True)
+            self.last_timings['selector_wait'] = round(
+                self.last_timings.get('selector_wait', 0) + time.perf_counter() - started, 3
+            )
+
+        self.selectors.record(step, result[0] if result else None)
+        return result[1] if result else None
+
+    async def _editor_shows(self, page, editor, content: str) -> bool:
+        """Wait briefly for the start of the post to show up in the editor."""
+        snippet = ' '.join(content.split())[:40]
+        try:
+            await page.wait_for_function(EDITOR_CONTAINS_SCRIPT, arg=[editor, snippet], timeout=2000)
+            return True
+        except PlaywrightTimeoutError:
+            return False
 
-                post_button_selectors = [
-                    'button[aria-label="Post"]',
-                    'button[data-control-name="submit_post"]',
-                    'button:has-text("Post")',
-                    'div.share-actions button:has-text("Post")'
-                ]
+    async def _insert_content(self, page, editor, content: str):
+        """
+        Put the whole post into the editor at once instead of typing it.
 
-                submit_button = None
-                for selector in post_button_selectors:
-                    try:
-                        submit_button = await page.wait_for_selector(selector, timeout=5000)
-                        if submit_button:
-                            break
-                    except:
-                        continue
-
-                if submit_button:
-                    await submit_button.click()
-                    logger.info("Post button clicked!")
-                    await page.wait_for_timeout(5000)
-                else:
-                    logger.warning("Could not find Post button - you may need to click manually")
+        A textarea is filled directly. LinkedIn's rich-text editor gets a
+        paste event, which it turns into paragraphs like a real paste; if
+        it ignores the paste, the text goes in as a single input event.
+        """
+        if await editor.evaluate("el => el.tagName") in ('TEXTAREA', 'INPUT'):
+            await editor.fill(content)
+            return
+
+        await editor.focus()
+        await editor.evaluate(PASTE_SCRIPT, content)
+        if await self._editor_shows(page, editor, content):
+            return
+
+        if (await editor.inner_text()).strip():
+            logger.warning("Editor text differs from the post after pasting - check the result")
+            return
+        await page.keyboard.insert_text(content)
+        if not await self._editor_shows(page, editor, content):
+            raise RuntimeError("post content did not appear in the editor")
+
+    def _on_feed(self, page) -> bool:
+        """Whether the page is the feed the composer is opened from."""
+        return urlsplit(page.url).path.rstrip('/') == urlsplit(self.linkedin_url).path.rstrip('/')
+
+    async def _wait_published(self, page, editor, timeout_ms: int) -> bool:
+        """Wait until the composer closes or LinkedIn shows its success toast."""
+        try:
+            await page.wait_for_function(PUBLISHED_SCRIPT, arg=[editor, SUCCESS_TOAST_SELECTOR],
+                                         timeout=timeout_ms)
+            return True
+        except PlaywrightTimeoutError:
+            return False
 
-                # Take screenshot for verification
-                screenshot_path = VAULT_PATH / f"linkedin_post_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                await page.screenshot(path=screenshot_path)
-                logger.info(f"Screenshot saved: {screenshot_path}")
+    async def publish(self, page, content: str, post_file: Path = None) -> bool:
+        """
+        Publish one post on an open, logged-in session page.
 
-                # Keep browser open for verification
-                logger.info("Browser will stay open for 30 seconds for verification...")
-                logger.info("You can cancel the post if something is wrong")
-                await page.wait_for_timeout(30000)
+        Every step waits for the page state it needs (button present,
+        editor visible, Post enabled, composer closed) rather than a fixed
+        delay. Stage durations are kept in self.last_timings.
 
-                await browser.close()
-                return True
+        Args:
+            page: Page from session()
+            content: Post content to publish
+            post_file: Original post file path (for logging)
 
-        except Exception as e:
-            logger.error(f"Error posting to LinkedIn: {e}")
+        Returns:
+            True if successful
+        """
+        timings = self.last_timings = {}
+        self.last_error = None
+        started = stage_started = time.perf_counter()
+
+        def fail(reason: str) -> bool:
+            self.last_error = reason
+            logger.error(reason)
             return False
 
-    async def check_queue(self) -> list:
-        """
-        Check Ready_To_Post/LinkedIn/ folder and process pending posts.
+        def lap(stage: str):
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = round(now - stage_started, 3)
+            stage_started = now
 
-        Returns:
-            List of processed posts
-        """
         try:
-            if not self.ready_to_post.exists():
-                logger.info("No Ready_To_Post/LinkedIn/ folder")
-                return []
-
-            post_files = list(self.ready_to_post.glob("*.md"))
+            # Open the composer; the editor appearing means the dialog is ready
+            logger.info("Opening the post composer...")
+            if not self._on_feed(page):
+                await page.goto(self.linkedin_url)
+
+            start_button = await self._find(page, 'start_post')
+            if not start_button:
+                return fail("Could not find 'Start a post' button")
+            await start_button.click()
+
+            editor = await self._find(page, 'editor')
+            if not editor:
+                return fail("Could not find text editor")
+            lap('open_composer')
+
+            await self._insert_content(page, editor, content)
+            logger.info(f"Inserted {len(content)} characters into the LinkedIn post editor")
+            lap('insert')
+
+            submit_button = await self._find(page, 'submit')
+            await page.evaluate(MARK_TOASTS_SCRIPT, SUCCESS_TOAST_SELECTOR)
+            if submit_button:
+                await submit_button.wait_for_element_state('enabled', timeout=SELECTOR_TIMEOUT_MS)
+                await submit_button.click()
+                logger.info("Post button clicked!")
+                confirm_timeout_ms = POST_CONFIRM_TIMEOUT_MS
+            else:
+                logger.warning("Could not find Post button - click it manually to publish")
+                confirm_timeout_ms = self.login_timeout * 1000
+            lap('submit')
+
+            if not await self._wait_published(page, editor, confirm_timeout_ms):
+                return fail("Post not confirmed: the composer is still open")
+            lap('confirm')
+            timings['total'] = round(time.perf_counter() - started, 3)
+
+            # Take screenshot for verification
+            screenshot_path = VAULT_PATH / f"linkedin_post_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            await page.screenshot(path=screenshot_path)
+            logger.info(f"Screenshot saved: {screenshot_path}")
+
+            if self.review_seconds:
+                logger.info(f"Browser stays open {self.review_seconds}s for review "
+                            f"(delete the post on LinkedIn if something is wrong)")
+                await page.wait_for_timeout(self.review_seconds * 1000)
+
+            logger.info(f"Published in {timings['total']:.1f}s "
+                        f"(composer {timings['open_composer']:.1f}s, insert {timings['insert']:.1f}s, "
+                        f"confirm {timings['confirm']:.1f}s, selector waits {timings['selector_wait']:.1f}s)")
+            return True
 
-            if not post_files:
-                logger.info("No LinkedIn posts ready")
-                return []
+        except Exception as e:
+            return fail(f"Error posting to LinkedIn: {e}")
 
-            logger.info(f"Found {len(post_files)} LinkedIn posts to process")
-            processed = []
+    def _schedule_file(self, post_file: Path):
+        """Add, update or drop one file in the schedule from its frontmatter."""
+        if not post_file.exists():
+            self.schedule.discard(post_file)
+            return
+        try:
+            metadata = self.frontmatter.read(post_file).metadata
+            publish_at = parse_publish_at(metadata.get('publish_at'))
+        except ValueError:
+            logger.warning(f"Not scheduling {post_file.name}: publish_at must be an ISO date/time")
+            self.schedule.discard(post_file)
+            return
+        except Exception as e:
+            logger.error(f"Error parsing post file {post_file}: {e}")
+            self.schedule.discard(post_file)
+            return
+        self.schedule.add(post_file, publish_at, priority_rank(metadata.get('priority')))
 
-            for post_file in post_files:
-                try:
-                    # Parse post file
-                    post_data = self.parse_post_file(post_file)
-                    if not post_data:
-                        continue
+    def load_schedule(self) -> PostSchedule:
+        """Scan Ready_To_Post/LinkedIn/ once and schedule every post in it."""
+        for post_file in sorted(self.ready_to_post.glob("*.md")):
+            self._schedule_file(post_file)
+        return self.schedule
 
-                    content = post_data['content']
+    async def _publish_due(self) -> list:
+        """
+        Publish due posts in one browser session, stopping at the first
+        post that is not due or has to wait for the minimum spacing.
 
+        Returns:
+            List of processed posts
+        """
+        processed = []
+        async with self.session() as page:
+            while True:
+                post_file = self.schedule.pop()
+                if post_file is None:
+                    break
+
+                post_data = self.parse_post_file(post_file)
+                if not post_data:
+                    continue
+                started = datetime.now()
+                success = False
+                gave_up = False
+                done_filename = None
+                try:
                     # Post to LinkedIn
                     logger.info(f"Posting: {post_file.name}")
-                    success = await self.post_to_linkedin(content, post_file)
+                    success = await self.publish(page, post_data['content'], post_file)
 
                     if success:
+                        self.schedule.mark_posted()
+
                         # Move to Done
                         done_filename = f"{datetime.now().strftime('%Y-%m-%d')}_posted_linkedin_{post_file.name}"
                         done_path = self.done_path / done_filename
                         post_file.rename(done_path)
 
-                        # Log to accounting
-                        self._log_post_activity(post_data, done_filename)
-
                         processed.append({
                             'original': str(post_file.name),
                             'done_file': str(done_filename),
@@ -287,32 +626,184 @@ class LinkedInPoster:
                         })
 
                         logger.info(f"Successfully posted and archived: {post_file.name}")
+                    else:
+                        attempts = self.ledger.failed_attempts(post_file.stem) + 1
+                        if self.max_attempts and attempts >= self.max_attempts:
+                            gave_up = self._dead_letter(post_file, attempts)
+                        else:
+                            logger.warning(f"{post_file.name} failed (attempt {attempts}); "
+                                           f"retrying in {RETRY_DELAY_S // 60} minutes")
+                            self.schedule.add(post_file, time.time() + RETRY_DELAY_S,
+                                              priority_rank(post_data['metadata'].get('priority')))
+                        if not page.is_closed():
+                            # Start the next post from the feed, not a half-filled dialog
+                            await page.goto(self.linkedin_url)
 
                 except Exception as e:
+                    self.last_error = self.last_error or str(e)
                     logger.error(f"Error processing {post_file.name}: {e}")
 
-            return processed
+                self._record_attempt(post_file.stem, started, success, post_data['content'],
+                                     post_data['metadata'], done_filename, gave_up)
+
+                if page.is_closed():
+                    logger.error("LinkedIn browser was closed - remaining posts stay queued")
+                    break
+
+        return processed
+
+    async def check_queue(self) -> list:
+        """
+        Check Ready_To_Post/LinkedIn/ folder and publish the posts that are due.
+
+        Posts whose publish_at is still ahead stay queued; due posts go
+        out by priority, at least min_spacing apart. A due post that would
+        break the spacing is left for the next check instead of holding the
+        browser open until its turn (run_schedule waits for it).
+
+        Returns:
+            List of processed posts
+        """
+        try:
+            if not self.ready_to_post.exists():
+                logger.info("No Ready_To_Post/LinkedIn/ folder")
+                return []
+
+            self.load_schedule()
+            due = self.schedule.due_count()
+            if not due:
+                if len(self.schedule):
+                    logger.info(f"No LinkedIn posts due ({len(self.schedule)} scheduled for later)")
+                else:
+                    logger.info("No LinkedIn posts ready")
+                return []
+
+            logger.info(f"Found {due} LinkedIn posts due ({len(self.schedule) - due} scheduled for later)")
+            return await self._publish_due()
 
         except Exception as e:
             logger.error(f"Error checking queue: {e}")
             return []
 
-    def _log_post_activity(self, post_data: dict, done_filename: str):
-        """Log post activity to accounting file."""
+    async def run_schedule(self):
+        """
+        Publish posts as they come due until interrupted.
+
+        The folder is scanned once; after that watchdog events keep the
+        schedule current, and the loop sleeps until exactly the next
+        publish time (or the next change to the folder).
+        """
+        changed = asyncio.Event()
+
+        def on_change(post_file: Path):
+            self._schedule_file(post_file)
+            changed.set()
+
+        self.load_schedule()
+        observer = watch_folder(self.ready_to_post, on_change)
+        if observer is None:
+            logger.warning(f"watchdog not installed - rescanning the queue every {RESCAN_SECONDS}s")
+        logger.info(f"Publishing schedule loaded: {len(self.schedule)} posts")
+
         try:
-            timestamp = datetime.now().strftime("%Y-%m")
-            metrics_file = self.accounting_path / f"LinkedIn_Metrics_{timestamp}.md"
+            while True:
+                next_at = self.schedule.next_post_at()
+                timeout = None if next_at is None else next_at - time.time()
+                if observer is None:
+                    timeout = RESCAN_SECONDS if timeout is None else min(timeout, RESCAN_SECONDS)
+                if next_at is not None:
+                    logger.info(f"Next LinkedIn post at {datetime.fromtimestamp(next_at):%Y-%m-%d %H:%M:%S}")
 
-            # Append to metrics file
-            with open(metrics_file, 'a') as f:
-                f.write(f"\n## Posted: {done_filename}\n")
-                f.write(f"- **Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"- **File:** {done_filename}\n")
-                f.write(f"- **Status:** Posted\n")
-                f.write("\n")
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                    changed.clear()
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+                if observer is None:
+                    self.load_schedule()
+                if self.schedule.due_count():
+                    try:
+                        await self._publish_due()
+                    except Exception as e:
+                        logger.error(f"Error publishing scheduled posts: {e}")
+                        await asyncio.sleep(RETRY_DELAY_S)
+        finally:
+            if observer is not None:
+                observer.stop()
+                await asyncio.to_thread(observer.join)
+
+    def _dead_letter(self, post_file: Path, attempts: int) -> bool:
+        """
+        Move a post that keeps failing to Dead_Letter/LinkedIn/ with an error note.
 
-        except Exception as e:
-            logger.error(f"Error logging post activity: {e}")
+        Returns:
+            True if the post was moved
+        """
+        reason = self.last_error or 'unknown error'
+        try:
+            DEAD_LETTER_PATH.mkdir(parents=True, exist_ok=True)
+            post_file.rename(DEAD_LETTER_PATH / post_file.name)
+            note = DEAD_LETTER_PATH / f"{post_file.stem}.error.md"
+            note.write_text(f"""---
+type: linkedin_dead_letter
+file: {post_file.name}
+attempts: {attempts}
+failed: {datetime.now().isoformat()}
+---
+
+# LinkedIn Post Not Published: {post_file.name}
+
+## Last Error
+{reason}
+
+## Next Steps
+- Check the feed first: a post that timed out may have been published anyway
+- Fix the problem (login, post content, selectors), then move the post back
+  to Ready_To_Post/LinkedIn/ to try again
+
+---
+*Moved to Dead_Letter by LinkedIn Poster*
+""", encoding='utf-8')
+            logger.error(f"Gave up on {post_file.name} after {attempts} failed attempts: {reason}")
+            return True
+        except OSError as e:
+            logger.error(f"Could not move {post_file.name} to Dead_Letter: {e}")
+            return False
+
+    def _record_attempt(self, post_id: str, started: datetime, success: bool, content: str,
+                        metadata: Optional[dict] = None, done_file: Optional[str] = None,
+                        gave_up: bool = False):
+        """Append a publish attempt to the activity ledger and refresh the monthly report."""
+        metadata = metadata or {}
+        timings = dict(self.last_timings)
+        latency = timings.pop('total', None)
+        try:
+            publish_at = parse_publish_at(metadata.get('publish_at'))
+        except ValueError:
+            publish_at = None
+
+        try:
+            self.ledger.append(
+                post_id, POSTED if success else FAILED, started,
+                content_length=len(content),
+                latency_s=latency if success else None,
+                stages=timings or None,
+                delay_s=round(time.time() - publish_at, 1) if success and publish_at else None,
+                priority=priority_rank(metadata.get('priority')),
+                done_file=done_file,
+                error=None if success else (self.last_error or 'unknown error'),
+                gave_up=gave_up or None
+            )
+            self.write_rollup()
+        except OSError as e:
+            logger.error(f"Error recording LinkedIn activity for {post_id}: {e}")
+
+    def write_rollup(self):
+        """Rewrite this month's Accounting/LinkedIn_Metrics_YYYY-MM.md from the ledger."""
+        month = datetime.now().strftime('%Y-%m')
+        self.ledger.write_rollup(month, self.accounting_path / f"LinkedIn_Metrics_{month}.md")
 
 
 async def main():
@@ -323,12 +814,29 @@ async def main():
     parser.add_argument('--post', type=str, help='Post content directly')
     parser.add_argument('--check-queue', action='store_true',
                        help='Check Ready_To_Post/LinkedIn/ and post pending content')
+    parser.add_argument('--schedule', action='store_true',
+                       help='Keep running and publish each post at its publish_at time')
     parser.add_argument('--list', action='store_true',
-                       help='List pending posts')
+                       help='List pending posts in publishing order')
+    parser.add_argument('--url', default=LINKEDIN_FEED_URL,
+                       help='Feed page to post from, e.g. file:// URL of fixtures/linkedin_feed.html')
+    parser.add_argument('--browser-pool', metavar='HOST:PORT',
+                       help='Use the shared Chromium from browser_pool.py instead of launching one')
+    parser.add_argument('--headless', action='store_true',
+                       help='Run without a browser window (after the first login)')
+    parser.add_argument('--review-seconds', type=int, default=0,
+                       help='Keep the browser open after each post for review (default: 0)')
+    parser.add_argument('--min-spacing', type=float, default=MIN_SPACING_MINUTES, metavar='MINUTES',
+                       help=f'Minimum minutes between two posts (default: {MIN_SPACING_MINUTES})')
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                       help=f'Failed attempts before a post is moved to Dead_Letter/LinkedIn/, '
+                            f'0 = retry forever (default: {MAX_ATTEMPTS})')
 
     args = parser.parse_args()
 
-    poster = LinkedInPoster()
+    poster = LinkedInPoster(browser_pool=args.browser_pool, headless=args.headless,
+                            review_seconds=args.review_seconds, min_spacing=args.min_spacing * 60,
+                            linkedin_url=args.url, max_attempts=args.max_attempts)
 
     if args.post:
         # Post content directly
@@ -345,19 +853,27 @@ async def main():
         processed = await poster.check_queue()
         logger.info(f"Processed {len(processed)} posts")
 
+    elif args.schedule:
+        logger.info("Running LinkedIn publishing schedule (Ctrl+C to stop)...")
+        await poster.run_schedule()
+
     elif args.list:
         # List pending posts
         if poster.ready_to_post.exists():
-            posts = list(poster.ready_to_post.glob("*.md"))
+            posts = poster.load_schedule().upcoming()
             logger.info(f"Found {len(posts)} pending LinkedIn posts:")
-            for post in posts:
-                logger.info(f"  - {post.name}")
+            for publish_at, rank, post in posts:
+                when = datetime.fromtimestamp(publish_at).strftime('%Y-%m-%d %H:%M') if publish_at else 'now'
+                logger.info(f"  - {post.name} (at {when}, priority {rank})")
         else:
             logger.info("No Ready_To_Post/LinkedIn/ folder")
 
     else:
-        logger.info("No action specified. Use --check-queue, --list, or --post")
+        logger.info("No action specified. Use --check-queue, --schedule, --list, or --post")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("LinkedIn Poster stopped")
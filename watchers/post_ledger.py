@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Activity Ledger for the LinkedIn Poster
+Appends one JSON line per publish attempt to a file per month, and
+generates the monthly markdown report in Accounting/ from running totals
+kept per ledger file, so reports never re-read or scrape old entries.
+Text below the report's footer (notes, or entries written by older
+versions) is kept when the report is regenerated.
+"""
+import json
+import statistics
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROLLUP_RECENT_ROWS = 50
+# Longer errors are cut short in the report table; the ledger keeps them whole
+ROLLUP_ERROR_CHARS = 120
+
+# Last line of the generated report; anything after it in the file is kept
+ROLLUP_FOOTER = "*Generated by LinkedIn Poster - text below this line is kept when the report is updated*"
+_FOOTER_PREFIX = "*Generated by LinkedIn Poster"
+
+POSTED = 'posted'
+FAILED = 'failed'
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return round(statistics.median(values), 2) if values else None
+
+
+def _cell(value, limit: Optional[int] = None) -> str:
+    """
+    A value as one markdown table cell: whitespace (newlines in
+    tracebacks, say) collapsed, pipes escaped, and cut to `limit` characters.
+    """
+    text = ' '.join(str(value).split())
+    if limit and len(text) > limit:
+        text = text[:limit - 1].rstrip() + '…'
+    return text.replace('|', '\\|')
+
+
+def _kept_text(rollup_path: Path) -> str:
+    """
+    Text of an existing report that is not generated.
+
+    That is everything after the footer line, or the whole file if it has
+    no footer (e.g. the free-form entries earlier versions appended).
+    """
+    try:
+        existing = rollup_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return ''
+    lines = existing.split('\n')
+    for index, line in enumerate(lines):
+        if line.startswith(_FOOTER_PREFIX):
+            return '\n'.join(lines[index + 1:]).strip('\n')
+    return existing.strip('\n')
+
+
+class PostLedger:
+    """Monthly JSONL files of LinkedIn publish attempts with incremental rollups."""
+
+    def __init__(self, ledger_dir: Path):
+        """
+        Initialize activity ledger.
+
+        Args:
+            ledger_dir: Directory for posts_YYYY-MM.jsonl files
+        """
+        self.ledger_dir = Path(ledger_dir)
+        # Running totals per month file and the offset they cover
+        self._summaries: Dict[Path, Dict] = {}
+
+    def month_file(self, month: str) -> Path:
+        return self.ledger_dir / f"posts_{month}.jsonl"
+
+    def append(self, post_id: str, outcome: str, started: datetime, **fields) -> Dict:
+        """
+        Record one publish attempt.
+
+        Args:
+            post_id: Stable ID of the post (its queue file name without .md)
+            outcome: POSTED or FAILED
+            started: When the attempt began
+            **fields: Extra fields (content_length, stages, latency_s, error, gave_up, ...)
+
+        Returns:
+            The stored record
+        """
+        finished = datetime.now()
+        record = {'post_id': post_id, 'outcome': outcome,
+                  'started': started.isoformat(timespec='milliseconds'),
+                  'finished': finished.isoformat(timespec='milliseconds')}
+        record.update({k: v for k, v in fields.items() if v is not None})
+
+        self.ledger_dir.mkdir(parents=True, exist_ok=True)
+        path = self.month_file(finished.strftime('%Y-%m'))
+        with open(path, 'ab') as f:
+            f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        return record
+
+    def summary(self, month: str) -> Dict:
+        """Totals for a month, updated from lines appended since the last call."""
+        path = self.month_file(month)
+        summary = self._summaries.get(path)
+        if summary is None:
+            summary = self._summaries[path] = {
+                'offset': 0,
+                'posted': 0,
+                'failed': 0,
+                'per_day': defaultdict(lambda: {POSTED: 0, FAILED: 0}),
+                'latencies': [],
+                'delays': [],
+                'stages': defaultdict(list),
+                'last_posted': None,
+                'recent': deque(maxlen=ROLLUP_RECENT_ROWS),
+                # Failures per post since its last success or give-up, and
+                # the posts that had one of those this month
+                'failures': defaultdict(int),
+                'reset': set()
+            }
+        if not path.exists() or path.stat().st_size <= summary['offset']:
+            return summary
+
+        with open(path, 'rb') as f:
+            f.seek(summary['offset'])
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # partial line still being written
+                summary['offset'] += len(raw)
+                try:
+                    self._add(summary, json.loads(raw))
+                except (ValueError, KeyError):
+                    continue
+        return summary
+
+    @staticmethod
+    def _add(summary: Dict, record: Dict):
+        outcome = record['outcome']
+        summary['per_day'][record['finished'][:10]][outcome] += 1
+        summary['recent'].append(record)
+        post_id = record['post_id']
+        if outcome != POSTED:
+            summary['failed'] += 1
+            summary['failures'][post_id] += 1
+            if record.get('gave_up'):
+                summary['failures'].pop(post_id)
+                summary['reset'].add(post_id)
+            return
+
+        summary['failures'].pop(post_id, None)
+        summary['reset'].add(post_id)
+        summary['posted'] += 1
+        summary['last_posted'] = record['finished']
+        if record.get('latency_s') is not None:
+            summary['latencies'].append(record['latency_s'])
+        if record.get('delay_s') is not None:
+            summary['delays'].append(record['delay_s'])
+        for stage, seconds in (record.get('stages') or {}).items():
+            summary['stages'][stage].append(seconds)
+
+    @staticmethod
+    def _recent_months() -> List[str]:
+        """This month and last month, newest first."""
+        now = datetime.now()
+        previous = f"{now.year - 1}-12" if now.month == 1 else f"{now.year}-{now.month - 1:02d}"
+        return [now.strftime('%Y-%m'), previous]
+
+    def last_posted(self) -> Optional[float]:
+        """Timestamp of the latest successful post this month or last month."""
+        for month in self._recent_months():
+            finished = self.summary(month)['last_posted']
+            if finished:
+                return datetime.fromisoformat(finished).timestamp()
+        return None
+
+    def failed_attempts(self, post_id: str) -> int:
+        """
+        Failed attempts of one post since it last succeeded or was given up on.
+
+        Looks at this month and last month, like last_posted().
+        """
+        failures = 0
+        for month in self._recent_months():
+            summary = self.summary(month)
+            failures += summary['failures'].get(post_id, 0)
+            if post_id in summary['reset']:
+                break
+        return failures
+
+    def write_rollup(self, month: str, rollup_path: Path):
+        """
+        Write the markdown report for one month.
+
+        Shows posts per day, success rate, median post latency and stage
+        times, and the most recent ROLLUP_RECENT_ROWS attempts; the JSONL
+        file stays the full record. Only the generated part of an existing
+        file is replaced; whatever follows ROLLUP_FOOTER, or all of a file
+        without one, is kept below the new report.
+        """
+        summary = self.summary(month)
+        posted, failed = summary['posted'], summary['failed']
+        attempts = posted + failed
+        if not attempts:
+            return
+
+        success_rate = posted / attempts
+        days = sorted(summary['per_day'])
+        first_day = datetime.fromisoformat(days[0]).date()
+        last_day = min(datetime.now().date(), datetime.fromisoformat(days[-1]).date())
+        per_day = posted / max(1, (last_day - first_day).days + 1)
+        latency = _median(summary['latencies'])
+        delay = _median(summary['delays'])
+
+        lines = [
+            "---",
+            "type: linkedin_metrics",
+            f"month: {month}",
+            f"posted: {posted}",
+            f"failed: {failed}",
+            f"success_rate: {success_rate:.3f}",
+            f"median_latency_s: {latency if latency is not None else ''}",
+            f"updated: {datetime.now().isoformat()}",
+            "---",
+            "",
+            f"# LinkedIn Activity: {month}",
+            "",
+            f"**Posts:** {posted} ({failed} failed attempts)  ",
+            f"**Success rate:** {success_rate:.1%}  ",
+            f"**Posts per day:** {per_day:.2f}  ",
+            f"**Median post latency:** {f'{latency:.1f}s' if latency is not None else 'n/a'}  ",
+        ]
+        if delay is not None:
+            lines.append(f"**Median delay after publish_at:** {delay:.0f}s  ")
+        lines += [f"**Ledger:** `{self.month_file(month).name}`", "",
+                  "## Posts per Day", "", "| Day | Posted | Failed |", "|---|---|---|"]
+        lines += [f"| {day} | {summary['per_day'][day][POSTED]} | {summary['per_day'][day][FAILED]} |"
+                  for day in days]
+        lines += ["", "## Median Stage Times", "", "| Stage | Median (s) |", "|---|---|"]
+        lines += [f"| {stage} | {_median(values)} |" for stage, values in summary['stages'].items()]
+        lines += ["", f"## Most Recent ({len(summary['recent'])})", "",
+                  "| Finished | Post | Outcome | Characters | Latency (s) | Error |", "|---|---|---|---|---|---|"]
+        for record in reversed(summary['recent']):
+            outcome = f"{record['outcome']} (gave up)" if record.get('gave_up') else record['outcome']
+            cells = [_cell(c) for c in (record['finished'][:19].replace('T', ' '), record['post_id'],
+                                        outcome, record.get('content_length', ''),
+                                        record.get('latency_s', ''))]
+            cells.append(_cell(record.get('error', ''), ROLLUP_ERROR_CHARS))
+            lines.append("| " + " | ".join(cells) + " |")
+        lines += ["", "---", ROLLUP_FOOTER, ""]
+
+        rollup_path.parent.mkdir(parents=True, exist_ok=True)
+        kept = _kept_text(rollup_path)
+        if kept:
+            lines += [kept, ""]
+        tmp_path = rollup_path.with_suffix('.tmp')
+        tmp_path.write_text('\n'.join(lines), encoding='utf-8')
+        tmp_path.replace(rollup_path)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Publishing Schedule for the LinkedIn Poster
+Orders queued posts by their `publish_at` and `priority` frontmatter and
+says exactly when the next one may go out, so the poster can sleep until
+then instead of rescanning Ready_To_Post/LinkedIn/ on a timer.
+
+Frontmatter:
+    publish_at: 2026-03-02T09:30     # ISO date/time, local unless it has an offset
+    priority: high                   # urgent/high/normal/low or a number
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('LinkedInPoster.Schedule')
+
+# Named priorities; numbers are used as they are (higher goes first)
+PRIORITY_RANKS = {'urgent': 3, 'high': 2, 'normal': 1, 'medium': 1, 'low': 0}
+DEFAULT_PRIORITY = PRIORITY_RANKS['normal']
+
+
+def parse_publish_at(value) -> Optional[float]:
+    """
+    Timestamp for a `publish_at` value; None if the post may go out now.
+
+    Raises:
+        ValueError: If the value is not an ISO date or date/time
+    """
+    text = str(value or '').strip()
+    if not text:
+        return None
+    return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp()
+
+
+def priority_rank(value) -> int:
+    """Rank for a `priority` value; unknown names get the default."""
+    text = str(value or '').strip().lower()
+    if not text:
+        return DEFAULT_PRIORITY
+    try:
+        return int(text)
+    except ValueError:
+        return PRIORITY_RANKS.get(text, DEFAULT_PRIORITY)
+
+
+class PostSchedule:
+    """
+    Queued posts in two heaps: waiting for their publish_at, and due.
+
+    Due posts go out highest priority first, then earliest publish_at,
+    with at least min_spacing seconds between posts. Replaced and removed
+    entries are dropped lazily when they reach the top of a heap, so
+    add() and discard() are O(log n) and O(1) for any size of calendar.
+    """
+
+    def __init__(self, min_spacing: float = 0):
+        """
+        Initialize publishing schedule.
+
+        Args:
+            min_spacing: Minimum seconds between two posts
+        """
+        self.min_spacing = min_spacing
+        self.last_posted: Optional[float] = None
+        self._entries: Dict[Path, Tuple[float, int, int]] = {}
+        self._waiting: List[Tuple[float, int, Path]] = []
+        self._due: List[Tuple[int, float, int, Path]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: Path) -> bool:
+        return Path(path) in self._entries
+
+    def add(self, path: Path, publish_at: Optional[float] = None, rank: int = DEFAULT_PRIORITY):
+        """Schedule a post, replacing any earlier entry for the same file."""
+        path = Path(path)
+        publish_at = publish_at or 0.0
+        seq = next(self._seq)
+        self._entries[path] = (publish_at, rank, seq)
+        heapq.heappush(self._waiting, (publish_at, seq, path))
+        self._compact()
+
+    def discard(self, path: Path):
+        """Drop a post from the schedule, if present."""
+        self._entries.pop(Path(path), None)
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        """Number of posts whose publish_at has passed."""
+        self._promote(time.time() if now is None else now)
+        return sum(1 for _, _, seq, path in self._due if self._live(path, seq))
+
+    def next_post_at(self, now: Optional[float] = None) -> Optional[float]:
+        """When the next post may go out (never before now), or None if nothing is queued."""
+        now = time.time() if now is None else now
+        self._promote(now)
+        self._drop_stale()
+        if self._due:
+            at = now
+        elif self._waiting:
+            at = self._waiting[0][0]
+        else:
+            return None
+        if self.last_posted is not None:
+            at = max(at, self.last_posted + self.min_spacing)
+        return max(at, now)
+
+    def pop(self, now: Optional[float] = None) -> Optional[Path]:
+        """Take the post that should go out now, or None if none may yet."""
+        now = time.time() if now is None else now
+        at = self.next_post_at(now)
+        if at is None or at > now or not self._due:
+            return None
+        _, _, _, path = heapq.heappop(self._due)
+        del self._entries[path]
+        return path
+
+    def mark_posted(self, when: Optional[float] = None):
+        """Start the spacing interval from a post that just went out."""
+        self.last_posted = time.time() if when is None else when
+
+    def upcoming(self) -> List[Tuple[Optional[float], int, Path]]:
+        """All queued posts as (publish_at, rank, path) in publishing order."""
+        now = time.time()
+        entries = [(publish_at, rank, path) for path, (publish_at, rank, _) in self._entries.items()]
+        due = sorted((e for e in entries if e[0] <= now), key=lambda e: (-e[1], e[0], e[2].name))
+        waiting = sorted((e for e in entries if e[0] > now), key=lambda e: (e[0], -e[1], e[2].name))
+        return [(publish_at or None, rank, path) for publish_at, rank, path in due + waiting]
+
+    def _live(self, path: Path, seq: int) -> bool:
+        entry = self._entries.get(path)
+        return entry is not None and entry[2] == seq
+
+    def _promote(self, now: float):
+        """Move posts whose publish_at has passed to the due heap."""
+        while self._waiting and self._waiting[0][0] <= now:
+            publish_at, seq, path = heapq.heappop(self._waiting)
+            if self._live(path, seq):
+                heapq.heappush(self._due, (-self._entries[path][1], publish_at, seq, path))
+
+    def _drop_stale(self):
+        while self._due and not self._live(self._due[0][3], self._due[0][2]):
+            heapq.heappop(self._due)
+        while self._waiting and not self._live(self._waiting[0][2], self._waiting[0][1]):
+            heapq.heappop(self._waiting)
+
+    def _compact(self):
+        """Rebuild the heaps once stale entries outnumber live ones."""
+        if len(self._waiting) + len(self._due) <= 2 * len(self._entries) + 64:
+            return
+        self._waiting = [item for item in self._waiting if self._live(item[2], item[1])]
+        self._due = [item for item in self._due if self._live(item[3], item[2])]
+        heapq.heapify(self._waiting)
+        heapq.heapify(self._due)
+
+
+class _FolderEvents:
+    """watchdog handler passing changed .md paths to the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_change: Callable[[Path], None]):
+        self.loop = loop
+        self.on_change = on_change
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if path and str(path).endswith('.md'):
+                self.loop.call_soon_threadsafe(self.on_change, Path(path))
+
+
+def watch_folder(folder: Path, on_change: Callable[[Path], None]):
+    """
+    Call on_change(path) on the running event loop whenever a post file
+    in the folder is created, modified, moved or deleted.
+
+    Returns:
+        The started watchdog observer, or None if watchdog is not installed
+    """
+    try:
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+    observer = Observer()
+    observer.schedule(_FolderEvents(asyncio.get_running_loop(), on_change), str(folder), recursive=False)
+    observer.start()
+    return observer
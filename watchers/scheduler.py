@@ -4,6 +4,7 @@ Task Scheduler for AI Employee
 Runs scheduled tasks via cron or Task Scheduler integration.
 """
 import time
+import asyncio
 import logging
 import yaml
 import subprocess
@@ -182,7 +183,15 @@ class TaskScheduler:
 
                 # Create server and check queue
                 server = EmailSenderServer()
-                result = asyncio.run(server.check_queue())
+
+                async def drain():
+                    try:
+                        return await server.check_queue()
+                    finally:
+                        # Pooled SMTP connections belong to this event loop
+                        await server.smtp_pool.close()
+
+                result = asyncio.run(drain())
                 logger.info(f"Email queue result: {result}")
 
             except ImportError as e:
@@ -224,6 +233,13 @@ class TaskScheduler:
             done_path = VAULT_PATH / "Done"
             completed_today = list(done_path.glob(f"*{datetime.now().strftime('%Y-%m-%d')}*.md"))
 
+            # Count emails sent today (one line per email in the sent ledger)
+            sent_ledger = VAULT_PATH / "Logs" / "Email" / f"sent_{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+            emails_sent = 0
+            if sent_ledger.exists():
+                with open(sent_ledger, 'rb') as f:
+                    emails_sent = sum(1 for _ in f)
+
             # Count pending items
             needs_action = VAULT_PATH / "Needs_Action"
             pending_items = list(needs_action.glob("*.md"))
@@ -236,6 +252,7 @@ class TaskScheduler:
 
 ## Summary
 - Tasks Processed: {len(completed_today)}
+- Emails Sent: {emails_sent}
 - Pending Items: {len(pending_items)}
 - Awaiting Approval: {approval_count}
 - Errors: 0
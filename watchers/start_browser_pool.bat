@@ -0,0 +1,19 @@
+@echo off
+REM Browser Pool Startup Script (Windows)
+REM This script starts the shared Chromium pool used by the WhatsApp Watcher and LinkedIn Poster
+
+echo Starting Browser Pool...
+echo.
+
+REM Change to the watchers directory
+cd /d "%~dp0"
+
+REM Run the Browser Pool
+python browser_pool.py %*
+
+REM Pause if there's an error
+if errorlevel 1 (
+    echo.
+    echo Error occurred. Press any key to exit...
+    pause
+)
@@ -0,0 +1,12 @@
+#!/bin/bash
+# Browser Pool Startup Script (Unix/Linux/macOS)
+# This script starts the shared Chromium pool used by the WhatsApp Watcher and LinkedIn Poster
+
+echo "Starting Browser Pool..."
+echo ""
+
+# Change to the watchers directory
+cd "$(dirname "$0")"
+
+# Run the Browser Pool
+python browser_pool.py "$@"
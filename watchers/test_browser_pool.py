@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the Browser Pool lease service.
+
+Chromium is replaced by a small Python process that only opens the CDP
+port, so serve(), leasing and the restart path run without a browser.
+
+Usage:
+    python -m unittest test_browser_pool
+"""
+import asyncio
+import importlib.util
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import browser_pool
+from browser_pool import BrowserPool, BrowserPoolClient
+
+# Stand-in for Chromium: listen on the CDP port until terminated
+FAKE_CDP = """
+import socket, sys, time
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(('127.0.0.1', int(sys.argv[1])))
+server.listen()
+while True:
+    time.sleep(1)
+"""
+
+_real_popen = subprocess.Popen
+
+
+def fake_chromium(args, **kwargs):
+    """Popen replacement that starts FAKE_CDP on the requested debugging port."""
+    ports = [a.split('=', 1)[1] for a in args if str(a).startswith('--remote-debugging-port=')]
+    if not ports:
+        return _real_popen(args, **kwargs)  # e.g. the Playwright driver
+    return _real_popen([sys.executable, '-c', FAKE_CDP, ports[0]], **kwargs)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ServeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = BrowserPool(port=free_port(), cdp_port=free_port(),
+                                pool_path=Path(tempfile.mkdtemp(prefix='pool_test_')))
+        self.client = BrowserPoolClient(f"127.0.0.1:{self.pool.port}")
+        patcher = mock.patch.object(browser_pool.subprocess, 'Popen', side_effect=fake_chromium)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.pool.stop)
+
+    async def _wait_listening(self):
+        for _ in range(100):
+            try:
+                with socket.create_connection(('127.0.0.1', self.pool.port), timeout=0.2):
+                    return
+            except OSError:
+                await asyncio.sleep(0.1)
+        self.fail("lease service did not start")
+
+    def _run(self, scenario):
+        """Run serve() on a fresh event loop while scenario() talks to it."""
+        async def main():
+            server = asyncio.create_task(self.pool.serve())
+            try:
+                await self._wait_listening()
+                await scenario()
+            finally:
+                server.cancel()
+                await asyncio.gather(server, return_exceptions=True)
+        asyncio.run(asyncio.wait_for(main(), 60))
+
+    @unittest.skipIf(importlib.util.find_spec('playwright') is None, "playwright not installed")
+    def test_serve_resolves_chromium_inside_event_loop(self):
+        async def scenario():
+            lease = await asyncio.to_thread(self.client.acquire, 'linkedin', 5)
+            self.assertTrue(lease['ok'])
+            self.assertTrue(self.pool.executable)
+
+        self._run(scenario)
+
+    def test_lease_and_restart(self):
+        self.pool.executable = '/stub/chromium'
+
+        async def scenario():
+            lease = await asyncio.to_thread(self.client.acquire, 'whatsapp', 5)
+            self.assertEqual(lease['cdp_endpoint'], self.pool.cdp_endpoint)
+            first_pid = self.pool.process.pid
+
+            # Chromium dies: the next acquire relaunches it off the event loop
+            self.pool.process.kill()
+            self.pool.process.wait()
+            second = await asyncio.to_thread(self.client.acquire, 'linkedin', 5)
+            self.assertTrue(second['ok'])
+            self.assertNotEqual(self.pool.process.pid, first_pid)
+
+            await asyncio.to_thread(self.client.release, lease['lease'])
+            status = await asyncio.to_thread(self.client.status)
+            self.assertEqual(status['pages'], 1)
+            self.assertEqual(status['integrations'], ['linkedin'])
+
+        self._run(scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
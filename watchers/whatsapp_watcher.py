@@ -10,18 +10,26 @@ WARNING: Automating WhatsApp Web may violate WhatsApp's Terms of Service.
 Use at your own risk for educational/personal purposes only.
 
 Usage:
-    python whatsapp_watcher.py [vault_path] [session_path]
+    python whatsapp_watcher.py [vault_path] [session_path] [--headless]
 
 Example:
     python whatsapp_watcher.py ../AI_Employee_Vault
+    python whatsapp_watcher.py ../AI_Employee_Vault --headless
+
+Run without --headless once to scan the QR code. Afterwards --headless
+runs WhatsApp Web without a window, blocks images/media/fonts and writes
+per-poll browser CPU/RSS figures to watchers/whatsapp_metrics.jsonl.
 """
 
+import os
 import sys
 import time
 import json
+import re
+import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 try:
     from playwright.sync_api import sync_playwright
@@ -36,6 +44,238 @@ except ImportError:
     print("Error: PyYAML not installed. Run: pip install pyyaml")
     yaml = None
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+WHATSAPP_WEB_URL = 'https://web.whatsapp.com'
+
+# Resource types never needed to read chat text
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+
+# WhatsApp's id for a message element (on it or an ancestor, else its last
+# descendant that has one), or null
+MESSAGE_DATA_ID_JS = '''el => {
+    const node = el.closest('[data-id]') || [...el.querySelectorAll('[data-id]')].pop();
+    return node ? node.getAttribute('data-id') : null;
+}'''
+
+# Headless Chromium advertises "HeadlessChrome", which WhatsApp Web rejects
+HEADLESS_USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+# Used when no keywords file is found; first tier is the highest priority
+DEFAULT_KEYWORD_TIERS = {
+    'High': ['urgent', 'asap', 'emergency', 'immediately'],
+    'Normal': [
+        'invoice', 'payment', 'help', 'pricing', 'quote', 'meeting',
+        'deadline', 'support', 'delivery', 'status'
+    ],
+}
+
+
+class KeywordMatcher:
+    """
+    Precompiled keyword matcher with per-keyword priority tiers.
+
+    All keywords are compiled into a single case-insensitive regex that
+    only matches whole words, so "call" does not fire on "recall" and
+    phrases like "not working" tolerate any run of whitespace.
+    """
+
+    def __init__(self, tiers: Dict[str, List[str]]):
+        """
+        Build the matcher.
+
+        Args:
+            tiers: Mapping of tier name to keywords, highest priority first
+        """
+        self.tier_rank: Dict[str, int] = {}
+        self.keyword_tier: Dict[str, str] = {}
+
+        for rank, (tier, keywords) in enumerate(tiers.items()):
+            self.tier_rank[tier] = rank
+            for keyword in keywords or []:
+                key = self._normalize(str(keyword))
+                # A keyword listed in two tiers keeps the higher one
+                if key and key not in self.keyword_tier:
+                    self.keyword_tier[key] = tier
+
+        self.keywords = list(self.keyword_tier)
+
+        # Longest first so "not working" wins over a shorter overlapping keyword
+        alternatives = sorted(self.keywords, key=len, reverse=True)
+        patterns = [r'\s+'.join(re.escape(word) for word in k.split()) for k in alternatives]
+        self.pattern = re.compile(
+            r'(?<!\w)(?:' + '|'.join(patterns) + r')(?!\w)', re.IGNORECASE
+        ) if patterns else None
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+    def match(self, text: str) -> Optional[Tuple[str, List[str]]]:
+        """
+        Find monitored keywords in a message.
+
+        Returns:
+            Tuple of (highest matched tier, matched keywords), or None
+        """
+        if not self.pattern or not text:
+            return None
+
+        found = []
+        for m in self.pattern.finditer(text):
+            key = self._normalize(m.group(0))
+            if key not in found:
+                found.append(key)
+
+        if not found:
+            return None
+
+        tier = min((self.keyword_tier[k] for k in found), key=self.tier_rank.get)
+        return tier, found
+
+
+class MessageState:
+    """
+    Append-only store of seen message IDs and per-chat cursors.
+
+    Entries live in a dict for O(1) lookup and are persisted as one JSON
+    record per line. Each flush appends only the records added since the
+    previous flush; the log is compacted once dead records outnumber live
+    ones. Entries older than ttl_days are dropped on load and compaction.
+    """
+
+    def __init__(self, state_file: Path, ttl_days: int = 30, legacy_file: Optional[Path] = None):
+        """
+        Initialize message state.
+
+        Args:
+            state_file: Path to the JSONL state log
+            ttl_days: Days to remember a message ID or cursor (default: 30)
+            legacy_file: Old whatsapp_state.json list to import once, if present
+        """
+        self.state_file = Path(state_file)
+        self.ttl_seconds = ttl_days * 86400
+        self.seen: Dict[str, float] = {}
+        self.cursors: Dict[str, Dict] = {}
+        self._pending: List[Dict] = []
+        self._log_records = 0
+        self._last_expiry = time.time()
+
+        self._load()
+        if legacy_file and Path(legacy_file).exists():
+            self._import_legacy(Path(legacy_file))
+
+    def __contains__(self, message_id: str) -> bool:
+        return message_id in self.seen
+
+    def __len__(self) -> int:
+        return len(self.seen)
+
+    def add(self, message_id: str):
+        """Mark a message ID as processed."""
+        now = time.time()
+        self.seen[message_id] = now
+        self._pending.append({'op': 'seen', 'id': message_id, 'ts': now})
+
+    def get_cursor(self, chat: str) -> Optional[str]:
+        """Return the fingerprint of the last message seen in a chat."""
+        cursor = self.cursors.get(chat)
+        return cursor['last'] if cursor else None
+
+    def set_cursor(self, chat: str, fingerprint: str):
+        """Record the fingerprint of the latest message seen in a chat."""
+        if self.get_cursor(chat) == fingerprint:
+            return
+        now = time.time()
+        self.cursors[chat] = {'last': fingerprint, 'ts': now}
+        self._pending.append({'op': 'cursor', 'chat': chat, 'last': fingerprint, 'ts': now})
+
+    def flush(self):
+        """Append pending records to the log, compacting it when mostly dead."""
+        if time.time() - self._last_expiry > 3600:
+            self._expire()
+
+        live = len(self.seen) + len(self.cursors)
+        if self._log_records + len(self._pending) > 2 * live + 1000:
+            self.compact()
+            return
+
+        if not self._pending:
+            return
+
+        with open(self.state_file, 'a', encoding='utf-8') as f:
+            for record in self._pending:
+                f.write(json.dumps(record) + '\n')
+        self._log_records += len(self._pending)
+        self._pending.clear()
+
+    def compact(self):
+        """Drop expired entries and rewrite the log with live records only."""
+        self._expire()
+        records = [{'op': 'seen', 'id': mid, 'ts': ts} for mid, ts in self.seen.items()]
+        records += [
+            {'op': 'cursor', 'chat': chat, 'last': c['last'], 'ts': c['ts']}
+            for chat, c in self.cursors.items()
+        ]
+
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        os.replace(tmp_file, self.state_file)
+
+        self._log_records = len(records)
+        self._pending.clear()
+
+    def _expire(self):
+        """Remove message IDs and cursors older than the TTL."""
+        self._last_expiry = time.time()
+        cutoff = self._last_expiry - self.ttl_seconds
+        self.seen = {mid: ts for mid, ts in self.seen.items() if ts >= cutoff}
+        self.cursors = {chat: c for chat, c in self.cursors.items() if c['ts'] >= cutoff}
+
+    def _load(self):
+        """Replay the log into memory, skipping expired and corrupt lines."""
+        if not self.state_file.exists():
+            return
+
+        cutoff = time.time() - self.ttl_seconds
+        with open(self.state_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._log_records += 1
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash mid-append
+                    continue
+                if record.get('ts', 0) < cutoff:
+                    continue
+                if record.get('op') == 'seen':
+                    self.seen[record['id']] = record['ts']
+                elif record.get('op') == 'cursor':
+                    self.cursors[record['chat']] = {'last': record['last'], 'ts': record['ts']}
+
+    def _import_legacy(self, legacy_file: Path):
+        """Import the old flat whatsapp_state.json list, then retire it."""
+        try:
+            with open(legacy_file, 'r') as f:
+                for message_id in json.load(f):
+                    if message_id not in self.seen:
+                        self.add(message_id)
+            self.flush()
+            legacy_file.rename(legacy_file.with_suffix('.json.migrated'))
+            print(f"Migrated {len(self.seen)} message IDs from {legacy_file.name}")
+        except Exception as e:
+            print(f"Warning: Could not migrate legacy state file: {e}")
+
 
 class WhatsAppWatcher:
     """Monitor WhatsApp Web for urgent messages and create action items."""
@@ -45,7 +285,14 @@ class WhatsAppWatcher:
         vault_path: str,
         session_path: Optional[str] = None,
         keywords_file: Optional[str] = None,
-        check_interval: int = 60
+        check_interval: int = 60,
+        state_ttl_days: int = 30,
+        whatsapp_url: str = WHATSAPP_WEB_URL,
+        max_chats: int = 20,
+        browser_pool: Optional[str] = None,
+        headless: bool = False,
+        block_resources: Optional[bool] = None,
+        max_renderer_memory_mb: int = 512
     ):
         """
         Initialize WhatsApp Watcher.
@@ -55,12 +302,29 @@ class WhatsAppWatcher:
             session_path: Path to store browser session (default: vault_path/watchers/whatsapp_session)
             keywords_file: Path to keywords YAML config (default: whatsapp_keywords.yaml)
             check_interval: Seconds between checks (default: 60)
+            state_ttl_days: Days to remember processed messages (default: 30)
+            whatsapp_url: Page to scrape (default: WhatsApp Web; use a fixtures/ file:// URL offline)
+            max_chats: Most recent chats to inspect per poll (default: 20)
+            browser_pool: host:port of a running browser_pool.py to share Chromium with
+            headless: Run without a browser window (requires a paired session)
+            block_resources: Block images, media and fonts (default: same as headless)
+            max_renderer_memory_mb: V8 heap cap for the renderer in headless mode
         """
         self.vault_path = Path(vault_path)
         self.needs_action = self.vault_path / 'Needs_Action'
         self.session_path = Path(session_path or self.vault_path / 'watchers/whatsapp_session')
-        self.state_file = self.vault_path / 'watchers/whatsapp_state.json'
+        self.state_file = self.vault_path / 'watchers/whatsapp_state.jsonl'
+        self.legacy_state_file = self.vault_path / 'watchers/whatsapp_state.json'
+        self.state_ttl_days = state_ttl_days
+        self.whatsapp_url = whatsapp_url
+        self.max_chats = max_chats
+        self.browser_pool = browser_pool
+        self._lease = None
+        self.metrics_file = self.vault_path / 'watchers/whatsapp_metrics.jsonl'
         self.check_interval = check_interval
+        self.headless = headless
+        self.block_resources = headless if block_resources is None else block_resources
+        self.max_renderer_memory_mb = max_renderer_memory_mb
 
         # Ensure directories exist
         self.needs_action.mkdir(parents=True, exist_ok=True)
@@ -68,67 +332,209 @@ class WhatsAppWatcher:
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
         # Load keywords
-        self.keywords = self._load_keywords(keywords_file)
+        self.keywords_path = Path(keywords_file or self.vault_path / 'watchers/whatsapp_keywords.yaml')
+        self._keywords_mtime = None
+        self.matcher = self._load_keywords()
 
         # Load processed messages
-        self.processed_ids = self._load_state()
+        self.state = self._load_state()
 
         print(f"WhatsApp Watcher initialized")
         print(f"  Vault: {self.vault_path}")
         print(f"  Session: {self.session_path}")
         print(f"  Keywords: {', '.join(self.keywords)}")
         print(f"  Check interval: {self.check_interval}s")
+        print(f"  Headless: {self.headless} (blocking resources: {self.block_resources})")
 
-    def _load_keywords(self, keywords_file: Optional[str]) -> List[str]:
-        """Load urgency keywords from config file."""
-        default_keywords = [
-            'urgent', 'asap', 'invoice', 'payment', 'help',
-            'pricing', 'quote', 'meeting', 'deadline', 'emergency',
-            'immediately', 'support', 'delivery', 'status'
-        ]
+    @property
+    def keywords(self) -> List[str]:
+        """Currently monitored keywords."""
+        return self.matcher.keywords
 
-        keywords_path = Path(keywords_file or self.vault_path / 'watchers/whatsapp_keywords.yaml')
+    def _load_keywords(self) -> KeywordMatcher:
+        """
+        Load keyword tiers from config file into a precompiled matcher.
 
-        if yaml and keywords_path.exists():
+        The file maps each priority tier to its keywords, highest tier first.
+        A flat list of keywords is still accepted and treated as Normal.
+        """
+        if yaml and self.keywords_path.exists():
             try:
-                with open(keywords_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                    keywords = config.get('keywords', default_keywords)
-                    print(f"Loaded keywords from {keywords_path}")
-                    return keywords
+                self._keywords_mtime = self.keywords_path.stat().st_mtime
+                with open(self.keywords_path, 'r') as f:
+                    config = yaml.safe_load(f) or {}
+                tiers = config.get('keywords', DEFAULT_KEYWORD_TIERS)
+                if isinstance(tiers, list):
+                    tiers = {'Normal': tiers}
+                matcher = KeywordMatcher(tiers)
+                print(f"Loaded {len(matcher.keywords)} keywords from {self.keywords_path}")
+                return matcher
             except Exception as e:
                 print(f"Warning: Could not load keywords file: {e}")
+                if getattr(self, 'matcher', None):
+                    print("Keeping previous keywords")
+                    return self.matcher
                 print("Using default keywords")
 
-        return default_keywords
+        return KeywordMatcher(DEFAULT_KEYWORD_TIERS)
 
-    def _load_state(self) -> set:
-        """Load processed message IDs from state file."""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r') as f:
-                    return set(json.load(f))
-            except Exception as e:
-                print(f"Warning: Could not load state file: {e}")
-                return set()
-        return set()
+    def _refresh_keywords(self):
+        """Reload the keywords file if its modification time changed."""
+        try:
+            mtime = self.keywords_path.stat().st_mtime
+        except OSError:
+            return
+
+        if mtime != self._keywords_mtime:
+            print("Keywords file changed, reloading...")
+            # Swap in the new matcher only once it has compiled
+            self.matcher = self._load_keywords()
+
+    def _load_state(self) -> MessageState:
+        """Load processed message IDs and chat cursors from state file."""
+        return MessageState(self.state_file, self.state_ttl_days, self.legacy_state_file)
 
     def _save_state(self):
-        """Save processed message IDs to state file."""
+        """Append new processed message IDs and cursors to state file."""
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(list(self.processed_ids), f)
+            self.state.flush()
         except Exception as e:
             print(f"Error saving state: {e}")
 
-    def _determine_priority(self, message_text: str) -> str:
-        """Determine message priority based on content."""
-        urgent_keywords = ['urgent', 'asap', 'emergency', 'immediately']
-        message_lower = message_text.lower()
+    def _is_paired(self) -> bool:
+        """Check whether the session directory holds a previous login."""
+        return any(self.session_path.iterdir())
+
+    def _launch_options(self) -> Dict:
+        """Build launch_persistent_context options for the current mode."""
+        headless = self.headless
+        # Only the live site needs a QR-paired session
+        if headless and self.whatsapp_url == WHATSAPP_WEB_URL and not self._is_paired():
+            print("No WhatsApp session found - opening a window for QR pairing")
+            headless = False
+
+        args = [
+            '--disable-blink-features=AutomationControlled',
+            '--no-sandbox',
+            '--disable-setuid-sandbox'
+        ]
+        options = {
+            'user_data_dir': str(self.session_path),
+            'headless': headless,
+        }
+
+        if headless:
+            args += [
+                '--disable-gpu',
+                '--disable-dev-shm-usage',
+                '--disable-extensions',
+                '--mute-audio',
+                '--renderer-process-limit=1',
+                f'--js-flags=--max-old-space-size={self.max_renderer_memory_mb}'
+            ]
+            options['user_agent'] = HEADLESS_USER_AGENT
+            options['viewport'] = {'width': 1280, 'height': 800}
+
+        if self.block_resources:
+            args.append('--blink-settings=imagesEnabled=false')
+
+        options['args'] = args
+        return options
+
+    def _open_context(self, p):
+        """Open a browser context, either standalone or leased from the shared pool."""
+        if not self.browser_pool:
+            return p.chromium.launch_persistent_context(**self._launch_options())
+
+        from browser_pool import BrowserPoolClient
+
+        self._lease = BrowserPoolClient(self.browser_pool).acquire('whatsapp')
+        browser = p.chromium.connect_over_cdp(self._lease['cdp_endpoint'])
+        storage_state = Path(self._lease['storage_state'])
+        options = {'storage_state': str(storage_state)} if storage_state.exists() else {}
+        if self._lease.get('headless'):
+            options['user_agent'] = HEADLESS_USER_AGENT
+        return browser.new_context(**options)
+
+    def _close_context(self, context):
+        """Close a context, saving its session and returning the lease when pooled."""
+        if not self._lease:
+            context.close()
+            return
+
+        try:
+            # WhatsApp Web keeps its login in IndexedDB (needs Playwright >= 1.51)
+            try:
+                context.storage_state(path=self._lease['storage_state'], indexed_db=True)
+            except TypeError:
+                context.storage_state(path=self._lease['storage_state'])
+            context.close()
+        finally:
+            self._release_lease()
+
+    def _release_lease(self):
+        """Return the pool lease, if one is held."""
+        if not self._lease:
+            return
 
-        if any(keyword in message_lower for keyword in urgent_keywords):
-            return "High"
-        return "Normal"
+        from browser_pool import BrowserPoolClient
+
+        try:
+            BrowserPoolClient(self.browser_pool).release(self._lease['lease'])
+        except OSError as e:
+            print(f"Warning: Could not release browser pool lease: {e}")
+        self._lease = None
+
+    def _block_heavy_resources(self, route):
+        """Abort requests for images, media and fonts; let everything else through."""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _browser_usage(self) -> Optional[Dict]:
+        """
+        Sample CPU time and RSS of the Chromium processes started by this watcher.
+
+        Returns:
+            Dictionary with process count, cpu_seconds and rss_mb, or None
+            if psutil is not installed
+        """
+        if psutil is None:
+            return None
+
+        cpu_seconds = 0.0
+        rss = 0
+        count = 0
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                if 'chrom' not in proc.name().lower():
+                    continue
+                times = proc.cpu_times()
+                cpu_seconds += times.user + times.system
+                rss += proc.memory_info().rss
+                count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        return {
+            'processes': count,
+            'cpu_seconds': round(cpu_seconds, 2),
+            'rss_mb': round(rss / (1024 * 1024), 1)
+        }
+
+    def _record_poll_metrics(self, metrics: Dict):
+        """Append one poll's metrics to the metrics file."""
+        try:
+            with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics) + '\n')
+        except Exception as e:
+            print(f"Error writing metrics: {e}")
+
+    def _determine_priority(self, message_text: str) -> str:
+        """Determine message priority from the highest tier of matched keywords."""
+        result = self.matcher.match(message_text)
+        return result[0] if result else "Normal"
 
     def check_for_updates(self) -> List[Dict]:
         """
@@ -138,24 +544,24 @@ class WhatsAppWatcher:
             List of message dictionaries with id, sender, message, timestamp
         """
         messages = []
+        poll_started = time.monotonic()
+        usage = None
+
+        # Pick up keyword edits without restarting (and re-pairing) the browser
+        self._refresh_keywords()
 
         try:
             with sync_playwright() as p:
-                # Launch persistent browser context
-                browser = p.chromium.launch_persistent_context(
-                    user_data_dir=str(self.session_path),
-                    headless=False,  # Set to False for first-time QR scan
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox'
-                    ]
-                )
+                # Launch persistent browser context (or lease one from the pool)
+                browser = self._open_context(p)
+
+                if self.block_resources:
+                    browser.route('**/*', self._block_heavy_resources)
 
                 page = browser.new_page()
 
                 print("Navigating to WhatsApp Web...")
-                page.goto('https://web.whatsapp.com', timeout=60000)
+                page.goto(self.whatsapp_url, timeout=60000)
 
                 # Wait for page to load
                 try:
@@ -165,7 +571,7 @@ class WhatsAppWatcher:
                 except Exception as e:
                     print(f"Timeout waiting for WhatsApp Web: {e}")
                     print("You may need to scan the QR code manually")
-                    browser.close()
+                    self._close_context(browser)
                     return messages
 
                 # Wait a bit for messages to load
@@ -175,8 +581,8 @@ class WhatsAppWatcher:
                 print("Checking for new messages...")
                 chats = page.query_selector_all('div[role="listitem"]')
 
-                # Limit to recent 20 chats to avoid overwhelming
-                for idx, chat in enumerate(chats[:20]):
+                # Limit to recent chats to avoid overwhelming
+                for idx, chat in enumerate(chats[:self.max_chats]):
                     try:
                         # Get chat name/title before clicking
                         title_elem = chat.query_selector('span[title]')
@@ -194,36 +600,66 @@ class WhatsAppWatcher:
                             last_msg_div = message_divs[-1]
                             message_text = last_msg_div.inner_text().strip()
 
+                            # Skip chats whose last message hasn't changed. WhatsApp's
+                            # per-message data-id tells a repeated text apart from the
+                            # same message; without one, fall back to the text
+                            data_id = last_msg_div.evaluate(MESSAGE_DATA_ID_JS)
+                            text_hash = hashlib.sha1(message_text.encode('utf-8')).hexdigest()[:16]
+                            fingerprint = data_id or text_hash
+                            if self.state.get_cursor(sender_name) == fingerprint:
+                                continue
+                            self.state.set_cursor(sender_name, fingerprint)
+
                             # Check for keywords
-                            if message_text and any(
-                                keyword.lower() in message_text.lower()
-                                for keyword in self.keywords
-                            ):
-                                # Generate unique ID
-                                timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-                                message_id = f"whatsapp_{sender_name}_{timestamp_str}"
-
-                                if message_id not in self.processed_ids:
+                            match = self.matcher.match(message_text)
+                            if match:
+                                # The cursor moved, so this is a new message even if the
+                                # text repeats an earlier one: a text hash alone would
+                                # suppress it for the whole state TTL
+                                if data_id:
+                                    message_id = f"whatsapp_{sender_name}_{data_id}"
+                                else:
+                                    message_id = f"whatsapp_{sender_name}_{text_hash}_{int(time.time())}"
+
+                                if message_id not in self.state:
                                     print(f"  Found urgent message from {sender_name}")
                                     messages.append({
                                         'id': message_id,
                                         'sender': sender_name,
                                         'message': message_text,
+                                        'keywords': match[1],
                                         'timestamp': datetime.now().isoformat()
                                     })
 
-                                    self.processed_ids.add(message_id)
+                                    self.state.add(message_id)
 
                     except Exception as e:
                         # Skip problematic chats
                         continue
 
-                browser.close()
+                # Sample before close, while the renderer is still alive
+                # (a pooled browser is not our child; the pool reports its memory)
+                if not self.browser_pool:
+                    usage = self._browser_usage()
+                self._close_context(browser)
 
         except Exception as e:
             print(f"Error in WhatsApp watcher: {e}")
             import traceback
             traceback.print_exc()
+            self._release_lease()
+
+        metrics = {
+            'timestamp': datetime.now().isoformat(),
+            'session': str(self.session_path),
+            'headless': self.headless,
+            'poll_seconds': round(time.monotonic() - poll_started, 2),
+            'messages': len(messages)
+        }
+        if usage:
+            metrics.update(usage)
+            print(f"Browser usage: {usage['cpu_seconds']}s CPU, {usage['rss_mb']} MB RSS")
+        self._record_poll_metrics(metrics)
 
         return messages
 
@@ -265,7 +701,7 @@ class WhatsAppWatcher:
 
 ## Context
 
-This message was detected by the WhatsApp Watcher because it contains one of the monitored keywords: {', '.join(self.keywords[:5])}{'...' if len(self.keywords) > 5 else ''}.
+This message was detected by the WhatsApp Watcher because it contains one of the monitored keywords: {', '.join(message.get('keywords') or self.keywords[:5])}.
 
 **Note:** To respond, you can use WhatsApp Web directly or use the WhatsApp Sender MCP (if configured).
 
@@ -325,22 +761,37 @@ This message was detected by the WhatsApp Watcher because it contains one of the
 
 def main():
     """Main entry point."""
-    if len(sys.argv) > 1:
-        vault_path = sys.argv[1]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WhatsApp Watcher for AI Employee')
+    parser.add_argument('vault_path', nargs='?', help='Path to Obsidian vault')
+    parser.add_argument('session_path', nargs='?', help='Path to browser session')
+    parser.add_argument('--headless', action='store_true',
+                       help='Run without a window and block images/media/fonts (after QR pairing)')
+    parser.add_argument('--url', default=WHATSAPP_WEB_URL,
+                       help='Page to scrape, e.g. file:// URL of fixtures/whatsapp_web.html')
+    parser.add_argument('--browser-pool', metavar='HOST:PORT',
+                       help='Use the shared Chromium from browser_pool.py instead of launching one')
+    parser.add_argument('--max-renderer-memory', type=int, default=512,
+                       help='Renderer heap cap in MB for headless mode (default: 512)')
+
+    args = parser.parse_args()
+
+    if args.vault_path:
+        vault_path = args.vault_path
     else:
         # Default vault path
         vault_path = Path(__file__).parent.parent / 'AI_Employee_Vault'
         print(f"No vault path specified, using default: {vault_path}")
 
-    if len(sys.argv) > 2:
-        session_path = sys.argv[2]
-    else:
-        session_path = None
-
     watcher = WhatsAppWatcher(
         vault_path=str(vault_path),
-        session_path=session_path,
-        check_interval=60
+        session_path=args.session_path,
+        check_interval=60,
+        whatsapp_url=args.url,
+        browser_pool=args.browser_pool,
+        headless=args.headless,
+        max_renderer_memory_mb=args.max_renderer_memory
     )
 
     watcher.run()